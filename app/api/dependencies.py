@@ -1,6 +1,13 @@
-from fastapi import Depends, HTTPException, status
-from typing import Annotated
-from app.services.auth_service import AuthService
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials
+from typing import Annotated, Optional
+import hashlib
+import math
+import secrets
+from app.core.config import settings
+from app.services.auth_service import AuthService, security
+from app.services.rate_limit import PRESUPUESTO_ESCRITURA, PRESUPUESTO_LECTURA, PRESUPUESTO_SUBIDA, consumir
+from app.services.upload_service import FormularioMultipart, leer_formulario_multipart
 from app.schemas.auth import AuthenticatedUser, UserType
 
 async def get_current_user_owner(
@@ -19,4 +26,67 @@ async def get_current_user_clinic(
     Dependencia para verificar que el usuario sea de tipo 'clinic'
     """
     AuthService.verify_user_type(current_user, [UserType.CLINIC])
-    return current_user 
\ No newline at end of file
+    return current_user 
+
+class RateLimit:
+    """
+    Dependencia que aplica el token bucket del presupuesto indicado al
+    cliente autenticado y responde 429 con Retry-After al agotarlo.
+
+    El cliente se identifica por su id o, mientras los tokens no lo incluyan,
+    por un hash del token Bearer, separado por tipo de usuario. Como la
+    autenticación acepta cualquier token, cada IP (la real, con proxy_headers
+    en server.py) tiene además un bucket RATE_LIMIT_IP_FACTOR veces mayor: un
+    cliente que rota tokens sigue limitado por su dirección.
+    """
+
+    def __init__(self, presupuesto: str):
+        self.presupuesto = presupuesto
+
+    async def __call__(
+        self,
+        request: Request,
+        current_user: Annotated[AuthenticatedUser, Depends(AuthService.get_current_user)],
+        credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)]
+    ) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        cliente = current_user.id or hashlib.sha256(credentials.credentials.encode()).hexdigest()[:32]
+        espera = None
+        if settings.RATE_LIMIT_IP_FACTOR > 0 and request.client:
+            espera = await consumir(f"ip:{request.client.host}", self.presupuesto, settings.RATE_LIMIT_IP_FACTOR)
+        if espera is None:
+            espera = await consumir(f"{current_user.userType.value}:{cliente}", self.presupuesto)
+        if espera is not None:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Demasiadas peticiones. Intente de nuevo más tarde.",
+                headers={"Retry-After": str(max(1, math.ceil(espera)))}
+            )
+
+limitar_lecturas = RateLimit(PRESUPUESTO_LECTURA)
+limitar_escrituras = RateLimit(PRESUPUESTO_ESCRITURA)
+limitar_subidas = RateLimit(PRESUPUESTO_SUBIDA)
+
+async def get_formulario_multipart(request: Request) -> FormularioMultipart:
+    """
+    Dependencia que lee el formulario por streaming, sin archivos temporales.
+    FastAPI la resuelve una sola vez por petición aunque varias dependencias la usen.
+    """
+    return await leer_formulario_multipart(request)
+
+async def verify_admin_token(
+    admin_token: Optional[str] = Header(None, alias="X-Admin-Token", description="Token de administración (ADMIN_TOKEN)")
+) -> None:
+    """
+    Dependencia para los endpoints de administración: exige el header
+    X-Admin-Token igual a ADMIN_TOKEN. Sin ADMIN_TOKEN configurado los
+    endpoints no existen a efectos del cliente (404).
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not admin_token or not secrets.compare_digest(admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de administración inválido"
+        )
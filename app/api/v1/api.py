@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import base
+from app.api.v1.endpoints import admin, base
 from app.api.v1.endpoints.solicitudes.user import router as user_router
 from app.api.v1.endpoints.solicitudes.vet import router as vet_router
 
@@ -13,4 +13,5 @@ api_router = APIRouter()
 
 api_router.include_router(base.router, prefix="/base", tags=["base"])
 api_router.include_router(user_router, prefix="/solicitudes/user", tags=["solicitudes-user"])
-api_router.include_router(vet_router, prefix="/solicitudes/vet", tags=["solicitudes-vet"]) 
\ No newline at end of file
+api_router.include_router(vet_router, prefix="/solicitudes/vet", tags=["solicitudes-vet"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
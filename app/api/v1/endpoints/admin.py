@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends
+from typing import Any, Dict
+from app.api.dependencies import verify_admin_token
+from app.core.config import settings
+from app.core.slow_queries import slow_query_recorder
+
+router = APIRouter(dependencies=[Depends(verify_admin_token)])
+
+@router.get(
+    "/slow-queries",
+    summary="Consultas lentas recientes",
+    description="Últimas operaciones de MongoDB que superaron SLOW_QUERY_THRESHOLD_MS, con la forma normalizada del filtro y el resumen de su plan de ejecución. Requiere el header X-Admin-Token.",
+    responses={
+        200: {
+            "description": "Operaciones lentas, de la más reciente a la más antigua",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "umbral_ms": 100.0,
+                        "operaciones": [
+                            {
+                                "fecha": "2025-07-20T15:04:05.123456",
+                                "coleccion": "solicitudes",
+                                "comando": "find",
+                                "duracion_ms": 182.4,
+                                "resultado": "ok",
+                                "forma": "{\"especie\": {\"$in\": \"?\"}, \"estado\": \"?\"}",
+                                "clave": "solicitudes.find {\"especie\": {\"$in\": \"?\"}, \"estado\": \"?\"}",
+                                "plan": {
+                                    "etapas": ["COLLSCAN"],
+                                    "indices": [],
+                                    "collscan": True,
+                                    "docs_examinados": 12000,
+                                    "claves_examinadas": 0,
+                                    "docs_devueltos": 35,
+                                    "tiempo_ms": 170
+                                }
+                            }
+                        ]
+                    }
+                }
+            }
+        },
+        401: {
+            "description": "Token de administración inválido",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Token de administración inválido"}
+                }
+            }
+        }
+    }
+)
+async def get_slow_queries() -> Dict[str, Any]:
+    """
+    Retorna el buffer de consultas lentas con el plan de cada forma.
+    
+    Returns:
+        Dict[str, Any]: Umbral configurado y operaciones lentas recientes
+    """
+    return {
+        "umbral_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+        "operaciones": slow_query_recorder.snapshot()
+    }
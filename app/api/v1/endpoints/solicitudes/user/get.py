@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import List, Optional, Annotated
-from app.schemas.solicitud import Solicitud
+from app.schemas.solicitud import Solicitud, SolicitudCercana, SolicitudResumen
 from app.schemas.auth import AuthenticatedUser
 from app.models.solicitud_mongo import SolicitudMongoModel
 from app.api.dependencies import get_current_user_owner
+from app.constants.solicitudes import COMPATIBILIDAD_SANGRE, ESPECIES_PERMITIDAS, TIPOS_SANGRE_POR_ESPECIE
 
 router = APIRouter()
 
@@ -170,6 +171,298 @@ async def filter_active_solicitudes(
             detail="Error interno del servidor al procesar la solicitud"
         )
 
+@router.get(
+    "/activas/buscar",
+    response_model=List[SolicitudResumen],
+    summary="Buscar solicitudes activas por texto",
+    description="Busca entre las solicitudes activas en el nombre de la mascota, el de la veterinaria y la descripción con stemming en español (\"anemia\", \"transfusión\"), ordenando por relevancia. Se combina con los filtros de categorías y retorna solo los campos de resumen",
+    responses={
+        200: {
+            "description": "Resumen de las solicitudes activas encontradas, de mayor a menor relevancia",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "id": "684a01e4c351aa9d49b145b8",
+                            "nombre_veterinaria": "Veterinaria San Patricio",
+                            "nombre_mascota": "Rocky",
+                            "especie": "Perro",
+                            "localidad": "Suba",
+                            "tipo_sangre": "DEA 1.1+",
+                            "urgencia": "Alta",
+                            "estado": "Activa",
+                            "fecha_creacion": "2024-02-14T10:30:00",
+                            "foto_mascota": "https://ejemplo.com/foto-rocky.jpg",
+                            "relevancia": 1.8
+                        }
+                    ]
+                }
+            }
+        },
+        500: {
+            "description": "Error interno del servidor",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Error interno del servidor al procesar la solicitud"}
+                }
+            }
+        }
+    }
+)
+async def search_active_solicitudes(
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_user_owner)],
+    q: str = Query(
+        ...,
+        min_length=2,
+        max_length=200,
+        description="Términos de búsqueda en nombre de la mascota, de la veterinaria y descripción. Admite \"frase exacta\" y -exclusión",
+        examples=["anemia"]
+    ),
+    especie: Optional[str] = Query(
+        None,
+        description="Filtrar por especie (ej: Perro, Gato). Múltiples valores separados por coma: Perro,Gato",
+        examples={"value": "Perro", "multiple": "Perro,Gato"}
+    ),
+    tipo_sangre: Optional[str] = Query(
+        None,
+        description="Filtrar por tipo de sangre (ej: DEA 1.1+, A). Múltiples valores separados por coma: DEA 1.1+,A",
+        examples={"value": "DEA 1.1+", "multiple": "DEA 1.1+,A"}
+    ),
+    urgencia: Optional[str] = Query(
+        None,
+        description="Filtrar por nivel de urgencia (Alta, Media). Múltiples valores separados por coma: Alta,Media",
+        examples={"value": "Alta", "multiple": "Alta,Media"}
+    ),
+    localidad: Optional[str] = Query(
+        None,
+        description="Filtrar por localidad (ej: Suba, Chapinero). Múltiples valores separados por coma: Suba,Teusaquillo",
+        examples={"value": "Suba", "multiple": "Suba,Teusaquillo"}
+    ),
+    limite: int = Query(20, ge=1, le=100, description="Número máximo de resultados")
+):
+    """
+    Busca solicitudes activas por texto libre.
+    
+    Args:
+        q (str): Términos de búsqueda
+        especie (Optional[str]): Especie a filtrar. Múltiples valores separados por coma: "Perro,Gato"
+        tipo_sangre (Optional[str]): Tipo de sangre a filtrar. Múltiples valores separados por coma: "DEA 1.1+,A"
+        urgencia (Optional[str]): Nivel de urgencia a filtrar. Múltiples valores separados por coma: "Alta,Media"
+        localidad (Optional[str]): Localidad a filtrar. Múltiples valores separados por coma: "Suba,Teusaquillo"
+        limite (int): Número máximo de resultados
+    
+    Returns:
+        List[SolicitudResumen]: Resumen de las solicitudes activas encontradas, de mayor a menor relevancia
+        
+    Raises:
+        HTTPException: Si ocurre un error al procesar la solicitud
+    """
+    try:
+        return await SolicitudMongoModel.search_solicitudes(
+            texto=q,
+            estado="Activa",
+            especie=especie,
+            tipo_sangre=tipo_sangre,
+            urgencia=urgencia,
+            localidad=localidad,
+            limite=limite
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail="Error interno del servidor al procesar la solicitud"
+        )
+
+@router.get(
+    "/activas/cercanas",
+    response_model=List[SolicitudCercana],
+    summary="Buscar solicitudes activas cercanas",
+    description="Retorna las solicitudes activas con ubicación dentro de un radio, ordenadas de la más cercana a la más lejana. Se pueden combinar con los filtros de especie y tipo de sangre",
+    responses={
+        200: {
+            "description": "Lista de solicitudes activas cercanas con su distancia en metros",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "id": "684a01e4c351aa9d49b145b8",
+                            "nombre_veterinaria": "Veterinaria San Patricio",
+                            "nombre_mascota": "Rocky",
+                            "especie": "Perro",
+                            "localidad": "Suba",
+                            "descripcion_solicitud": "Rocky es un pastor alemán de 5 años que ha sido diagnosticado con anemia severa después de una complicación durante una cirugía de emergencia.",
+                            "direccion": "Clínica VetCentral, Av. Principal 123",
+                            "ubicacion": "Suba, Bogotá",
+                            "contacto": "+57 300 123 4567",
+                            "peso_minimo": 25,
+                            "tipo_sangre": "DEA 1.1+",
+                            "fecha_creacion": "2024-02-14T10:30:00",
+                            "urgencia": "Alta",
+                            "estado": "Activa",
+                            "foto_mascota": "https://ejemplo.com/foto-rocky.jpg",
+                            "punto": {"type": "Point", "coordinates": [-74.0836, 4.7411]},
+                            "distancia_metros": 1840.5
+                        }
+                    ]
+                }
+            }
+        },
+        500: {
+            "description": "Error interno del servidor",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Error interno del servidor al procesar la solicitud"}
+                }
+            }
+        }
+    }
+)
+async def get_nearby_active_solicitudes(
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_user_owner)],
+    lat: float = Query(..., ge=-90, le=90, description="Latitud del punto de búsqueda"),
+    lng: float = Query(..., ge=-180, le=180, description="Longitud del punto de búsqueda"),
+    radio_km: float = Query(5, gt=0, le=50, description="Radio de búsqueda en kilómetros"),
+    especie: Optional[str] = Query(
+        None,
+        description="Filtrar por especie (ej: Perro, Gato). Múltiples valores separados por coma: Perro,Gato",
+        examples={"value": "Perro", "multiple": "Perro,Gato"}
+    ),
+    tipo_sangre: Optional[str] = Query(
+        None,
+        description="Filtrar por tipo de sangre (ej: DEA 1.1+, A). Múltiples valores separados por coma: DEA 1.1+,A",
+        examples={"value": "DEA 1.1+", "multiple": "DEA 1.1+,A"}
+    ),
+    limite: int = Query(50, ge=1, le=200, description="Número máximo de resultados")
+):
+    """
+    Busca las solicitudes activas más cercanas a un punto.
+    Las solicitudes sin ubicación no aparecen en esta búsqueda.
+    
+    Args:
+        lat (float): Latitud del punto de búsqueda
+        lng (float): Longitud del punto de búsqueda
+        radio_km (float): Radio de búsqueda en kilómetros
+        especie (Optional[str]): Especie a filtrar. Múltiples valores separados por coma: "Perro,Gato"
+        tipo_sangre (Optional[str]): Tipo de sangre a filtrar. Múltiples valores separados por coma: "DEA 1.1+,A"
+        limite (int): Número máximo de resultados
+    
+    Returns:
+        List[SolicitudCercana]: Solicitudes activas dentro del radio, de la más cercana a la más lejana
+        
+    Raises:
+        HTTPException: Si ocurre un error al procesar la solicitud
+    """
+    try:
+        return await SolicitudMongoModel.get_nearby_active_solicitudes(
+            latitud=lat,
+            longitud=lng,
+            radio_metros=radio_km * 1000,
+            especie=especie,
+            tipo_sangre=tipo_sangre,
+            limite=limite
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail="Error interno del servidor al procesar la solicitud"
+        )
+
+@router.get(
+    "/activas/compatibles",
+    response_model=List[Solicitud],
+    summary="Buscar solicitudes compatibles con un donante",
+    description="Retorna las solicitudes activas a las que puede donar una mascota según su especie, tipo de sangre y peso, de la más urgente a la menos urgente; a igual urgencia, primero las del mismo tipo de sangre y luego las más antiguas",
+    responses={
+        200: {
+            "description": "Lista de solicitudes activas compatibles, ordenadas por prioridad",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "id": "684a01e4c351aa9d49b145b8",
+                            "nombre_veterinaria": "Veterinaria San Patricio",
+                            "nombre_mascota": "Rocky",
+                            "especie": "Perro",
+                            "localidad": "Suba",
+                            "descripcion_solicitud": "Rocky es un pastor alemán de 5 años que ha sido diagnosticado con anemia severa después de una complicación durante una cirugía de emergencia.",
+                            "direccion": "Clínica VetCentral, Av. Principal 123",
+                            "ubicacion": "Suba, Bogotá",
+                            "contacto": "+57 300 123 4567",
+                            "peso_minimo": 25,
+                            "tipo_sangre": "DEA 1.1+",
+                            "fecha_creacion": "2024-02-14T10:30:00",
+                            "urgencia": "Alta",
+                            "estado": "Activa",
+                            "foto_mascota": "https://ejemplo.com/foto-rocky.jpg"
+                        }
+                    ]
+                }
+            }
+        },
+        400: {
+            "description": "Tipo de sangre que no corresponde a la especie",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Tipo de sangre inválido para Perro. Los tipos válidos son: DEA 1.1+, DEA 1.1-"}
+                }
+            }
+        },
+        500: {
+            "description": "Error interno del servidor",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Error interno del servidor al procesar la solicitud"}
+                }
+            }
+        }
+    }
+)
+async def get_compatible_solicitudes(
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_user_owner)],
+    especie: str = Query(..., description="Especie del donante", enum=ESPECIES_PERMITIDAS),
+    tipo_sangre: str = Query(..., description="Tipo de sangre del donante (ej: DEA 1.1-, A)"),
+    peso: float = Query(..., gt=0, description="Peso del donante en kg"),
+    limite: int = Query(50, ge=1, le=200, description="Número máximo de resultados")
+):
+    """
+    Busca las solicitudes activas compatibles con el perfil de un donante.
+    
+    Args:
+        especie (str): Especie del donante
+        tipo_sangre (str): Tipo de sangre del donante
+        peso (float): Peso del donante en kg; solo se incluyen solicitudes con peso_minimo menor o igual
+        limite (int): Número máximo de resultados
+    
+    Returns:
+        List[Solicitud]: Solicitudes compatibles ordenadas por prioridad
+        
+    Raises:
+        HTTPException: Si el tipo de sangre no corresponde a la especie o si ocurre un error
+    """
+    if especie not in ESPECIES_PERMITIDAS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Especie inválida. Las especies permitidas son: {', '.join(ESPECIES_PERMITIDAS)}"
+        )
+    if (especie, tipo_sangre) not in COMPATIBILIDAD_SANGRE:
+        tipos = TIPOS_SANGRE_POR_ESPECIE[especie]
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tipo de sangre inválido para {especie}. Los tipos válidos son: {', '.join(tipos)}"
+        )
+    try:
+        return await SolicitudMongoModel.match_compatible_solicitudes(
+            especie=especie,
+            tipo_sangre=tipo_sangre,
+            peso=peso,
+            limite=limite
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail="Error interno del servidor al procesar la solicitud"
+        )
+
 @router.get(
     "/{solicitud_id}",
     response_model=Solicitud,
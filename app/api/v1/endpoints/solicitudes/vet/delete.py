@@ -2,15 +2,18 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import Annotated
 from app.schemas.auth import AuthenticatedUser
 from app.models.solicitud_mongo import SolicitudMongoModel
-from app.api.dependencies import get_current_user_clinic
+from app.api.dependencies import get_current_user_clinic, limitar_escrituras
 
-from app.services.cloudinary_service import upload_image
-import cloudinary.uploader
+from app.core.autocomplete import autocompletado
+from app.db.mongodb import mongodb
+from app.services.image_service import liberar_imagen
+from app.services.outbox_worker import outbox_worker
 
 router = APIRouter()
 
 @router.delete(
     "/{solicitud_id}",
+    dependencies=[Depends(limitar_escrituras)],
     status_code=204,
     summary="Eliminar solicitud (Veterinaria)",
     description="Elimina una solicitud existente. Endpoint exclusivo para veterinarias.",
@@ -54,30 +57,29 @@ async def delete_solicitud(
         HTTPException: Si ocurre un error al procesar la solicitud o si la solicitud no existe
     """
     try:
-        # Obtener la solicitud antes de eliminarla para acceder a la imagen
-        solicitud = await SolicitudMongoModel.get_solicitud_by_id(solicitud_id)
-        if not solicitud:
-            raise HTTPException(
-                status_code=404,
-                detail="Solicitud no encontrada"
-            )
-        
-        # Eliminar imagen de Cloudinary si existe
-        if solicitud.foto_mascota:
-            try:
-                url = solicitud.foto_mascota
-                public_id = url.split("/petmatch-solicitudes/")[-1].split(".")[0]
-                cloudinary.uploader.destroy(f"petmatch-solicitudes/{public_id}")
-            except Exception as e:
-                print(f"Error eliminando imagen de Cloudinary: {str(e)}")
-                # No fallar la eliminación de la solicitud si falla la eliminación de la imagen
+        # Borrar la solicitud y soltar su referencia a la imagen en la misma
+        # transacción; si era la última, el OutboxWorker la elimina del almacenamiento
+        # en segundo plano
+        async def borrar(session):
+            solicitud = await SolicitudMongoModel.find_and_delete_solicitud(solicitud_id, session=session)
+            borrado_programado = False
+            if solicitud and solicitud.foto_mascota:
+                borrado_programado = await liberar_imagen(solicitud.foto_mascota, session=session)
+            return solicitud, borrado_programado
+
+        solicitud, borrado_programado = await mongodb.run_transaction(borrar)
+        # Ya confirmada: las lecturas que empiecen ahora no comparten una anterior
+        SolicitudMongoModel.invalidate_reads(solicitud_id)
         
-        # Eliminar la solicitud
-        if not await SolicitudMongoModel.delete_solicitud(solicitud_id):
+        if not solicitud:
             raise HTTPException(
                 status_code=404,
                 detail="Solicitud no encontrada"
             )
+        # Con la transacción confirmada: un aborto no deja el índice descontado
+        autocompletado.quitar(solicitud.model_dump())
+        if borrado_programado:
+            outbox_worker.notify()
     except HTTPException:
         raise
     except Exception as e:
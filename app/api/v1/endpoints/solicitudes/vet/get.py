@@ -1,15 +1,20 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import List, Optional, Annotated
-from app.schemas.solicitud import Solicitud
+from typing import List, Literal, Optional, Annotated
+from app.schemas.solicitud import Solicitud, SolicitudResumen
 from app.schemas.auth import AuthenticatedUser
 from app.models.solicitud_mongo import SolicitudMongoModel
 from app.constants.solicitudes import ESTADOS_PERMITIDOS
-from app.api.dependencies import get_current_user_clinic
+from app.core.autocomplete import autocompletado
+from app.api.dependencies import get_current_user_clinic, limitar_lecturas
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.get(
     "/",
+    dependencies=[Depends(limitar_lecturas)],
     response_model=List[Solicitud],
     summary="Obtener todas las solicitudes (Veterinaria)",
     description="Retorna todas las solicitudes independientemente de su estado. Endpoint exclusivo para veterinarias.",
@@ -66,7 +71,7 @@ async def get_all_solicitudes(
     try:
         return await SolicitudMongoModel.get_all_solicitudes()
     except Exception as e:
-        print(f"Error en get_all_solicitudes: {str(e)}")  # Para debugging
+        logger.exception("Error en get_all_solicitudes")
         raise HTTPException(
             status_code=500,
             detail=f"Error al obtener las solicitudes: {str(e)}"
@@ -74,6 +79,7 @@ async def get_all_solicitudes(
 
 @router.get(
     "/filtrar",
+    dependencies=[Depends(limitar_lecturas)],
     response_model=List[Solicitud],
     summary="Filtrar solicitudes por estado (Veterinaria)",
     description="Retorna las solicitudes filtradas por estado. Endpoint exclusivo para veterinarias.",
@@ -203,8 +209,161 @@ async def get_solicitudes_by_status(
             detail="Error interno del servidor al procesar la solicitud"
         )
 
+@router.get(
+    "/buscar",
+    dependencies=[Depends(limitar_lecturas)],
+    response_model=List[SolicitudResumen],
+    summary="Buscar solicitudes por texto (Veterinaria)",
+    description="Busca en el nombre de la mascota, el de la veterinaria y la descripción con stemming en español, ordenando por relevancia. Se combina con los filtros de estado y categorías. Retorna solo los campos de resumen. Endpoint exclusivo para veterinarias.",
+    responses={
+        200: {
+            "description": "Resumen de las solicitudes encontradas, de mayor a menor relevancia",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "id": "684a01e4c351aa9d49b145b8",
+                            "nombre_veterinaria": "Veterinaria San Patricio",
+                            "nombre_mascota": "Rocky",
+                            "especie": "Perro",
+                            "localidad": "Suba",
+                            "tipo_sangre": "DEA 1.1+",
+                            "urgencia": "Alta",
+                            "estado": "Activa",
+                            "fecha_creacion": "2024-02-14T10:30:00",
+                            "foto_mascota": "https://ejemplo.com/foto-rocky.jpg",
+                            "relevancia": 1.8
+                        }
+                    ]
+                }
+            }
+        },
+        500: {
+            "description": "Error interno del servidor",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Error interno del servidor al procesar la solicitud"}
+                }
+            }
+        }
+    }
+)
+async def search_solicitudes(
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_user_clinic)],
+    q: str = Query(
+        ...,
+        min_length=2,
+        max_length=200,
+        description="Términos de búsqueda en nombre de la mascota, de la veterinaria y descripción. Admite \"frase exacta\" y -exclusión",
+        examples=["anemia"]
+    ),
+    estado: Optional[str] = Query(
+        None,
+        description="Filtrar por estado. Múltiples valores separados por coma: Activa,Revision",
+        examples={"value": "Activa", "multiple": "Activa,Revision"}
+    ),
+    especie: Optional[str] = Query(
+        None,
+        description="Filtrar por especie (ej: Perro, Gato). Múltiples valores separados por coma: Perro,Gato",
+        examples={"value": "Perro", "multiple": "Perro,Gato"}
+    ),
+    tipo_sangre: Optional[str] = Query(
+        None,
+        description="Filtrar por tipo de sangre (ej: DEA 1.1+, A). Múltiples valores separados por coma: DEA 1.1+,A",
+        examples={"value": "DEA 1.1+", "multiple": "DEA 1.1+,A"}
+    ),
+    urgencia: Optional[str] = Query(
+        None,
+        description="Filtrar por nivel de urgencia (Alta, Media). Múltiples valores separados por coma: Alta,Media",
+        examples={"value": "Alta", "multiple": "Alta,Media"}
+    ),
+    localidad: Optional[str] = Query(
+        None,
+        description="Filtrar por localidad (ej: Suba, Chapinero). Múltiples valores separados por coma: Suba,Teusaquillo",
+        examples={"value": "Suba", "multiple": "Suba,Teusaquillo"}
+    ),
+    limite: int = Query(20, ge=1, le=100, description="Número máximo de resultados")
+):
+    """
+    Busca solicitudes por texto libre.
+    Endpoint exclusivo para veterinarias.
+    
+    Args:
+        q (str): Términos de búsqueda
+        estado (Optional[str]): Estado a filtrar. Múltiples valores separados por coma: "Activa,Revision"
+        especie (Optional[str]): Especie a filtrar. Múltiples valores separados por coma: "Perro,Gato"
+        tipo_sangre (Optional[str]): Tipo de sangre a filtrar. Múltiples valores separados por coma: "DEA 1.1+,A"
+        urgencia (Optional[str]): Nivel de urgencia a filtrar. Múltiples valores separados por coma: "Alta,Media"
+        localidad (Optional[str]): Localidad a filtrar. Múltiples valores separados por coma: "Suba,Teusaquillo"
+        limite (int): Número máximo de resultados
+    
+    Returns:
+        List[SolicitudResumen]: Resumen de las solicitudes encontradas, de mayor a menor relevancia
+        
+    Raises:
+        HTTPException: Si ocurre un error al procesar la solicitud
+        
+    Examples:
+        - Buscar por nombre de mascota: ?q=Rocky
+        - Buscar un diagnóstico entre las activas: ?q=anemia&estado=Activa
+    """
+    try:
+        return await SolicitudMongoModel.search_solicitudes(
+            texto=q,
+            estado=estado,
+            especie=especie,
+            tipo_sangre=tipo_sangre,
+            urgencia=urgencia,
+            localidad=localidad,
+            limite=limite
+        )
+    except Exception as e:
+        logger.exception("Error en la búsqueda de texto")
+        raise HTTPException(
+            status_code=500,
+            detail="Error interno del servidor al procesar la solicitud"
+        )
+
+@router.get(
+    "/autocompletar",
+    dependencies=[Depends(limitar_lecturas)],
+    response_model=List[str],
+    summary="Autocompletar nombres de veterinarias y mascotas (Veterinaria)",
+    description="Sugiere nombres que tienen alguna palabra que empieza por el texto escrito, sin distinguir tildes ni mayúsculas. Se sirve desde un índice en memoria, sin consultar MongoDB. Endpoint exclusivo para veterinarias.",
+    responses={
+        200: {
+            "description": "Nombres sugeridos",
+            "content": {
+                "application/json": {
+                    "example": ["Veterinaria San Patricio", "Veterinaria Santa Fe"]
+                }
+            }
+        }
+    }
+)
+async def autocomplete_nombres(
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_user_clinic)],
+    campo: Literal["nombre_veterinaria", "nombre_mascota"] = Query(..., description="Campo a autocompletar"),
+    q: str = Query(..., min_length=1, max_length=100, description="Texto escrito hasta el momento", examples=["san pa"]),
+    limite: int = Query(10, ge=1, le=50, description="Número máximo de sugerencias")
+):
+    """
+    Sugiere nombres para el texto escrito.
+    Endpoint exclusivo para veterinarias.
+    
+    Args:
+        campo (str): nombre_veterinaria o nombre_mascota
+        q (str): Texto escrito hasta el momento
+        limite (int): Número máximo de sugerencias
+    
+    Returns:
+        List[str]: Nombres sugeridos
+    """
+    return autocompletado.sugerir(campo, q, limite)
+
 @router.get(
     "/{solicitud_id}",
+    dependencies=[Depends(limitar_lecturas)],
     response_model=Solicitud,
     summary="Obtener una solicitud específica (Veterinaria)",
     description="Retorna una solicitud específica por su ID. Endpoint exclusivo para veterinarias.",
@@ -1,22 +1,30 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Body, Request, Depends
+from fastapi import APIRouter, HTTPException, Depends
 from typing import Optional, Union, Annotated
-from app.schemas.solicitud import SolicitudUpdate, SolicitudEstadoUpdate, Solicitud
+from app.schemas.solicitud import PuntoGeo, SolicitudUpdate, SolicitudEstadoUpdate, Solicitud, SolicitudUpdateInput
 from app.schemas.auth import AuthenticatedUser
 from app.models.solicitud_mongo import SolicitudMongoModel
-from app.api.dependencies import get_current_user_clinic
+from app.api.dependencies import get_current_user_clinic, get_formulario_multipart, limitar_escrituras, limitar_subidas
 
 from app.constants.solicitudes import ESTADOS_PERMITIDOS
 import json
-from app.services.cloudinary_service import upload_image
-import cloudinary.uploader
+import logging
+import secrets
+from app.db.mongodb import mongodb
+from app.services.image_service import guardar_imagen, liberar_imagen
+from app.services.outbox_worker import outbox_worker
+from app.services.upload_service import FormularioMultipart, esquema_multipart
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.patch(
     "/{solicitud_id}",
+    dependencies=[Depends(limitar_subidas)],
     response_model=Solicitud,
     summary="Actualizar solicitud (JSON o Formulario)",
     description="Actualiza los datos de una solicitud existente. Acepta tanto JSON como datos de formulario. Solo se actualizan los campos enviados. Endpoint exclusivo para veterinarias.",
+    openapi_extra=esquema_multipart(SolicitudUpdateInput, descripcion_imagen="Nueva imagen de la mascota (opcional)"),
     responses={
         200: {
             "description": "Solicitud actualizada exitosamente",
@@ -58,6 +66,14 @@ router = APIRouter()
                 }
             }
         },
+        413: {
+            "description": "La imagen excede el tamaño máximo permitido",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "La imagen excede el tamaño máximo de 5 MB"}
+                }
+            }
+        },
         500: {
             "description": "Error interno del servidor",
             "content": {
@@ -70,21 +86,21 @@ router = APIRouter()
 )
 async def update_solicitud(
     current_user: Annotated[AuthenticatedUser, Depends(get_current_user_clinic)],
-    request: Request,
     solicitud_id: str,
-    especie: Optional[str] = Form(None, description="Nueva especie de la mascota"),
-    tipo_sangre: Optional[str] = Form(None, description="Nuevo tipo de sangre requerido"),
-    urgencia: Optional[str] = Form(None, description="Nuevo nivel de urgencia"),
-    peso_minimo: Optional[Union[float, str]] = Form(None, description="Nuevo peso mínimo requerido (en kg)"),
-    descripcion_solicitud: Optional[str] = Form(None, description="Nueva descripción de la solicitud"),
-    direccion: Optional[str] = Form(None, description="Nueva dirección de la veterinaria"),
-    estado: Optional[str] = Form(None, description="Nuevo estado de la solicitud"),
-    foto_mascota: Optional[UploadFile] = File(None, description="Nueva imagen de la mascota (opcional)")
+    formulario: FormularioMultipart = Depends(get_formulario_multipart)
 ):
     try:
         solicitud_actual = await SolicitudMongoModel.get_solicitud_by_id(solicitud_id)
         if not solicitud_actual:
             raise HTTPException(status_code=404, detail="Solicitud no encontrada")
+        campos = formulario.campos
+        especie = campos.get("especie")
+        tipo_sangre = campos.get("tipo_sangre")
+        urgencia = campos.get("urgencia")
+        peso_minimo: Optional[Union[float, str]] = campos.get("peso_minimo")
+        descripcion_solicitud = campos.get("descripcion_solicitud")
+        direccion = campos.get("direccion")
+        estado = campos.get("estado")
         update_data = {}
         if especie is not None and especie != "":
             update_data["especie"] = especie
@@ -105,23 +121,60 @@ async def update_solicitud(
             update_data["direccion"] = direccion
         if estado is not None and estado != "":
             update_data["estado"] = estado
-        if foto_mascota:
-            if solicitud_actual.foto_mascota:
-                try:
-                    url = solicitud_actual.foto_mascota
-                    public_id = url.split("/petmatch-solicitudes/")[-1].split(".")[0]
-                    cloudinary.uploader.destroy(f"petmatch-solicitudes/{public_id}")
-                except Exception as e:
-                    print(f"Error eliminando imagen de Cloudinary: {str(e)}")
-            nueva_foto_url = upload_image(foto_mascota.file, public_id=solicitud_id)
-            if nueva_foto_url:
+        latitud = campos.get("latitud") or None
+        longitud = campos.get("longitud") or None
+        if latitud is not None or longitud is not None:
+            try:
+                latitud = float(latitud) if latitud is not None else None
+                longitud = float(longitud) if longitud is not None else None
+            except ValueError:
+                raise HTTPException(status_code=400, detail="latitud y longitud deben ser números válidos")
+            update_data["punto"] = PuntoGeo.desde_lat_lng(latitud, longitud)
+        foto_anterior = None
+        foto_nueva = None
+        if formulario.imagen:
+            # public_id único por subida: el recurso anterior puede estar compartido
+            # con otras solicitudes y no debe sobrescribirse
+            nueva_foto_url = await guardar_imagen(
+                formulario.imagen,
+                public_id=f"{solicitud_id}-{secrets.token_hex(4)}"
+            )
+            if nueva_foto_url and nueva_foto_url == solicitud_actual.foto_mascota:
+                # La misma imagen deduplicada: la solicitud ya tenía su referencia
+                await liberar_imagen(nueva_foto_url)
+            elif nueva_foto_url:
                 update_data["foto_mascota"] = nueva_foto_url
+                foto_nueva = nueva_foto_url
+                foto_anterior = solicitud_actual.foto_mascota
         if not update_data:
             return solicitud_actual
         solicitud_update = SolicitudUpdate(**update_data)
-        solicitud_actualizada = await SolicitudMongoModel.update_solicitud_datos(solicitud_id, solicitud_update)
+
+        async def actualizar(session):
+            solicitud_actualizada = await SolicitudMongoModel.update_solicitud_datos(solicitud_id, solicitud_update, session=session)
+            borrado_programado = False
+            if solicitud_actualizada and foto_anterior:
+                borrado_programado = await liberar_imagen(foto_anterior, session=session)
+            return solicitud_actualizada, borrado_programado
+
+        try:
+            solicitud_actualizada, borrado_programado = await mongodb.run_transaction(actualizar)
+        except Exception:
+            # Error de la base o de la transacción: se devuelve la referencia
+            # tomada por guardar_imagen y el manejador externo responde 500
+            logger.exception("Error actualizando los datos de %s", solicitud_id)
+            if foto_nueva and await liberar_imagen(foto_nueva):
+                outbox_worker.notify()
+            raise
+        # Ya confirmada: las lecturas que empiecen ahora no comparten una anterior
+        SolicitudMongoModel.invalidate_reads(solicitud_id)
         if not solicitud_actualizada:
+            # Devolver la referencia tomada por guardar_imagen para no dejarla huérfana
+            if foto_nueva and await liberar_imagen(foto_nueva):
+                outbox_worker.notify()
             raise HTTPException(status_code=404, detail="Solicitud no encontrada")
+        if borrado_programado:
+            outbox_worker.notify()
         return solicitud_actualizada
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -134,6 +187,7 @@ async def update_solicitud(
 
 @router.patch(
     "/{solicitud_id}/estado",
+    dependencies=[Depends(limitar_escrituras)],
     response_model=Solicitud,
     summary="Actualizar estado de solicitud",
     description="Actualiza el estado de una solicitud existente. Endpoint exclusivo para veterinarias.",
@@ -208,8 +262,6 @@ async def update_solicitud_estado(
         HTTPException: Si ocurre un error al procesar la solicitud, si el estado es inválido o si la solicitud no existe
     """
     try:
-        print(f"[DEBUG] update_solicitud_estado endpoint: ID={solicitud_id}, estado={estado_update.estado}")
-        
         # Validar que el estado sea válido
         if estado_update.estado not in ESTADOS_PERMITIDOS:
             raise HTTPException(
@@ -220,32 +272,26 @@ async def update_solicitud_estado(
         # Verificar que la solicitud existe antes de actualizar
         solicitud_existente = await SolicitudMongoModel.get_solicitud_by_id(solicitud_id)
         if not solicitud_existente:
-            print(f"[DEBUG] update_solicitud_estado endpoint: Solicitud no encontrada")
             raise HTTPException(
                 status_code=404,
                 detail="Solicitud no encontrada"
             )
         
-        print(f"[DEBUG] update_solicitud_estado endpoint: Solicitud encontrada, estado actual={solicitud_existente.estado}")
-        
         # Solo actualizar si el estado es diferente
         if solicitud_existente.estado == estado_update.estado:
-            print(f"[DEBUG] update_solicitud_estado endpoint: Estado ya es {estado_update.estado}, retornando solicitud actual")
             return solicitud_existente
         
         solicitud_actualizada = await SolicitudMongoModel.update_solicitud_estado(solicitud_id, estado_update.estado)
         if not solicitud_actualizada:
-            print(f"[DEBUG] update_solicitud_estado endpoint: Error en actualización")
             raise HTTPException(
                 status_code=404,
                 detail="Solicitud no encontrada"
             )
         
-        print(f"[DEBUG] update_solicitud_estado endpoint: Actualización exitosa")
+        logger.debug("Estado de %s: %s -> %s", solicitud_id, solicitud_existente.estado, estado_update.estado)
         return solicitud_actualizada
         
     except ValueError as e:
-        print(f"[DEBUG] update_solicitud_estado endpoint: ValueError - {e}")
         raise HTTPException(
             status_code=400,
             detail=str(e)
@@ -253,7 +299,7 @@ async def update_solicitud_estado(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[DEBUG] update_solicitud_estado endpoint: Exception - {e}")
+        logger.exception("Error actualizando el estado de %s", solicitud_id)
         raise HTTPException(
             status_code=500,
             detail="Error interno del servidor al procesar la solicitud"
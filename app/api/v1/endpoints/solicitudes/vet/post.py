@@ -1,11 +1,18 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Body
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from typing import Annotated
-from app.schemas.solicitud import Solicitud, SolicitudCreate, SolicitudCreateWithImage, SolicitudCreateInput
+from app.schemas.solicitud import PuntoGeo, Solicitud, SolicitudCreate, SolicitudCreateWithImage, SolicitudCreateInput, SolicitudUpdate
+from app.schemas.imagen import FirmaSubidaImagen, ConfirmacionSubidaImagen
 from app.schemas.auth import AuthenticatedUser
 from app.models.solicitud_mongo import SolicitudMongoModel
-from app.api.dependencies import get_current_user_clinic
+from app.api.dependencies import get_current_user_clinic, get_formulario_multipart, limitar_escrituras, limitar_subidas
 
-from app.services.cloudinary_service import upload_image
+from app.core.autocomplete import autocompletado
+from app.db.mongodb import mongodb
+from app.services.image_service import guardar_imagen, retener_imagen, liberar_imagen, firmar_subida, verificar_subida
+from app.services.outbox_worker import outbox_worker
+from app.services.upload_service import FormularioMultipart, esquema_multipart
 from datetime import datetime
 import secrets
 import json
@@ -13,40 +20,27 @@ import json
 router = APIRouter()
 
 def get_solicitud_create_input(
-    nombre_veterinaria: str = Form(..., description="Nombre de la veterinaria o clínica"),
-    nombre_mascota: str = Form(..., description="Nombre de la mascota que necesita la donación"),
-    especie: str = Form(..., description="Especie de la mascota (Perro, Gato, etc.)"),
-    localidad: str = Form(..., description="Localidad donde se encuentra la veterinaria"),
-    descripcion_solicitud: str = Form(..., description="Descripción detallada de la solicitud y situación de la mascota"),
-    direccion: str = Form(..., description="Dirección física de la veterinaria"),
-    ubicacion: str = Form(..., description="Ubicación específica (barrio, ciudad)"),
-    contacto: str = Form(..., description="Número de teléfono o contacto de la veterinaria"),
-    peso_minimo: float = Form(..., description="Peso mínimo requerido para el donante (en kg)"),
-    tipo_sangre: str = Form(..., description="Tipo de sangre requerido para la donación"),
-    urgencia: str = Form(..., description="Nivel de urgencia (Alta, Media, Baja)")
+    formulario: FormularioMultipart = Depends(get_formulario_multipart)
 ) -> SolicitudCreateInput:
-    return SolicitudCreateInput(
-        nombre_veterinaria=nombre_veterinaria,
-        nombre_mascota=nombre_mascota,
-        especie=especie,
-        localidad=localidad,
-        descripcion_solicitud=descripcion_solicitud,
-        direccion=direccion,
-        ubicacion=ubicacion,
-        contacto=contacto,
-        peso_minimo=peso_minimo,
-        tipo_sangre=tipo_sangre,
-        urgencia=urgencia
-    )
+    """
+    Valida los campos de texto del formulario leído por streaming.
+    Los errores se reportan con el mismo formato 422 que los parámetros Form().
+    """
+    try:
+        return SolicitudCreateInput(**formulario.campos)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
 
 
 
 @router.post(
     "/",
+    dependencies=[Depends(limitar_subidas)],
     response_model=Solicitud,
     status_code=201,
     summary="Crear solicitud de donación",
     description="Crea una nueva solicitud de donación de sangre. Puede incluir imagen de la mascota. Endpoint exclusivo para veterinarias.",
+    openapi_extra=esquema_multipart(SolicitudCreateInput),
     responses={
         201: {
             "description": "Solicitud creada exitosamente",
@@ -80,6 +74,14 @@ def get_solicitud_create_input(
                 }
             }
         },
+        413: {
+            "description": "La imagen excede el tamaño máximo permitido",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "La imagen excede el tamaño máximo de 5 MB"}
+                }
+            }
+        },
         422: {
             "description": "Error de validación",
             "content": {
@@ -101,7 +103,7 @@ def get_solicitud_create_input(
 async def create_solicitud(
     current_user: Annotated[AuthenticatedUser, Depends(get_current_user_clinic)],
     solicitud_data: SolicitudCreateInput = Depends(get_solicitud_create_input),
-    foto_mascota: UploadFile = File(None, description="Imagen de la mascota (opcional)")
+    formulario: FormularioMultipart = Depends(get_formulario_multipart)
 ):
     """
     Crea una nueva solicitud de donación de sangre.
@@ -110,7 +112,8 @@ async def create_solicitud(
     
     Args:
         solicitud_data (SolicitudCreateInput): Datos de la solicitud
-        foto_mascota (UploadFile): Imagen de la mascota (opcional)
+        formulario (FormularioMultipart): Formulario leído por streaming; incluye
+            la imagen de la mascota (campo foto_mascota, opcional)
     
     Returns:
         Solicitud: Solicitud creada
@@ -120,22 +123,23 @@ async def create_solicitud(
     """
     try:
         # Validar datos usando el esquema
-        solicitud_validada = SolicitudCreateWithImage(**solicitud_data.model_dump())
+        solicitud_validada = SolicitudCreateWithImage(
+            **solicitud_data.model_dump(exclude={"latitud", "longitud"}),
+            punto=PuntoGeo.desde_lat_lng(solicitud_data.latitud, solicitud_data.longitud)
+        )
         
-        # Subir imagen si se proporcionó
+        # Subir imagen si se proporcionó (las imágenes ya conocidas por su hash se reutilizan)
         foto_url = None
-        if foto_mascota:
-            # Generar un ID en formato hexadecimal de 24 caracteres
-            solicitud_id = secrets.token_hex(12)  # 12 bytes = 24 caracteres hexadecimales
+        # Generar un ID en formato hexadecimal de 24 caracteres
+        solicitud_id = secrets.token_hex(12)  # 12 bytes = 24 caracteres hexadecimales
+        if formulario.imagen:
             try:
-                foto_url = upload_image(foto_mascota.file, public_id=solicitud_id)
+                foto_url = await guardar_imagen(formulario.imagen, public_id=solicitud_id)
             except Exception as e:
                 raise HTTPException(
                     status_code=400,
                     detail=f"Error al subir la imagen: {str(e)}"
                 )
-        else:
-            solicitud_id = secrets.token_hex(12)
         # Crear la solicitud con el ID y fecha específicos
         nueva_solicitud = {
             "id": solicitud_id,
@@ -144,11 +148,248 @@ async def create_solicitud(
             "foto_mascota": foto_url,
             **solicitud_validada.model_dump()
         }
-        return await SolicitudMongoModel.create_solicitud(nueva_solicitud)
+        try:
+            solicitud = await SolicitudMongoModel.create_solicitud(nueva_solicitud)
+        except Exception:
+            # Devolver la referencia a la imagen para no dejarla huérfana
+            if foto_url:
+                await liberar_imagen(foto_url)
+            raise
+        autocompletado.agregar(solicitud.model_dump())
+        return solicitud
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al crear la solicitud: {str(e)}"
+        )
+
+@router.post(
+    "/json",
+    dependencies=[Depends(limitar_escrituras)],
+    response_model=Solicitud,
+    status_code=201,
+    summary="Crear solicitud de donación (JSON)",
+    description="Crea una nueva solicitud de donación de sangre a partir de un cuerpo JSON, sin formulario multipart. foto_mascota puede omitirse o ser la URL de una imagen ya subida (por ejemplo, con /foto/firma o en otra solicitud). Endpoint exclusivo para veterinarias.",
+    responses={
+        201: {
+            "description": "Solicitud creada exitosamente"
+        },
+        422: {
+            "description": "Error de validación",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Error de validación en los datos de la solicitud"}
+                }
+            }
+        },
+        500: {
+            "description": "Error interno del servidor",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Error interno del servidor al procesar la solicitud"}
+                }
+            }
+        }
+    }
+)
+async def create_solicitud_json(
+    solicitud_data: SolicitudCreate,
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_user_clinic)]
+):
+    """
+    Crea una nueva solicitud de donación de sangre desde un cuerpo JSON.
+    Endpoint exclusivo para veterinarias.
+    
+    Args:
+        solicitud_data (SolicitudCreate): Datos de la solicitud, validados una sola vez
+    
+    Returns:
+        Solicitud: Solicitud creada
+        
+    Raises:
+        HTTPException: Si ocurre un error al procesar la solicitud
+    """
+    try:
+        nueva_solicitud = {
+            "id": secrets.token_hex(12),
+            "fecha_creacion": datetime.now().isoformat(),
+            "estado": "Activa",
+            **solicitud_data.model_dump()
+        }
+        foto_url = nueva_solicitud["foto_mascota"]
+        if foto_url:
+            # La imagen pasa a ser compartida: sumar la referencia de esta solicitud
+            await retener_imagen(foto_url)
+        try:
+            solicitud = await SolicitudMongoModel.create_solicitud(nueva_solicitud)
+        except Exception:
+            if foto_url:
+                await liberar_imagen(foto_url)
+            raise
+        autocompletado.agregar(solicitud.model_dump())
+        return solicitud
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error al crear la solicitud: {str(e)}"
         )
 
- 
\ No newline at end of file
+@router.post(
+    "/{solicitud_id}/foto/firma",
+    dependencies=[Depends(limitar_subidas)],
+    response_model=FirmaSubidaImagen,
+    summary="Firmar subida directa de imagen",
+    description="Emite parámetros firmados y de corta duración para que el cliente suba la imagen de la mascota directamente al almacenamiento, sin que los bytes pasen por la API. Tras subirla, el cliente debe llamar a /foto/confirmar. Endpoint exclusivo para veterinarias.",
+    responses={
+        200: {
+            "description": "Parámetros de subida firmados",
+        },
+        404: {
+            "description": "Solicitud no encontrada",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Solicitud no encontrada"}
+                }
+            }
+        },
+        501: {
+            "description": "El almacenamiento configurado no admite subidas directas",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "El almacenamiento 'local' no admite subidas directas"}
+                }
+            }
+        }
+    }
+)
+async def firmar_subida_foto(
+    solicitud_id: str,
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_user_clinic)]
+):
+    """
+    Emite la firma para subir la imagen de una solicitud directamente al almacenamiento.
+    Endpoint exclusivo para veterinarias.
+    
+    Args:
+        solicitud_id (str): ID de la solicitud
+    
+    Returns:
+        FirmaSubidaImagen: URL, campos firmados y expiración de la subida
+        
+    Raises:
+        HTTPException: Si la solicitud no existe o el almacenamiento no admite subidas directas
+    """
+    if not await SolicitudMongoModel.get_solicitud_by_id(solicitud_id):
+        raise HTTPException(
+            status_code=404,
+            detail="Solicitud no encontrada"
+        )
+    try:
+        return firmar_subida(solicitud_id)
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+@router.post(
+    "/{solicitud_id}/foto/confirmar",
+    dependencies=[Depends(limitar_escrituras)],
+    response_model=Solicitud,
+    summary="Confirmar subida directa de imagen",
+    description="Registra como foto_mascota la imagen subida directamente al almacenamiento, tras verificar la firma de la respuesta. Endpoint exclusivo para veterinarias.",
+    responses={
+        200: {
+            "description": "Imagen registrada en la solicitud"
+        },
+        400: {
+            "description": "Firma inválida, expirada o de otra solicitud",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "La firma de la subida no es válida"}
+                }
+            }
+        },
+        404: {
+            "description": "Solicitud no encontrada",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Solicitud no encontrada"}
+                }
+            }
+        },
+        501: {
+            "description": "El almacenamiento configurado no admite subidas directas",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "El almacenamiento 'local' no admite subidas directas"}
+                }
+            }
+        }
+    }
+)
+async def confirmar_subida_foto(
+    solicitud_id: str,
+    confirmacion: ConfirmacionSubidaImagen,
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_user_clinic)]
+):
+    """
+    Verifica una subida directa y la registra como foto de la solicitud.
+    Endpoint exclusivo para veterinarias.
+    
+    Args:
+        solicitud_id (str): ID de la solicitud
+        confirmacion (ConfirmacionSubidaImagen): Respuesta del almacenamiento reenviada por el cliente
+    
+    Returns:
+        Solicitud: Solicitud con la nueva imagen
+        
+    Raises:
+        HTTPException: Si la firma no es válida, la solicitud no existe o el almacenamiento
+            no admite subidas directas
+    """
+    solicitud_actual = await SolicitudMongoModel.get_solicitud_by_id(solicitud_id)
+    if not solicitud_actual:
+        raise HTTPException(
+            status_code=404,
+            detail="Solicitud no encontrada"
+        )
+    try:
+        foto_url = verificar_subida(solicitud_id, confirmacion.model_dump())
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if solicitud_actual.foto_mascota == foto_url:
+        return solicitud_actual
+
+    async def reemplazar(session):
+        solicitud_actualizada = await SolicitudMongoModel.update_solicitud_datos(
+            solicitud_id,
+            SolicitudUpdate(foto_mascota=foto_url),
+            session=session
+        )
+        borrado_programado = False
+        if solicitud_actualizada and solicitud_actual.foto_mascota:
+            borrado_programado = await liberar_imagen(solicitud_actual.foto_mascota, session=session)
+        return solicitud_actualizada, borrado_programado
+
+    await retener_imagen(foto_url)
+    try:
+        solicitud_actualizada, borrado_programado = await mongodb.run_transaction(reemplazar)
+    except Exception:
+        if await liberar_imagen(foto_url):
+            outbox_worker.notify()
+        raise
+    # Ya confirmada: las lecturas que empiecen ahora no comparten una anterior
+    SolicitudMongoModel.invalidate_reads(solicitud_id)
+    if not solicitud_actualizada:
+        if await liberar_imagen(foto_url):
+            outbox_worker.notify()
+        raise HTTPException(
+            status_code=404,
+            detail="Solicitud no encontrada"
+        )
+    if borrado_programado:
+        outbox_worker.notify()
+    return solicitud_actualizada
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Tuple
 
 # Estados permitidos
 ESTADOS_PERMITIDOS: List[str] = [
@@ -23,6 +23,47 @@ TIPOS_SANGRE_PERMITIDOS: List[str] = [
     'AB'
 ]
 
+# Tipos de sangre de cada especie
+TIPOS_SANGRE_POR_ESPECIE: Dict[str, List[str]] = {
+    'Perro': ['DEA 1.1+', 'DEA 1.1-'],
+    'Gato': ['A', 'B', 'AB']
+}
+
+# Receptores que puede recibir cada tipo de sangre donante, por especie.
+# Perros: DEA 1.1- es donante universal; DEA 1.1+ solo dona a DEA 1.1+.
+# Gatos: A y B tienen aloanticuerpos naturales y solo se cruzan consigo
+# mismos; un receptor AB admite sangre AB o, en su defecto, A.
+_RECEPTORES_POR_DONANTE: Dict[str, Dict[str, List[str]]] = {
+    'Perro': {
+        'DEA 1.1-': ['DEA 1.1-', 'DEA 1.1+'],
+        'DEA 1.1+': ['DEA 1.1+']
+    },
+    'Gato': {
+        'A': ['A', 'AB'],
+        'B': ['B'],
+        'AB': ['AB']
+    }
+}
+
+def _construir_compatibilidad() -> Dict[Tuple[str, str], Tuple[str, ...]]:
+    """
+    Tabla (especie, tipo donante) -> tipos receptores, con el mismo tipo
+    primero. Falla al importar si no cubre TIPOS_SANGRE_PERMITIDOS
+    """
+    tabla = {}
+    for especie, tipos in TIPOS_SANGRE_POR_ESPECIE.items():
+        for donante in tipos:
+            receptores = _RECEPTORES_POR_DONANTE[especie][donante]
+            if not set(receptores) <= set(tipos):
+                raise ValueError(f"Receptores de otra especie para {especie} {donante}")
+            tabla[(especie, donante)] = tuple(sorted(receptores, key=lambda r: r != donante))
+    if {tipo for _, tipo in tabla} != set(TIPOS_SANGRE_PERMITIDOS):
+        raise ValueError("Hay tipos de sangre sin compatibilidad definida")
+    return tabla
+
+# Precalculada al importar: el matching no evalúa reglas por petición
+COMPATIBILIDAD_SANGRE: Dict[Tuple[str, str], Tuple[str, ...]] = _construir_compatibilidad()
+
 # Niveles de urgencia permitidos
 URGENCIAS_PERMITIDAS: List[str] = [
     'Alta',
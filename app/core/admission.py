@@ -0,0 +1,161 @@
+"""
+Control de admisión con descarte adaptativo según el retardo de cola.
+
+AdmissionControlMiddleware limita las peticiones en curso por worker
+(ADMISSION_MAX_CONCURRENCY); las que llegan con todos los puestos ocupados
+esperan en una cola donde las de prioridad alta pasan primero. Cada petición
+admitida registra cuánto esperó (sojourn time) y un controlador al estilo
+CoDel decide cuándo hay una cola persistente: si el retardo no baja de
+ADMISSION_TARGET_DELAY_MS durante todo un ADMISSION_INTERVAL_MS, entra en
+modo descarte y responde 503 a las peticiones de prioridad baja (lecturas
+como el feed que las apps consultan periódicamente) en lugar de dejar que
+todas agoten su timeout. Las escrituras de veterinaria siguen admitiéndose.
+Sale del modo descarte en cuanto una petición espera menos que el objetivo.
+
+Durante una degradación de Atlas las peticiones retienen sus puestos más
+tiempo, la cola crece y el feed falla rápido mientras las escrituras siguen
+entrando.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+from app.core.config import settings
+from app.core.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DELAY, ADMISSION_SHED
+from app.core.server_timing import fase
+
+PRIORIDAD_ALTA = "high"
+PRIORIDAD_BAJA = "low"
+
+# Rutas que nunca pasan por el control: sondeos y observabilidad
+_RUTAS_EXENTAS = ("/health", "/metrics")
+
+_CUERPO_503 = json.dumps({"detail": "Servicio saturado. Intente de nuevo en unos segundos."}).encode()
+
+def prioridad(scope: Dict) -> str:
+    """Lecturas de la API: prioridad baja; escrituras y el resto: alta"""
+    if scope["method"] in ("GET", "HEAD") and scope["path"].startswith(settings.API_V1_STR):
+        return PRIORIDAD_BAJA
+    return PRIORIDAD_ALTA
+
+class CoDel:
+    """
+    Detector de cola persistente de CoDel: la cola es mala cuando el retardo
+    mínimo observado supera el objetivo durante un intervalo completo
+
+    Args:
+        objetivo (float): Retardo de cola aceptable en segundos
+        intervalo (float): Tiempo que debe mantenerse por encima para descartar
+    """
+
+    def __init__(self, objetivo: float, intervalo: float):
+        self.objetivo = objetivo
+        self.intervalo = intervalo
+        self.descartando = False
+        self._por_encima_desde = 0.0
+
+    def observar(self, espera: float, ahora: float) -> bool:
+        """
+        Registra el retardo de una petición admitida
+
+        Returns:
+            bool: True si está en modo descarte
+        """
+        if espera < self.objetivo:
+            self._por_encima_desde = 0.0
+            self.descartando = False
+        elif self._por_encima_desde == 0.0:
+            self._por_encima_desde = ahora + self.intervalo
+        elif ahora >= self._por_encima_desde:
+            self.descartando = True
+        return self.descartando
+
+class AdmissionControlMiddleware:
+    """Middleware ASGI de admisión con cola por prioridad y descarte CoDel"""
+
+    def __init__(self, app):
+        self.app = app
+        self.max_en_curso = settings.ADMISSION_MAX_CONCURRENCY
+        self.max_cola = settings.ADMISSION_MAX_QUEUE
+        self.codel = CoDel(settings.ADMISSION_TARGET_DELAY_MS / 1000, settings.ADMISSION_INTERVAL_MS / 1000)
+        self.en_curso = 0
+        self._colas: Dict[str, Deque[Tuple[asyncio.Future, float]]] = {
+            PRIORIDAD_ALTA: deque(),
+            PRIORIDAD_BAJA: deque()
+        }
+
+    def _en_cola(self) -> int:
+        return len(self._colas[PRIORIDAD_ALTA]) + len(self._colas[PRIORIDAD_BAJA])
+
+    async def _adquirir(self, nivel: str) -> float:
+        """Espera un puesto libre y retorna los segundos de espera"""
+        llegada = time.perf_counter()
+        if self.en_curso < self.max_en_curso and not self._en_cola():
+            self.en_curso += 1
+            return 0.0
+        futuro = asyncio.get_running_loop().create_future()
+        entrada = (futuro, llegada)
+        self._colas[nivel].append(entrada)
+        try:
+            with fase("queue"):
+                await futuro
+        except asyncio.CancelledError:
+            # El cliente se fue: si ya se le había cedido el puesto, se devuelve
+            if futuro.done() and not futuro.cancelled():
+                self._liberar()
+            elif entrada in self._colas[nivel]:
+                self._colas[nivel].remove(entrada)
+            raise
+        return time.perf_counter() - llegada
+
+    def _liberar(self) -> None:
+        """Cede el puesto a la siguiente petición en cola (primero las de prioridad alta)"""
+        for nivel in (PRIORIDAD_ALTA, PRIORIDAD_BAJA):
+            cola = self._colas[nivel]
+            while cola:
+                futuro, _ = cola.popleft()
+                if not futuro.done():
+                    futuro.set_result(None)
+                    return
+        self.en_curso -= 1
+
+    async def _rechazar(self, send, nivel: str) -> None:
+        ADMISSION_SHED.inc(priority=nivel)
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(_CUERPO_503)).encode()),
+                (b"retry-after", b"1")
+            ]
+        })
+        await send({"type": "http.response.body", "body": _CUERPO_503})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(_RUTAS_EXENTAS):
+            await self.app(scope, receive, send)
+            return
+
+        nivel = prioridad(scope)
+        # En modo descarte con cola, o con la cola llena, las de prioridad baja
+        # fallan sin esperar; con la cola vacía pasan y su espera nula cierra
+        # el modo descarte
+        en_cola = self._en_cola()
+        if nivel == PRIORIDAD_BAJA and ((self.codel.descartando and en_cola) or en_cola >= self.max_cola):
+            await self._rechazar(send, nivel)
+            return
+
+        espera = await self._adquirir(nivel)
+        ADMISSION_QUEUE_DELAY.observe(espera, priority=nivel)
+        ADMISSION_IN_FLIGHT.set(self.en_curso)
+        try:
+            if self.codel.observar(espera, time.perf_counter()) and nivel == PRIORIDAD_BAJA:
+                await self._rechazar(send, nivel)
+                return
+            await self.app(scope, receive, send)
+        finally:
+            self._liberar()
+            ADMISSION_IN_FLIGHT.set(self.en_curso)
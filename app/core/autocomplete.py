@@ -0,0 +1,178 @@
+"""
+Índice en memoria para autocompletar nombres de veterinarias y mascotas.
+
+Cada campo guarda un arreglo ordenado de pares (clave normalizada, nombre):
+una sugerencia es una búsqueda binaria del prefijo y un recorrido de las
+claves que empiezan por él, sin consultas a MongoDB por pulsación. La
+normalización quita tildes y mayúsculas, y cada nombre se indexa también
+desde cada una de sus palabras, así que "patri" sugiere
+"Veterinaria San Patricio".
+
+Un contador por nombre permite quitarlo del índice solo cuando deja de
+usarlo la última solicitud. El índice es por proceso: los endpoints lo
+actualizan en el worker que atiende la escritura, una vez confirmada, y la
+reconstrucción periódica (app/services/autocomplete_service.py) alinea al
+resto.
+"""
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Campos de la solicitud con autocompletado
+CAMPOS_AUTOCOMPLETADO = ("nombre_veterinaria", "nombre_mascota")
+
+# Palabras de un nombre desde las que se indexa
+MAX_PALABRAS = 8
+
+_PALABRA = re.compile(r"\w+")
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sin tildes y con las palabras separadas por un espacio"""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(_PALABRA.findall(sin_tildes.casefold()))
+
+def _claves(nombre: str) -> List[str]:
+    """Clave del nombre completo y de cada sufijo que empieza en una palabra"""
+    palabras = normalizar(nombre).split(" ")[:MAX_PALABRAS]
+    return [" ".join(palabras[i:]) for i in range(len(palabras)) if palabras[i]]
+
+def _clave_documento(documento: Dict) -> str:
+    """_id del documento leído de MongoDB o id del esquema Solicitud"""
+    return str(documento.get("_id", documento.get("id")))
+
+class IndicePrefijos:
+    """Nombres de un campo ordenados por clave normalizada"""
+
+    def __init__(self):
+        self._entradas: List[Tuple[str, str]] = []
+        self._conteo: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._conteo)
+
+    def agregar(self, nombre: str) -> None:
+        nombre = nombre.strip()
+        if not nombre:
+            return
+        conteo = self._conteo.get(nombre, 0)
+        self._conteo[nombre] = conteo + 1
+        if conteo == 0:
+            for clave in _claves(nombre):
+                insort(self._entradas, (clave, nombre))
+
+    def quitar(self, nombre: str) -> None:
+        nombre = nombre.strip()
+        conteo = self._conteo.get(nombre)
+        if conteo is None:
+            return
+        if conteo > 1:
+            self._conteo[nombre] = conteo - 1
+            return
+        del self._conteo[nombre]
+        for clave in _claves(nombre):
+            i = bisect_left(self._entradas, (clave, nombre))
+            if i < len(self._entradas) and self._entradas[i] == (clave, nombre):
+                del self._entradas[i]
+
+    def sugerir(self, prefijo: str, limite: int) -> List[str]:
+        """Hasta `limite` nombres distintos con alguna palabra que empieza por el prefijo"""
+        prefijo = normalizar(prefijo)
+        if not prefijo:
+            return []
+        sugerencias: List[str] = []
+        vistos = set()
+        i = bisect_left(self._entradas, (prefijo,))
+        while i < len(self._entradas) and len(sugerencias) < limite:
+            clave, nombre = self._entradas[i]
+            if not clave.startswith(prefijo):
+                break
+            if nombre not in vistos:
+                vistos.add(nombre)
+                sugerencias.append(nombre)
+            i += 1
+        return sugerencias
+
+class Autocompletado:
+    """
+    Índices de todos los campos de autocompletado
+
+    Durante una reconstrucción se registra, por _id, la última escritura que
+    llega mientras se leen los documentos. Al terminar se aplica sobre el
+    índice nuevo solo si la lectura no la reflejó ya: una creación cuyo
+    documento se leyó, o una eliminación de uno que no se leyó, no se cuentan
+    dos veces.
+    """
+
+    def __init__(self, campos: Iterable[str] = CAMPOS_AUTOCOMPLETADO):
+        self.campos = tuple(campos)
+        self._indices: Dict[str, IndicePrefijos] = {campo: IndicePrefijos() for campo in self.campos}
+        self._pendientes: Optional[Dict[str, Tuple[bool, Dict]]] = None
+        self.listo = False
+
+    def agregar(self, documento: Dict) -> None:
+        """Registra los nombres de una solicitud creada; llamar tras confirmar la escritura"""
+        self._registrar(True, documento)
+
+    def quitar(self, documento: Dict) -> None:
+        """Descuenta los nombres de una solicitud eliminada; llamar tras confirmar la escritura"""
+        self._registrar(False, documento)
+
+    def _registrar(self, agregar: bool, documento: Dict) -> None:
+        if self._pendientes is not None:
+            self._pendientes[_clave_documento(documento)] = (agregar, documento)
+        self._aplicar(agregar, documento, self._indices)
+
+    def _aplicar(self, agregar: bool, documento: Dict, indices: Dict[str, IndicePrefijos]) -> None:
+        for campo in self.campos:
+            valor = documento.get(campo)
+            if isinstance(valor, str):
+                if agregar:
+                    indices[campo].agregar(valor)
+                else:
+                    indices[campo].quitar(valor)
+
+    def iniciar_reconstruccion(self) -> None:
+        """Empieza a registrar las escrituras; llamar antes de leer la colección"""
+        self._pendientes = {}
+
+    def reconstruir(self, documentos: Iterable[Dict]) -> None:
+        """Sustituye los índices por unos construidos con los documentos leídos (con su _id)"""
+        indices = {campo: IndicePrefijos() for campo in self.campos}
+        leidos = set()
+        for documento in documentos:
+            leidos.add(_clave_documento(documento))
+            self._aplicar(True, documento, indices)
+        for clave, (agregar, documento) in (self._pendientes or {}).items():
+            # Solo falta aplicar lo que la lectura no vio: una creación no
+            # leída o una eliminación de un documento que sí se leyó
+            if agregar != (clave in leidos):
+                self._aplicar(agregar, documento, indices)
+        self._indices = indices
+        self._pendientes = None
+        self.listo = True
+
+    def cancelar_reconstruccion(self) -> None:
+        self._pendientes = None
+
+    def sugerir(self, campo: str, prefijo: str, limite: int = 10) -> List[str]:
+        """
+        Sugerencias para un prefijo
+
+        Args:
+            campo (str): Uno de CAMPOS_AUTOCOMPLETADO
+            prefijo (str): Texto escrito hasta el momento
+            limite (int): Número máximo de sugerencias
+
+        Returns:
+            List[str]: Nombres tal como están guardados, en orden alfabético de la palabra coincidente
+        """
+        return self._indices[campo].sugerir(prefijo, limite)
+
+    def tamano(self) -> Dict[str, int]:
+        """Nombres distintos por campo"""
+        return {campo: len(indice) for campo, indice in self._indices.items()}
+
+# Instancia global del proceso
+autocompletado = Autocompletado()
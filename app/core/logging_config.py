@@ -0,0 +1,172 @@
+"""
+Logging estructurado en JSON, no bloqueante y correlacionado por petición.
+
+- Nivel según LOG_LEVEL o, si no se define, DEBUG con Settings.DEBUG y INFO
+  en otro caso: las llamadas por debajo del nivel se descartan antes de crear
+  el registro, así que logger.debug("...%s", x) no cuesta formateo en producción.
+- Los registros se encolan (QueueHandler) y un hilo aparte los formatea y
+  escribe en stdout: el event loop nunca espera por la E/S del log.
+- Cada registro lleva el request_id de la petición en curso (contextvar
+  fijada por RequestContextMiddleware, que además devuelve X-Request-ID).
+- El access log se muestrea (ACCESS_LOG_SAMPLE_RATE); los errores 5xx y las
+  peticiones más lentas que ACCESS_LOG_SLOW_MS se registran siempre. Los
+  sondeos de /health solo se registran en esos dos casos.
+"""
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.core.config import settings
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# Atributos propios de LogRecord: el resto son campos pasados con extra={...}
+_ATRIBUTOS_RECORD = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[QueueListener] = None
+
+access_logger = logging.getLogger("app.access")
+
+class RequestIdFilter(logging.Filter):
+    """Copia el request_id del contexto al registro en el hilo que lo emite"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro con los campos extra incluidos"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-")
+        }
+        for clave, valor in record.__dict__.items():
+            if clave not in _ATRIBUTOS_RECORD:
+                datos[clave] = valor
+        if record.exc_info:
+            datos["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler que encola el registro sin formatearlo: el mensaje se
+    construye en el hilo del listener, fuera del camino de la petición
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+def _nivel() -> int:
+    if settings.LOG_LEVEL:
+        return logging.getLevelNamesMapping()[settings.LOG_LEVEL]
+    # DEBUG solo en desarrollo: staging y producción no pagan los registros de
+    # depuración por petición aunque DEBUG quede en su valor por defecto
+    if settings.APP_ENV == "development" and settings.DEBUG:
+        return logging.DEBUG
+    return logging.INFO
+
+def configure_logging() -> None:
+    """
+    Configura el logger "app" (idempotente)
+
+    Los registros de app.* pasan por una cola hacia un StreamHandler en
+    stdout con formato JSON, o texto legible si LOG_FORMAT=text.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    salida = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        salida.setFormatter(JsonFormatter())
+    else:
+        salida.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+        ))
+
+    cola: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    handler = _NonBlockingQueueHandler(cola)
+    handler.addFilter(RequestIdFilter())
+
+    logger = logging.getLogger("app")
+    logger.handlers = [handler]
+    logger.setLevel(_nivel())
+    logger.propagate = False
+
+    _listener = QueueListener(cola, salida, respect_handler_level=False)
+    _listener.start()
+
+def shutdown_logging() -> None:
+    """Vacía la cola y detiene el hilo del listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+class RequestContextMiddleware:
+    """
+    Middleware ASGI que asigna un request_id a cada petición y escribe el
+    access log muestreado
+
+    Reutiliza el header X-Request-ID entrante (p. ej. el del proxy de Fly)
+    o genera uno nuevo, y lo devuelve en la respuesta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for nombre, valor in scope["headers"]:
+            if nombre == b"x-request-id":
+                request_id = valor.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+            if (
+                status["code"] >= 500
+                or duracion_ms >= settings.ACCESS_LOG_SLOW_MS
+                or (random.random() < settings.ACCESS_LOG_SAMPLE_RATE and not scope["path"].startswith("/health"))
+            ):
+                access_logger.info(
+                    "%s %s %s %.1fms",
+                    scope["method"], scope["path"], status["code"], duracion_ms,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status["code"],
+                        "duration_ms": round(duracion_ms, 1)
+                    }
+                )
+            request_id_var.reset(token)
@@ -0,0 +1,316 @@
+"""
+Métricas en proceso con exposición en formato Prometheus.
+
+El registro es propio y mínimo para no añadir dependencias: contadores,
+gauges e histogramas con etiquetas, protegidos por un lock porque los
+listeners de pymongo se ejecutan en hilos del driver. Observar un valor es
+una búsqueda binaria en los buckets y una suma bajo el lock; el coste de
+formatear solo se paga al consultar /metrics.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+
+# Buckets en segundos, de 1 ms a 10 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pares = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    tipo = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lineas = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.tipo}"]
+        lineas.extend(self._samples())
+        return "\n".join(lineas)
+
+class Counter(_Metric):
+    tipo = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Gauge(Counter):
+    tipo = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    tipo = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por cada combinación de etiquetas: [conteos por bucket..., +Inf], suma
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        indice = bisect_left(self.buckets, value)
+        with self._lock:
+            estado = self._values.get(key)
+            if estado is None:
+                estado = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[key] = estado
+            estado[0][indice] += 1
+            estado[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observa la duración del bloque en segundos"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - inicio, **labels)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = [(key, list(conteos), suma[0]) for key, (conteos, suma) in self._values.items()]
+        for key, conteos, suma in items:
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + (float("inf"),), conteos):
+                acumulado += conteo
+                le = f'le="{_format_value(limite)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {acumulado}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(suma)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {acumulado}"
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Todas las métricas en formato de exposición de texto de Prometheus"""
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+registry = Registry()
+
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Duración de las peticiones HTTP por ruta, método y estado",
+    ("method", "route", "status")
+))
+MONGO_COMMAND_DURATION = registry.register(Histogram(
+    "mongodb_command_duration_seconds",
+    "Duración de los comandos de MongoDB por colección y operación",
+    ("collection", "command", "outcome")
+))
+MONGO_POOL_CHECKOUT_DURATION = registry.register(Histogram(
+    "mongodb_pool_checkout_duration_seconds",
+    "Espera para obtener una conexión del pool de MongoDB",
+    ("outcome",)
+))
+MONGO_POOL_CONNECTIONS = registry.register(Gauge(
+    "mongodb_pool_connections",
+    "Conexiones abiertas en el pool de MongoDB por servidor",
+    ("address",)
+))
+STORAGE_OPERATION_DURATION = registry.register(Histogram(
+    "storage_operation_duration_seconds",
+    "Duración de las llamadas al almacenamiento de imágenes (Cloudinary o disco)",
+    ("backend", "operation", "outcome")
+))
+CACHE_REQUESTS = registry.register(Counter(
+    "cache_requests_total",
+    "Consultas a cachés de la aplicación por resultado (hit/miss)",
+    ("cache", "result")
+))
+ADMISSION_IN_FLIGHT = registry.register(Gauge(
+    "admission_in_flight_requests",
+    "Peticiones en curso admitidas por el control de admisión",
+))
+ADMISSION_QUEUE_DELAY = registry.register(Histogram(
+    "admission_queue_delay_seconds",
+    "Espera en la cola de admisión antes de empezar a atender la petición",
+    ("priority",)
+))
+ADMISSION_SHED = registry.register(Counter(
+    "admission_shed_total",
+    "Peticiones rechazadas con 503 por el control de admisión",
+    ("priority",)
+))
+RATE_LIMIT_REJECTIONS = registry.register(Counter(
+    "rate_limit_rejections_total",
+    "Peticiones rechazadas con 429 por presupuesto (read/write/upload)",
+    ("budget",)
+))
+
+@contextmanager
+def observar_almacenamiento(backend: str, operacion: str) -> Iterator[None]:
+    """Mide una llamada al almacenamiento, distinguiendo éxito y error"""
+    inicio = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        STORAGE_OPERATION_DURATION.observe(
+            time.perf_counter() - inicio,
+            backend=backend, operation=operacion, outcome=outcome
+        )
+
+class PrometheusMiddleware:
+    """
+    Middleware ASGI puro que mide la latencia de cada petición HTTP
+
+    La ruta se etiqueta con su plantilla (/solicitudes/vet/{solicitud_id})
+    para no crear una serie por cada ID; las peticiones sin ruta se agrupan
+    como "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - inicio,
+                method=scope["method"],
+                route=getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched",
+                status=str(status["code"])
+            )
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Registra la latencia de cada comando de MongoDB por colección y operación"""
+
+    def __init__(self):
+        self._colecciones: Dict[Tuple[int, object], str] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        coleccion = event.command.get(event.command_name)
+        if isinstance(coleccion, str):
+            with self._lock:
+                self._colecciones[(event.request_id, event.connection_id)] = coleccion
+
+    def _coleccion(self, event) -> str:
+        with self._lock:
+            return self._colecciones.pop((event.request_id, event.connection_id), "")
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        MONGO_COMMAND_DURATION.observe(
+            event.duration_micros / 1_000_000,
+            collection=self._coleccion(event), command=event.command_name, outcome="ok"
+        )
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        MONGO_COMMAND_DURATION.observe(
+            event.duration_micros / 1_000_000,
+            collection=self._coleccion(event), command=event.command_name, outcome="error"
+        )
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Registra la espera de checkout y las conexiones abiertas del pool"""
+
+    def _checkout(self, event, outcome: str) -> None:
+        duracion: Optional[float] = getattr(event, "duration", None)
+        if duracion is not None:
+            MONGO_POOL_CHECKOUT_DURATION.observe(duracion, outcome=outcome)
+
+    def connection_checked_out(self, event) -> None:
+        self._checkout(event, "ok")
+
+    def connection_check_out_failed(self, event) -> None:
+        self._checkout(event, "error")
+
+    def connection_created(self, event) -> None:
+        MONGO_POOL_CONNECTIONS.inc(address=f"{event.address[0]}:{event.address[1]}")
+
+    def connection_closed(self, event) -> None:
+        MONGO_POOL_CONNECTIONS.dec(address=f"{event.address[0]}:{event.address[1]}")
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_check_out_started(self, event) -> None:
+        pass
+
+    def connection_checked_in(self, event) -> None:
+        pass
+
+def mongo_listeners() -> list:
+    """Listeners de pymongo que alimentan las métricas"""
+    return [MongoCommandMetrics(), MongoPoolMetrics()]
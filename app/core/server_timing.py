@@ -0,0 +1,82 @@
+"""
+Desglose por fases de cada respuesta en el header Server-Timing.
+
+ServerTimingMiddleware abre un acumulador por petición en una contextvar;
+el código instrumentado mide sus fases con `fase("db")` y el middleware las
+emite al enviar la cabecera de la respuesta, junto al total:
+
+    Server-Timing: auth;dur=0.1, db;dur=12.4, validate;dur=1.8, encode;dur=0.6, total;dur=16.2
+
+Fases instrumentadas:
+- auth: resolución del usuario autenticado
+- db: ida y vuelta a MongoDB, incluida la decodificación BSON del driver
+- validate: construcción de los modelos Pydantic a partir de los documentos
+- encode: serialización JSON del cuerpo de la respuesta
+
+Fuera de una petición con el middleware activo, `fase` no hace nada.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+_fases: ContextVar[Optional[Dict[str, float]]] = ContextVar("server_timing", default=None)
+
+def server_timing_habilitado() -> bool:
+    """SERVER_TIMING_ENABLED si está definido; si no, activo fuera de producción"""
+    if settings.SERVER_TIMING_ENABLED is not None:
+        return settings.SERVER_TIMING_ENABLED
+    return settings.APP_ENV != "production"
+
+@contextmanager
+def fase(nombre: str) -> Iterator[None]:
+    """Suma la duración del bloque a la fase indicada de la petición en curso"""
+    fases = _fases.get()
+    if fases is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        fases[nombre] = fases.get(nombre, 0.0) + (time.perf_counter() - inicio) * 1000
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse que registra la serialización del cuerpo como fase 'encode'"""
+
+    def render(self, content) -> bytes:
+        with fase("encode"):
+            return super().render(content)
+
+class ServerTimingMiddleware:
+    """Middleware ASGI que emite las fases medidas en el header Server-Timing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        fases: Dict[str, float] = {}
+        token = _fases.set(fases)
+        inicio = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                metricas = [f"{nombre};dur={duracion:.2f}" for nombre, duracion in fases.items()]
+                metricas.append(f"total;dur={(time.perf_counter() - inicio) * 1000:.2f}")
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", ", ".join(metricas).encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _fases.reset(token)
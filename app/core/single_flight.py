@@ -0,0 +1,73 @@
+"""
+Coalescencia de lecturas idénticas concurrentes (single-flight).
+
+Mientras una consulta con cierta clave está en curso, las llamadas con la
+misma clave esperan su resultado en lugar de lanzar otra: la carga sobre
+MongoDB queda acotada por el número de consultas distintas, no por el de
+usuarios concurrentes. No es una caché: la clave se olvida en cuanto la
+consulta termina.
+
+La consulta corre en su propia tarea, así que si el cliente que la inició se
+desconecta el resto sigue esperando el mismo resultado. Tras una escritura,
+`forget` hace que las llamadas siguientes lancen una consulta nueva en vez de
+unirse a una iniciada antes de la escritura.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Grupo de consultas coalescidas
+
+    Args:
+        nombre (str): Nombre del grupo en la métrica cache_requests_total
+    """
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self._en_vuelo: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, clave: Hashable, consulta: Callable[[], Awaitable[T]]) -> T:
+        """
+        Ejecuta la consulta o se une a la que ya está en curso con la misma clave
+
+        Args:
+            clave (Hashable): Clave canónica de la consulta
+            consulta (Callable[[], Awaitable[T]]): Función que lanza la consulta
+
+        Returns:
+            T: Resultado compartido; los llamadores no deben mutarlo
+        """
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return await consulta()
+
+        tarea = self._en_vuelo.get(clave)
+        if tarea is None:
+            tarea = asyncio.ensure_future(consulta())
+            self._en_vuelo[clave] = tarea
+            tarea.add_done_callback(lambda t: self._terminar(clave, t))
+            CACHE_REQUESTS.inc(cache=self.nombre, result="miss")
+        else:
+            CACHE_REQUESTS.inc(cache=self.nombre, result="hit")
+        # shield: cancelar a un llamador no cancela la consulta de los demás
+        return await asyncio.shield(tarea)
+
+    def _terminar(self, clave: Hashable, tarea: asyncio.Task) -> None:
+        if self._en_vuelo.get(clave) is tarea:
+            del self._en_vuelo[clave]
+        # Marca la excepción como recuperada aunque todos los llamadores se hayan ido
+        if not tarea.cancelled():
+            tarea.exception()
+
+    def forget(self, clave: Hashable) -> None:
+        """Las llamadas siguientes con esta clave lanzan una consulta nueva"""
+        self._en_vuelo.pop(clave, None)
+
+    def forget_all(self) -> None:
+        """Olvida todas las consultas en curso del grupo"""
+        self._en_vuelo.clear()
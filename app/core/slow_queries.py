@@ -0,0 +1,218 @@
+"""
+Registro de operaciones lentas de MongoDB con captura automática de explain.
+
+Un CommandListener de pymongo mide cada comando; los que superan
+SLOW_QUERY_THRESHOLD_MS se registran con la forma normalizada del filtro
+(valores sustituidos por "?") para agrupar las consultas que solo difieren en
+sus parámetros. La primera vez que una forma resulta lenta se lanza en el
+event loop un explain("executionStats") y se guarda el resumen del plan
+(COLLSCAN/IXSCAN, índice usado, documentos examinados frente a devueltos).
+Las últimas operaciones quedan en un buffer circular consultable desde el
+endpoint de administración.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Comandos que pueden explicarse y campo que contiene su filtro
+_COMANDOS_EXPLICABLES = {
+    "find": "filter",
+    "aggregate": "pipeline",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "update": "updates",
+    "delete": "deletes"
+}
+
+# Campos de sesión y transporte que el driver agrega y explain no acepta
+_CAMPOS_DRIVER = {
+    "lsid", "$db", "$clusterTime", "txnNumber", "startTransaction", "autocommit",
+    "$readPreference", "readConcern", "writeConcern", "apiVersion", "apiStrict",
+    "apiDeprecationErrors"
+}
+
+def normalizar_forma(valor: Any) -> Any:
+    """
+    Sustituye los valores de un filtro por "?" conservando campos y operadores
+
+    Las listas de valores ($in, $nin...) se colapsan a un único "?" para que
+    el número de elementos no cree formas distintas.
+    """
+    if isinstance(valor, dict):
+        return {clave: normalizar_forma(v) for clave, v in sorted(valor.items())}
+    if isinstance(valor, (list, tuple)):
+        if valor and all(isinstance(v, dict) for v in valor):
+            return [normalizar_forma(v) for v in valor]
+        return "?"
+    return "?"
+
+def _extraer_filtro(comando: str, documento: Dict) -> Any:
+    campo = _COMANDOS_EXPLICABLES[comando]
+    valor = documento.get(campo)
+    # update/delete envían una lista de sentencias: se usa el filtro de la primera
+    if comando in ("update", "delete") and isinstance(valor, list) and valor:
+        valor = valor[0].get("q")
+    return valor if valor is not None else {}
+
+def resumir_plan(explain: Dict) -> Dict[str, Any]:
+    """
+    Resume la salida de explain("executionStats")
+
+    Returns:
+        Dict[str, Any]: etapas del plan ganador, índices usados, documentos
+            y claves examinados, documentos devueltos y tiempo de ejecución
+    """
+    etapas: List[str] = []
+    indices: List[str] = []
+
+    def recorrer_plan(plan: Any) -> None:
+        if isinstance(plan, dict):
+            if "stage" in plan:
+                etapas.append(plan["stage"])
+            if "indexName" in plan:
+                indices.append(plan["indexName"])
+            for valor in plan.values():
+                recorrer_plan(valor)
+        elif isinstance(plan, list):
+            for valor in plan:
+                recorrer_plan(valor)
+
+    def buscar(documento: Any, clave: str) -> Optional[Dict]:
+        # aggregate anida el planner dentro de stages[0].$cursor
+        if isinstance(documento, dict):
+            if clave in documento:
+                return documento[clave]
+            for valor in documento.values():
+                encontrado = buscar(valor, clave)
+                if encontrado is not None:
+                    return encontrado
+        elif isinstance(documento, list):
+            for valor in documento:
+                encontrado = buscar(valor, clave)
+                if encontrado is not None:
+                    return encontrado
+        return None
+
+    planner = buscar(explain, "queryPlanner") or {}
+    recorrer_plan(planner.get("winningPlan", {}))
+    stats = buscar(explain, "executionStats") or {}
+    return {
+        "etapas": etapas,
+        "indices": indices,
+        "collscan": "COLLSCAN" in etapas,
+        "docs_examinados": stats.get("totalDocsExamined"),
+        "claves_examinadas": stats.get("totalKeysExamined"),
+        "docs_devueltos": stats.get("nReturned"),
+        "tiempo_ms": stats.get("executionTimeMillis")
+    }
+
+class SlowQueryRecorder(monitoring.CommandListener):
+    """
+    Listener que registra los comandos lentos y explica cada forma nueva
+    """
+
+    def __init__(self):
+        self._pendientes: Dict[Tuple[int, Any], Tuple[str, str, Dict]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client = None
+        self.operaciones: Deque[Dict[str, Any]] = deque(maxlen=settings.SLOW_QUERY_BUFFER_SIZE)
+        # Forma -> resumen del plan (None mientras el explain está en curso)
+        self.planes: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+
+    def bind(self, loop: asyncio.AbstractEventLoop, client) -> None:
+        """Asocia el event loop y el cliente con los que ejecutar los explain"""
+        self._loop = loop
+        self._client = client
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name not in _COMANDOS_EXPLICABLES:
+            return
+        with self._lock:
+            self._pendientes[(event.request_id, event.connection_id)] = (
+                event.command_name,
+                event.database_name,
+                event.command
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finalizar(event, "ok")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finalizar(event, "error")
+
+    def _finalizar(self, event, resultado: str) -> None:
+        with self._lock:
+            pendiente = self._pendientes.pop((event.request_id, event.connection_id), None)
+        if pendiente is None:
+            return
+        duracion_ms = event.duration_micros / 1000
+        if duracion_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+            return
+
+        comando, database_name, documento = pendiente
+        coleccion = documento.get(comando)
+        forma = json.dumps(normalizar_forma(_extraer_filtro(comando, documento)), sort_keys=True)
+        clave = f"{coleccion}.{comando} {forma}"
+        self.operaciones.append({
+            "fecha": datetime.utcnow().isoformat(),
+            "coleccion": coleccion,
+            "comando": comando,
+            "duracion_ms": round(duracion_ms, 2),
+            "resultado": resultado,
+            "forma": forma,
+            "clave": clave
+        })
+        logger.warning(
+            "Consulta lenta (%.0f ms): %s", duracion_ms, clave,
+            extra={"collection": coleccion, "command": comando, "duration_ms": round(duracion_ms, 2)}
+        )
+
+        if settings.SLOW_QUERY_EXPLAIN and self._programar_explain(clave):
+            explicable = {k: v for k, v in documento.items() if k not in _CAMPOS_DRIVER}
+            asyncio.run_coroutine_threadsafe(
+                self._explicar(clave, database_name, explicable),
+                self._loop
+            )
+
+    def _programar_explain(self, clave: str) -> bool:
+        """Reserva la forma para explicarla; False si ya se explicó o no hay loop"""
+        if self._loop is None or self._loop.is_closed() or self._client is None:
+            return False
+        with self._lock:
+            if clave in self.planes:
+                return False
+            self.planes[clave] = None
+            while len(self.planes) > settings.SLOW_QUERY_MAX_SHAPES:
+                self.planes.popitem(last=False)
+        return True
+
+    async def _explicar(self, clave: str, database_name: str, comando: Dict) -> None:
+        try:
+            explain = await self._client[database_name].command(
+                {"explain": comando, "verbosity": "executionStats"}
+            )
+            self.planes[clave] = resumir_plan(explain)
+        except Exception as e:
+            self.planes[clave] = {"error": str(e)}
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Operaciones lentas recientes (más nuevas primero) con el plan de su forma"""
+        return [
+            {**operacion, "plan": self.planes.get(operacion["clave"])}
+            for operacion in reversed(list(self.operaciones))
+        ]
+
+# Instancia global
+slow_query_recorder = SlowQueryRecorder()
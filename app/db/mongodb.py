@@ -1,60 +1,196 @@
-import os
+import asyncio
+import importlib.util
+import logging
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ConnectionFailure
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Módulo que necesita pymongo para cada compresor de red (zlib viene con Python)
+_MODULOS_COMPRESORES = {
+    "zstd": "zstandard",
+    "snappy": "snappy",
+    "zlib": None
+}
+
+def compresores_disponibles(compresores: List[str]) -> List[str]:
+    """
+    Filtra los compresores pedidos dejando solo los que pueden usarse
+
+    Args:
+        compresores (List[str]): Compresores en orden de preferencia
+
+    Returns:
+        List[str]: Compresores cuyo módulo está instalado, en el mismo orden
+    """
+    disponibles = []
+    for compresor in compresores:
+        if compresor not in _MODULOS_COMPRESORES:
+            logger.warning("Compresor de MongoDB desconocido: %s", compresor)
+            continue
+        modulo = _MODULOS_COMPRESORES[compresor]
+        if modulo and importlib.util.find_spec(modulo) is None:
+            logger.info("Compresor %s no disponible (falta el paquete %s)", compresor, modulo)
+            continue
+        disponibles.append(compresor)
+    return disponibles
+
+def client_options(instrumentar: bool = True) -> Dict[str, Any]:
+    """
+    Opciones del cliente de MongoDB según la configuración
+
+    Args:
+        instrumentar (bool): Registrar los listeners globales del proceso
+            (uso del pool para readiness, métricas y consultas lentas)
+
+    Returns:
+        Dict[str, Any]: Argumentos para AsyncIOMotorClient
+    """
+    opciones: Dict[str, Any] = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+        "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGODB_CONNECT_TIMEOUT_MS,
+        "appname": settings.PROJECT_NAME
+    }
+    compresores = compresores_disponibles(
+        [c.strip() for c in settings.MONGODB_COMPRESSORS.split(",") if c.strip()]
+    )
+    if compresores:
+        opciones["compressors"] = compresores
+    if not instrumentar:
+        return opciones
+    from app.services.health_service import pool_usage
+    listeners = [pool_usage]
+    if settings.METRICS_ENABLED:
+        from app.core.metrics import mongo_listeners
+        listeners.extend(mongo_listeners())
+    if settings.SLOW_QUERY_ENABLED:
+        from app.core.slow_queries import slow_query_recorder
+        listeners.append(slow_query_recorder)
+    opciones["event_listeners"] = listeners
+    return opciones
 
 class MongoDB:
-    client: Optional[AsyncIOMotorClient] = None
-    database = None
+    """
+    Gestor de la conexión a MongoDB
+
+    La aplicación usa la instancia global `mongodb`; las pruebas pueden crear
+    la suya (p. ej. con MongoDB.for_testing()) para tener un cliente aislado.
+    Solo las instancias instrumentadas alimentan los listeners globales del
+    proceso y enlazan el registro de consultas lentas a su cliente.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        database_name: Optional[str] = None,
+        instrumentar: bool = True,
+        **client_overrides: Any
+    ):
+        self.url = url or settings.MONGODB_URL
+        self.database_name = database_name or settings.MONGODB_DATABASE
+        self.instrumentar = instrumentar
+        self.client_overrides = client_overrides
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.database = None
 
     @classmethod
-    async def connect_to_mongo(cls):
+    def for_testing(cls, **client_overrides: Any) -> "MongoDB":
+        """
+        Crea un gestor independiente apuntando a la base de datos de pruebas
+
+        No se instrumenta: sus conexiones no cuentan en el uso del pool que
+        mira readiness ni en las métricas, y el registro de consultas lentas
+        sigue enlazado al cliente de la aplicación.
+        """
+        return cls(settings.MONGODB_TEST_URL, settings.MONGODB_TEST_DATABASE, instrumentar=False, **client_overrides)
+
+    @property
+    def batch_size(self) -> int:
+        """Tamaño de lote de los cursores (0 usa el valor del servidor)"""
+        return settings.MONGODB_BATCH_SIZE
+
+    async def connect_to_mongo(self):
         """
-        Conecta a MongoDB usando las variables de entorno
+        Conecta a MongoDB usando la configuración de la aplicación
         """
         try:
-            # Obtener configuración desde variables de entorno
-            mongodb_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
-            database_name = os.getenv("MONGODB_DATABASE", "solicitudes_db")
-            
             # Crear cliente de MongoDB
-            cls.client = AsyncIOMotorClient(mongodb_url)
-            cls.database = cls.client[database_name]
-            
+            self.client = AsyncIOMotorClient(
+                self.url,
+                **{**client_options(self.instrumentar), **self.client_overrides}
+            )
+            self.database = self.client[self.database_name]
+            if self.instrumentar and settings.SLOW_QUERY_ENABLED:
+                from app.core.slow_queries import slow_query_recorder
+                slow_query_recorder.bind(asyncio.get_running_loop(), self.client)
+
             # Verificar conexión
-            await cls.client.admin.command('ping')
-            print("✅ Conectado a MongoDB exitosamente")
-            
+            await self.client.admin.command('ping')
+            logger.info("Conectado a MongoDB exitosamente")
+
         except ConnectionFailure as e:
-            print(f"❌ Error conectando a MongoDB: {str(e)}")
+            logger.error("Error conectando a MongoDB: %s", e)
             raise
         except Exception as e:
-            print(f"❌ Error inesperado conectando a MongoDB: {str(e)}")
+            logger.exception("Error inesperado conectando a MongoDB")
             raise
 
-    @classmethod
-    async def close_mongo_connection(cls):
+    async def close_mongo_connection(self):
         """
         Cierra la conexión a MongoDB
         """
-        if cls.client:
-            cls.client.close()
-            print("🔌 Conexión a MongoDB cerrada")
+        if self.client:
+            self.client.close()
+            self.client = None
+            self.database = None
+            logger.info("Conexión a MongoDB cerrada")
 
-    @classmethod
-    def get_collection(cls, collection_name: str):
+    async def run_transaction(self, callback: Callable[[Any], Awaitable[T]]) -> T:
+        """
+        Agrupa varias escrituras en una transacción
+
+        Ejecuta `callback(session)`, que debe pasar la sesión a cada operación,
+        mediante ClientSession.with_transaction: ante TransientTransactionError
+        (p. ej. un WriteConflict con otra petición que toca el mismo contador
+        de `imagenes`) se repite el callback completo y ante
+        UnknownTransactionCommitResult se reintenta el commit. El callback
+        puede ejecutarse más de una vez, así que no debe modificar estado
+        fuera de la transacción; lo que necesite el llamador se retorna. Si
+        las transacciones están deshabilitadas (MONGODB_TRANSACTIONS=false,
+        p. ej. con un MongoDB standalone en local) se llama una vez con None y
+        las operaciones se ejecutan sin sesión.
+
+        Args:
+            callback (Callable[[Any], Awaitable[T]]): Operaciones de la transacción
+
+        Returns:
+            T: Lo que retorne el callback en el intento confirmado
+        """
+        if not settings.MONGODB_TRANSACTIONS:
+            return await callback(None)
+        async with await self.client.start_session() as session:
+            return await session.with_transaction(callback)
+
+    def get_collection(self, collection_name: str):
         """
         Obtiene una colección específica de MongoDB
-        
+
         Args:
             collection_name (str): Nombre de la colección
-            
+
         Returns:
             Collection: Colección de MongoDB
         """
-        if not cls.database:
+        if self.database is None:
             raise Exception("MongoDB no está conectado")
-        return cls.database[collection_name]
+        return self.database[collection_name]
 
 # Instancia global
-mongodb = MongoDB() 
\ No newline at end of file
+mongodb = MongoDB()
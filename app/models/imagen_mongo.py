@@ -0,0 +1,126 @@
+from datetime import datetime
+from typing import Optional
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.db.mongodb import mongodb
+
+class ImagenMongoModel:
+    """
+    Índice de imágenes por contenido: cada documento usa el SHA-256 de la
+    imagen como _id y guarda su URL y cuántas solicitudes la referencian.
+    """
+    collection_name = "imagenes"
+
+    @staticmethod
+    def get_collection():
+        """Obtiene la colección del índice de imágenes"""
+        if mongodb.database is None:
+            raise Exception("MongoDB no está conectado")
+        return mongodb.database[ImagenMongoModel.collection_name]
+
+    @staticmethod
+    async def ensure_indexes():
+        """
+        Create the lookup index used when releasing an image by URL
+        """
+        collection = ImagenMongoModel.get_collection()
+        await collection.create_index([("url", ASCENDING)], name="url")
+
+    @staticmethod
+    async def acquire(sha256: str) -> Optional[str]:
+        """
+        Add a reference to an already stored image
+        Args:
+            sha256 (str): Content hash of the image
+        Returns:
+            Optional[str]: URL of the stored image, None if it is not indexed
+        """
+        collection = ImagenMongoModel.get_collection()
+        doc = await collection.find_one_and_update(
+            {"_id": sha256},
+            {"$inc": {"referencias": 1}, "$set": {"actualizado_en": datetime.utcnow()}},
+            projection={"url": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return doc["url"] if doc else None
+
+    @staticmethod
+    async def acquire_url(url: str) -> bool:
+        """
+        Add a reference to an already stored image by its URL
+        Args:
+            url (str): URL of the image
+        Returns:
+            bool: True if the image is indexed, False otherwise
+        """
+        collection = ImagenMongoModel.get_collection()
+        result = await collection.update_one(
+            {"url": url},
+            {"$inc": {"referencias": 1}, "$set": {"actualizado_en": datetime.utcnow()}}
+        )
+        return result.matched_count > 0
+
+    @staticmethod
+    async def register(sha256: str, url: str, referencias: int = 1) -> str:
+        """
+        Index a freshly uploaded image
+        Args:
+            sha256 (str): Content hash of the image
+            url (str): URL returned by the storage backend
+            referencias (int): References to add to the image
+        Returns:
+            str: URL now associated with the hash. It differs from `url` when a
+                concurrent request indexed the same content first; the caller
+                then owns a redundant upload.
+        """
+        collection = ImagenMongoModel.get_collection()
+        ahora = datetime.utcnow()
+        for _ in range(2):
+            try:
+                doc = await collection.find_one_and_update(
+                    {"_id": sha256},
+                    {
+                        "$inc": {"referencias": referencias},
+                        "$set": {"actualizado_en": ahora},
+                        "$setOnInsert": {"url": url, "creado_en": ahora}
+                    },
+                    projection={"url": 1},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                return doc["url"]
+            except DuplicateKeyError:
+                # Dos upserts simultáneos del mismo hash: el segundo reintenta como update
+                continue
+        raise RuntimeError(f"No se pudo registrar la imagen {sha256}")
+
+    @staticmethod
+    async def release(url: str, session=None) -> bool:
+        """
+        Drop one reference to an image
+        Args:
+            url (str): URL of the image
+            session: Optional session to join the caller's transaction
+        Returns:
+            bool: True if the image has no references left (or was never
+                indexed) and can be deleted from storage
+        """
+        collection = ImagenMongoModel.get_collection()
+        doc = await collection.find_one_and_update(
+            {"url": url},
+            {"$inc": {"referencias": -1}, "$set": {"actualizado_en": datetime.utcnow()}},
+            projection={"referencias": 1},
+            return_document=ReturnDocument.AFTER,
+            session=session
+        )
+        if doc is None:
+            return True
+        if doc["referencias"] > 0:
+            return False
+        # Borrado condicional: si otra petición volvió a adquirir la imagen
+        # entre ambas operaciones, el documento sigue vivo y no se borra nada
+        result = await collection.delete_one(
+            {"_id": doc["_id"], "referencias": {"$lte": 0}},
+            session=session
+        )
+        return result.deleted_count > 0
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Dict
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from app.db.mongodb import mongodb
+
+# Tipos de efecto secundario registrados en el outbox
+TIPO_ELIMINAR_IMAGEN = "eliminar_imagen"
+
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_FALLIDO = "fallido"
+
+class OutboxMongoModel:
+    """
+    Outbox transaccional: los endpoints registran aquí los efectos secundarios
+    (en la misma transacción que la escritura principal) y el OutboxWorker los
+    ejecuta en segundo plano con reintentos.
+    """
+    collection_name = "outbox"
+
+    @staticmethod
+    def get_collection():
+        """Obtiene la colección del outbox"""
+        if mongodb.database is None:
+            raise Exception("MongoDB no está conectado")
+        return mongodb.database[OutboxMongoModel.collection_name]
+
+    @staticmethod
+    async def ensure_indexes():
+        """
+        Create the index used to claim pending events in order
+        """
+        collection = OutboxMongoModel.get_collection()
+        await collection.create_index(
+            [("estado", ASCENDING), ("disponible_en", ASCENDING)],
+            name="estado_disponible_en"
+        )
+
+    @staticmethod
+    async def enqueue(tipo: str, payload: Dict, session=None) -> str:
+        """
+        Register a pending side effect
+        Args:
+            tipo (str): Event type (e.g. TIPO_ELIMINAR_IMAGEN)
+            payload (Dict): Data needed by the handler
+            session: Optional session to join the caller's transaction
+        Returns:
+            str: ID of the outbox event
+        """
+        collection = OutboxMongoModel.get_collection()
+        ahora = datetime.utcnow()
+        result = await collection.insert_one({
+            "tipo": tipo,
+            "payload": payload,
+            "estado": ESTADO_PENDIENTE,
+            "intentos": 0,
+            "disponible_en": ahora,
+            "creado_en": ahora,
+            "ultimo_error": None
+        }, session=session)
+        return str(result.inserted_id)
+
+    @staticmethod
+    async def claim_batch(limit: int, lease_seconds: float) -> List[Dict]:
+        """
+        Claim up to `limit` due events. Each claimed event becomes invisible to
+        other workers for `lease_seconds`, so a worker that dies mid-batch only
+        delays its events instead of losing them.
+        Args:
+            limit (int): Maximum number of events to claim
+            lease_seconds (float): Visibility timeout for the claimed events
+        Returns:
+            List[Dict]: Claimed events
+        """
+        collection = OutboxMongoModel.get_collection()
+        eventos = []
+        for _ in range(limit):
+            ahora = datetime.utcnow()
+            evento = await collection.find_one_and_update(
+                {"estado": ESTADO_PENDIENTE, "disponible_en": {"$lte": ahora}},
+                {"$set": {"disponible_en": ahora + timedelta(seconds=lease_seconds)}},
+                sort=[("disponible_en", ASCENDING)],
+                return_document=ReturnDocument.AFTER
+            )
+            if evento is None:
+                break
+            eventos.append(evento)
+        return eventos
+
+    @staticmethod
+    async def complete(evento_id: ObjectId) -> None:
+        """
+        Remove an event whose side effect was applied
+        """
+        collection = OutboxMongoModel.get_collection()
+        await collection.delete_one({"_id": evento_id})
+
+    @staticmethod
+    async def fail(evento: Dict, error: str, retry_in_seconds: Optional[float]) -> None:
+        """
+        Record a failed attempt
+        Args:
+            evento (Dict): Claimed event
+            error (str): Error description
+            retry_in_seconds (Optional[float]): Delay before the next attempt.
+                None marks the event as failed permanently; it stays in the
+                collection for manual inspection instead of being dropped.
+        """
+        collection = OutboxMongoModel.get_collection()
+        cambios = {
+            "ultimo_error": error,
+            "intentos": evento.get("intentos", 0) + 1
+        }
+        if retry_in_seconds is None:
+            cambios["estado"] = ESTADO_FALLIDO
+        else:
+            cambios["disponible_en"] = datetime.utcnow() + timedelta(seconds=retry_in_seconds)
+        await collection.update_one({"_id": evento["_id"]}, {"$set": cambios})
@@ -0,0 +1,67 @@
+from datetime import timedelta
+from typing import Tuple
+from pymongo import ASCENDING, ReturnDocument
+from app.db.mongodb import mongodb
+
+class RateLimitMongoModel:
+    """
+    Token buckets compartidos entre máquinas: un documento por cliente y
+    presupuesto con los tokens disponibles y la fecha de la última recarga.
+    La recarga y el consumo se calculan en el servidor con $$NOW en una sola
+    actualización atómica, así que no dependen del reloj de cada máquina.
+    """
+    collection_name = "rate_limits"
+
+    @staticmethod
+    def get_collection():
+        """Obtiene la colección de token buckets"""
+        if mongodb.database is None:
+            raise Exception("MongoDB no está conectado")
+        return mongodb.database[RateLimitMongoModel.collection_name]
+
+    @staticmethod
+    async def ensure_indexes(expire_after: timedelta):
+        """
+        Create the TTL index that drops idle buckets
+        Args:
+            expire_after (timedelta): Idle time after which a bucket is deleted
+        """
+        collection = RateLimitMongoModel.get_collection()
+        await collection.create_index(
+            [("actualizado", ASCENDING)],
+            name="actualizado_ttl",
+            expireAfterSeconds=int(expire_after.total_seconds())
+        )
+
+    @staticmethod
+    async def consume(key: str, capacity: float, rate: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Refill the bucket for the elapsed time and take `cost` tokens if available
+        Args:
+            key (str): Bucket identifier (client and budget)
+            capacity (float): Maximum tokens (burst)
+            rate (float): Tokens added per second
+            cost (float): Tokens consumed by the request
+        Returns:
+            Tuple[bool, float]: Whether the request is allowed and the tokens left
+        """
+        collection = RateLimitMongoModel.get_collection()
+        transcurrido = {"$divide": [{"$subtract": ["$$NOW", {"$ifNull": ["$actualizado", "$$NOW"]}]}, 1000]}
+        doc = await collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {
+                    "tokens": {"$min": [
+                        capacity,
+                        {"$add": [{"$ifNull": ["$tokens", capacity]}, {"$multiply": [transcurrido, rate]}]}
+                    ]},
+                    "actualizado": "$$NOW"
+                }},
+                {"$set": {"permitido": {"$gte": ["$tokens", cost]}}},
+                {"$set": {"tokens": {"$cond": ["$permitido", {"$subtract": ["$tokens", cost]}, "$tokens"]}}}
+            ],
+            projection={"tokens": 1, "permitido": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return doc["permitido"], doc["tokens"]
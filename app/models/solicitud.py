@@ -1,3 +1,4 @@
+import logging
 from datetime import datetime
 from typing import List, Optional, Dict
 from app.schemas.solicitud import Solicitud, SolicitudCreate, SolicitudUpdate, SolicitudEstadoUpdate
@@ -6,6 +7,8 @@ import json
 import os
 from app.constants.solicitudes import ESTADOS_PERMITIDOS
 
+logger = logging.getLogger(__name__)
+
 # Cargar datos mock desde el archivo JSON
 def load_mock_data() -> List[Dict]:
     """
@@ -20,7 +23,7 @@ def load_mock_data() -> List[Dict]:
             data = json.load(f)
             return data.get('solicitudes', [])
     except Exception as e:
-        print(f"Error cargando datos mock: {str(e)}")
+        logger.warning("Error cargando datos mock: %s", e)
         return []
 
 # Cargar datos mock
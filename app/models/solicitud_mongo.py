@@ -1,9 +1,34 @@
+import json
+import logging
+import re
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from bson import ObjectId
-from app.schemas.solicitud import Solicitud, SolicitudCreate, SolicitudUpdate, SolicitudEstadoUpdate
+from pymongo import ASCENDING, GEOSPHERE, TEXT
+from app.constants.solicitudes import COMPATIBILIDAD_SANGRE, URGENCIAS_PERMITIDAS
+from app.schemas.solicitud import Solicitud, SolicitudCercana, SolicitudCreate, SolicitudResumen, SolicitudUpdate, SolicitudEstadoUpdate
 from app.db.mongodb import mongodb
-import json
+from app.core.server_timing import fase
+from app.core.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Campos que devuelve la búsqueda de texto: sin descripción ni datos de contacto
+_CAMPOS_RESUMEN = (
+    "nombre_veterinaria",
+    "nombre_mascota",
+    "especie",
+    "localidad",
+    "tipo_sangre",
+    "urgencia",
+    "estado",
+    "fecha_creacion",
+    "foto_mascota"
+)
+
+# Lecturas concurrentes idénticas comparten una sola consulta
+_listados = SingleFlight("solicitudes_listado")
+_detalles = SingleFlight("solicitudes_detalle")
 
 class SolicitudMongoModel:
     collection_name = "solicitudes"
@@ -15,6 +40,28 @@ class SolicitudMongoModel:
             raise Exception("MongoDB no está conectado")
         return mongodb.database[SolicitudMongoModel.collection_name]
     
+    @staticmethod
+    async def ensure_indexes():
+        """
+        Create the 2dsphere index used by the nearby search, the compound
+        index used by donor matching and the text index used by search
+        """
+        collection = SolicitudMongoModel.get_collection()
+        # Los índices 2dsphere omiten los documentos sin punto
+        await collection.create_index([("punto", GEOSPHERE)], name="punto_2dsphere")
+        # Igualdades primero y el rango de peso al final
+        await collection.create_index(
+            [("estado", ASCENDING), ("especie", ASCENDING), ("tipo_sangre", ASCENDING), ("peso_minimo", ASCENDING)],
+            name="estado_especie_tipo_sangre_peso"
+        )
+        # Un solo índice de texto por colección: nombres con más peso que la descripción
+        await collection.create_index(
+            [("nombre_mascota", TEXT), ("nombre_veterinaria", TEXT), ("descripcion_solicitud", TEXT)],
+            name="texto_busqueda",
+            default_language="spanish",
+            weights={"nombre_mascota": 10, "nombre_veterinaria": 5, "descripcion_solicitud": 1}
+        )
+
     @staticmethod
     def _convert_mongo_doc_to_schema(doc: Dict) -> Dict:
         """Convierte un documento de MongoDB al formato del esquema Pydantic"""
@@ -23,6 +70,69 @@ class SolicitudMongoModel:
             del doc["_id"]
         return doc
     
+    @staticmethod
+    def _build_value_filter(value: Optional[str]) -> Optional[Dict]:
+        """
+        Build the filter for a query parameter with comma-separated values
+        Args:
+            value (Optional[str]): One value (case-insensitive exact match) or several (any of them)
+        Returns:
+            Optional[Dict]: Condition for the field, None if there are no values
+        """
+        if not value:
+            return None
+        # Sin duplicados y ordenados: el mismo filtro produce siempre la misma consulta
+        values = sorted({v.strip() for v in value.split(',') if v.strip()})
+        if not values:
+            return None
+        if len(values) == 1:
+            return {"$regex": f"^{re.escape(values[0])}$", "$options": "i"}
+        return {"$in": values}
+
+    @staticmethod
+    def invalidate_reads(solicitud_id: Optional[str] = None) -> None:
+        """
+        Make reads issued after a write start a new query instead of joining one started before it
+
+        Writes made inside a transaction must call it after the commit: a read
+        started before that would still see the old data.
+        Args:
+            solicitud_id (Optional[str]): Written solicitation, if any
+        """
+        _listados.forget_all()
+        if solicitud_id is not None:
+            _detalles.forget(solicitud_id)
+
+    @staticmethod
+    async def _find_solicitudes(filter_query: Dict) -> List[Solicitud]:
+        """
+        Run a find, sharing the query with identical concurrent calls
+        Args:
+            filter_query (Dict): MongoDB filter
+        Returns:
+            List[Solicitud]: Matching solicitations
+        """
+        clave = json.dumps(filter_query, sort_keys=True)
+        solicitudes = await _listados.do(clave, lambda: SolicitudMongoModel._query_solicitudes(filter_query))
+        # Lista propia para cada llamador; los modelos se comparten
+        return list(solicitudes)
+
+    @staticmethod
+    async def _query_solicitudes(filter_query: Dict) -> List[Solicitud]:
+        """
+        Run a find and build the schemas, timing the Mongo round trip and the
+        Pydantic validation as separate Server-Timing phases
+        Args:
+            filter_query (Dict): MongoDB filter
+        Returns:
+            List[Solicitud]: Matching solicitations
+        """
+        collection = SolicitudMongoModel.get_collection()
+        with fase("db"):
+            solicitudes = await collection.find(filter_query, batch_size=mongodb.batch_size).to_list(length=None)
+        with fase("validate"):
+            return [Solicitud(**SolicitudMongoModel._convert_mongo_doc_to_schema(solicitud)) for solicitud in solicitudes]
+
     @staticmethod
     async def get_active_solicitudes() -> List[Solicitud]:
         """
@@ -30,10 +140,7 @@ class SolicitudMongoModel:
         Returns:
             List[Solicitud]: List of active solicitations
         """
-        collection = SolicitudMongoModel.get_collection()
-        cursor = collection.find({"estado": "Activa"})
-        solicitudes = await cursor.to_list(length=None)
-        return [Solicitud(**SolicitudMongoModel._convert_mongo_doc_to_schema(solicitud)) for solicitud in solicitudes]
+        return await SolicitudMongoModel._find_solicitudes({"estado": "Activa"})
 
     @staticmethod
     async def get_all_solicitudes() -> List[Solicitud]:
@@ -42,10 +149,7 @@ class SolicitudMongoModel:
         Returns:
             List[Solicitud]: List of all solicitations
         """
-        collection = SolicitudMongoModel.get_collection()
-        cursor = collection.find({})
-        solicitudes = await cursor.to_list(length=None)
-        return [Solicitud(**SolicitudMongoModel._convert_mongo_doc_to_schema(solicitud)) for solicitud in solicitudes]
+        return await SolicitudMongoModel._find_solicitudes({})
 
     @staticmethod
     async def get_solicitudes_by_status(estado: Optional[str] = None) -> List[Solicitud]:
@@ -56,13 +160,7 @@ class SolicitudMongoModel:
         Returns:
             List[Solicitud]: List of solicitations matching the status
         """
-        collection = SolicitudMongoModel.get_collection()
-        if estado:
-            cursor = collection.find({"estado": estado})
-        else:
-            cursor = collection.find({})
-        solicitudes = await cursor.to_list(length=None)
-        return [Solicitud(**SolicitudMongoModel._convert_mongo_doc_to_schema(solicitud)) for solicitud in solicitudes]
+        return await SolicitudMongoModel._find_solicitudes({"estado": estado} if estado else {})
 
     @staticmethod
     async def filter_active_solicitudes(
@@ -81,51 +179,179 @@ class SolicitudMongoModel:
         Returns:
             List[Solicitud]: List of active solicitations matching all provided filters
         """
-        collection = SolicitudMongoModel.get_collection()
-        
         # Construir filtro
         filter_query = {"estado": "Activa"}
         
-        def build_regex_filter(value: str) -> dict:
-            """Build regex filter for multiple values separated by commas"""
-            if not value:
-                return None
-            
-            # Split by comma and clean whitespace
-            values = [v.strip() for v in value.split(',') if v.strip()]
-            if not values:
-                return None
-            
-            if len(values) == 1:
-                # Single value - use exact match with case insensitive
-                return {"$regex": f"^{values[0]}$", "$options": "i"}
-            else:
-                # Multiple values - use OR condition
-                return {"$in": values}
-        
         if especie:
-            especie_filter = build_regex_filter(especie)
+            especie_filter = SolicitudMongoModel._build_value_filter(especie)
             if especie_filter:
                 filter_query["especie"] = especie_filter
                 
         if tipo_sangre:
-            tipo_sangre_filter = build_regex_filter(tipo_sangre)
+            tipo_sangre_filter = SolicitudMongoModel._build_value_filter(tipo_sangre)
             if tipo_sangre_filter:
                 filter_query["tipo_sangre"] = tipo_sangre_filter
                 
         if urgencia:
-            urgencia_filter = build_regex_filter(urgencia)
+            urgencia_filter = SolicitudMongoModel._build_value_filter(urgencia)
             if urgencia_filter:
                 filter_query["urgencia"] = urgencia_filter
                 
         if localidad:
-            localidad_filter = build_regex_filter(localidad)
+            localidad_filter = SolicitudMongoModel._build_value_filter(localidad)
             if localidad_filter:
                 filter_query["localidad"] = localidad_filter
         
-        cursor = collection.find(filter_query)
-        solicitudes = await cursor.to_list(length=None)
-        return [Solicitud(**SolicitudMongoModel._convert_mongo_doc_to_schema(solicitud)) for solicitud in solicitudes]
+        return await SolicitudMongoModel._find_solicitudes(filter_query)
+
+    @staticmethod
+    async def get_nearby_active_solicitudes(
+        latitud: float,
+        longitud: float,
+        radio_metros: float,
+        especie: Optional[str] = None,
+        tipo_sangre: Optional[str] = None,
+        limite: int = 50
+    ) -> List[SolicitudCercana]:
+        """
+        Get active solicitations within a radius, closest first
+        Args:
+            latitud (float): Latitude of the search point
+            longitud (float): Longitude of the search point
+            radio_metros (float): Maximum distance in meters
+            especie (Optional[str]): Especie to filter by (can be comma-separated values)
+            tipo_sangre (Optional[str]): Tipo de sangre to filter by (can be comma-separated values)
+            limite (int): Maximum number of results
+        Returns:
+            List[SolicitudCercana]: Solicitations with their distance in meters, sorted by distance
+        """
+        collection = SolicitudMongoModel.get_collection()
+        filter_query = {"estado": "Activa"}
+        especie_filter = SolicitudMongoModel._build_value_filter(especie)
+        if especie_filter:
+            filter_query["especie"] = especie_filter
+        tipo_sangre_filter = SolicitudMongoModel._build_value_filter(tipo_sangre)
+        if tipo_sangre_filter:
+            filter_query["tipo_sangre"] = tipo_sangre_filter
+
+        # $geoNear usa el índice 2dsphere, aplica el filtro y ordena por distancia en el servidor
+        pipeline = [
+            {"$geoNear": {
+                "near": {"type": "Point", "coordinates": [longitud, latitud]},
+                "key": "punto",
+                "distanceField": "distancia_metros",
+                "maxDistance": radio_metros,
+                "query": filter_query,
+                "spherical": True
+            }},
+            {"$limit": limite}
+        ]
+        with fase("db"):
+            solicitudes = await collection.aggregate(pipeline, batch_size=mongodb.batch_size).to_list(length=None)
+        with fase("validate"):
+            return [SolicitudCercana(**SolicitudMongoModel._convert_mongo_doc_to_schema(solicitud)) for solicitud in solicitudes]
+
+    @staticmethod
+    async def match_compatible_solicitudes(
+        especie: str,
+        tipo_sangre: str,
+        peso: float,
+        limite: int = 50
+    ) -> List[Solicitud]:
+        """
+        Get the active solicitations a donor can give blood to, ranked
+        Args:
+            especie (str): Species of the donor
+            tipo_sangre (str): Blood type of the donor
+            peso (float): Weight of the donor in kg
+            limite (int): Maximum number of results
+        Returns:
+            List[Solicitud]: Compatible solicitations, most urgent first, then same blood type
+                before other compatible types, then oldest first
+        Raises:
+            KeyError: If the blood type does not belong to the species
+        """
+        receptores = list(COMPATIBILIDAD_SANGRE[(especie, tipo_sangre)])
+        collection = SolicitudMongoModel.get_collection()
+
+        # El $match usa el índice estado_especie_tipo_sangre_peso; el orden por
+        # rango y el $limit se resuelven en el servidor como un top-k
+        pipeline = [
+            {"$match": {
+                "estado": "Activa",
+                "especie": especie,
+                "tipo_sangre": {"$in": receptores},
+                "peso_minimo": {"$lte": peso}
+            }},
+            {"$addFields": {
+                "_rango_urgencia": {"$indexOfArray": [URGENCIAS_PERMITIDAS, "$urgencia"]},
+                "_rango_tipo": {"$indexOfArray": [receptores, "$tipo_sangre"]}
+            }},
+            {"$sort": {"_rango_urgencia": 1, "_rango_tipo": 1, "fecha_creacion": 1}},
+            {"$limit": limite},
+            {"$project": {"_rango_urgencia": 0, "_rango_tipo": 0}}
+        ]
+        with fase("db"):
+            solicitudes = await collection.aggregate(pipeline, batch_size=mongodb.batch_size).to_list(length=None)
+        with fase("validate"):
+            return [Solicitud(**SolicitudMongoModel._convert_mongo_doc_to_schema(solicitud)) for solicitud in solicitudes]
+
+    @staticmethod
+    async def search_solicitudes(
+        texto: str,
+        estado: Optional[str] = None,
+        especie: Optional[str] = None,
+        tipo_sangre: Optional[str] = None,
+        urgencia: Optional[str] = None,
+        localidad: Optional[str] = None,
+        limite: int = 20
+    ) -> List[SolicitudResumen]:
+        """
+        Full-text search over pet name, clinic name and description
+        Args:
+            texto (str): Search terms (Spanish stemming; "frase exacta" and -exclusion supported)
+            estado (Optional[str]): Status to filter by (can be comma-separated values)
+            especie (Optional[str]): Especie to filter by (can be comma-separated values)
+            tipo_sangre (Optional[str]): Tipo de sangre to filter by (can be comma-separated values)
+            urgencia (Optional[str]): Urgencia to filter by (can be comma-separated values)
+            localidad (Optional[str]): Localidad to filter by (can be comma-separated values)
+            limite (int): Maximum number of results
+        Returns:
+            List[SolicitudResumen]: Summary of the matching solicitations, most relevant first
+        """
+        collection = SolicitudMongoModel.get_collection()
+        filter_query = {"$text": {"$search": texto, "$language": "spanish"}}
+        for campo, valor in (
+            ("estado", estado),
+            ("especie", especie),
+            ("tipo_sangre", tipo_sangre),
+            ("urgencia", urgencia),
+            ("localidad", localidad)
+        ):
+            condicion = SolicitudMongoModel._build_value_filter(valor)
+            if condicion:
+                filter_query[campo] = condicion
+
+        projection = {campo: 1 for campo in _CAMPOS_RESUMEN}
+        projection["relevancia"] = {"$meta": "textScore"}
+        cursor = collection.find(filter_query, projection).sort([("relevancia", {"$meta": "textScore"})]).limit(limite)
+        with fase("db"):
+            solicitudes = await cursor.to_list(length=None)
+        with fase("validate"):
+            return [SolicitudResumen(**SolicitudMongoModel._convert_mongo_doc_to_schema(solicitud)) for solicitud in solicitudes]
+
+    @staticmethod
+    async def get_autocomplete_documents(campos: Tuple[str, ...]) -> List[Dict]:
+        """
+        Read only the autocomplete fields of every solicitation
+        Args:
+            campos (Tuple[str, ...]): Fields to project
+        Returns:
+            List[Dict]: One document per solicitation with its _id and just those fields
+        """
+        collection = SolicitudMongoModel.get_collection()
+        projection = {campo: 1 for campo in campos}
+        return await collection.find({}, projection, batch_size=mongodb.batch_size).to_list(length=None)
 
     @staticmethod
     async def create_solicitud(solicitud_data: Dict) -> Solicitud:
@@ -152,21 +378,36 @@ class SolicitudMongoModel:
         if "fecha_creacion" not in data_to_insert:
             data_to_insert["fecha_creacion"] = datetime.now()
         
+        # Sin ubicación se omite el campo: la solicitud queda fuera del índice 2dsphere
+        if data_to_insert.get("punto") is None:
+            data_to_insert.pop("punto", None)
+        
         # Convertir string ID a ObjectId si es necesario
         if "id" in data_to_insert and isinstance(data_to_insert["id"], str):
             data_to_insert["_id"] = ObjectId(data_to_insert["id"])
             del data_to_insert["id"]
         
-        result = await collection.insert_one(data_to_insert)
-        
-        # Obtener el documento insertado
-        inserted_doc = await collection.find_one({"_id": result.inserted_id})
+        await collection.insert_one(data_to_insert)
+        SolicitudMongoModel.invalidate_reads()
         
-        # Convertir ObjectId a string para el esquema
-        converted_doc = SolicitudMongoModel._convert_mongo_doc_to_schema(inserted_doc)
+        # insert_one agrega el _id al documento: se construye la respuesta
+        # sin volver a leerlo de MongoDB
+        converted_doc = SolicitudMongoModel._convert_mongo_doc_to_schema(data_to_insert)
         
         return Solicitud(**converted_doc)
 
+    @staticmethod
+    async def count_by_foto(foto_url: str) -> int:
+        """
+        Count the solicitations that use an image
+        Args:
+            foto_url (str): URL of the image
+        Returns:
+            int: Number of solicitations whose foto_mascota is the given URL
+        """
+        collection = SolicitudMongoModel.get_collection()
+        return await collection.count_documents({"foto_mascota": foto_url})
+
     @staticmethod
     async def delete_solicitud(solicitud_id: str) -> bool:
         """
@@ -181,10 +422,33 @@ class SolicitudMongoModel:
         try:
             object_id = ObjectId(solicitud_id)
             result = await collection.delete_one({"_id": object_id})
+            SolicitudMongoModel.invalidate_reads(solicitud_id)
             return result.deleted_count > 0
         except Exception:
             return False
 
+    @staticmethod
+    async def find_and_delete_solicitud(solicitud_id: str, session=None) -> Optional[Solicitud]:
+        """
+        Delete a solicitation by ID and return the deleted document in a single round trip
+        Args:
+            solicitud_id (str): ID of the solicitation to delete
+            session: Optional session to join the caller's transaction; the
+                caller must call invalidate_reads once it commits
+        Returns:
+            Optional[Solicitud]: Deleted solicitation, None if not found
+        """
+        collection = SolicitudMongoModel.get_collection()
+
+        if not ObjectId.is_valid(solicitud_id):
+            return None
+        deleted_doc = await collection.find_one_and_delete({"_id": ObjectId(solicitud_id)}, session=session)
+        if session is None:
+            SolicitudMongoModel.invalidate_reads(solicitud_id)
+        if not deleted_doc:
+            return None
+        return Solicitud(**SolicitudMongoModel._convert_mongo_doc_to_schema(deleted_doc))
+
     @staticmethod
     async def update_solicitud_estado(solicitud_id: str, estado: str) -> Optional[Solicitud]:
         """
@@ -198,65 +462,72 @@ class SolicitudMongoModel:
         collection = SolicitudMongoModel.get_collection()
         try:
             object_id = ObjectId(solicitud_id)
-            print(f"[DEBUG] update_solicitud_estado: Buscando _id={object_id} para actualizar a estado={estado}")
+            logger.debug("update_solicitud_estado: _id=%s estado=%s", object_id, estado)
             result = await collection.update_one(
                 {"_id": object_id},
                 {"$set": {"estado": estado}}
             )
-            print(f"[DEBUG] update_solicitud_estado: matched_count={result.matched_count}, modified_count={result.modified_count}")
+            SolicitudMongoModel.invalidate_reads(solicitud_id)
+            logger.debug("update_solicitud_estado: matched_count=%d modified_count=%d", result.matched_count, result.modified_count)
             if result.modified_count > 0:
                 # Obtener el documento actualizado
                 updated_doc = await collection.find_one({"_id": object_id})
                 if updated_doc:
-                    print(f"[DEBUG] update_solicitud_estado: Documento actualizado encontrado")
                     converted_doc = SolicitudMongoModel._convert_mongo_doc_to_schema(updated_doc)
                     return Solicitud(**converted_doc)
-            else:
-                print(f"[DEBUG] update_solicitud_estado: No se modificó ningún documento")
             return None
         except Exception as e:
-            print(f"[DEBUG] update_solicitud_estado: Exception: {e}")
+            logger.warning("update_solicitud_estado falló para %s: %s", solicitud_id, e)
             return None
 
     @staticmethod
-    async def update_solicitud_datos(solicitud_id: str, solicitud_update: SolicitudUpdate) -> Optional[Solicitud]:
+    async def update_solicitud_datos(solicitud_id: str, solicitud_update: SolicitudUpdate, session=None) -> Optional[Solicitud]:
         """
         Update solicitation data in MongoDB
         Args:
             solicitud_id (str): ID of the solicitation
             solicitud_update (SolicitudUpdate): Updated solicitation data
+            session: Optional session to join the caller's transaction; the
+                caller must call invalidate_reads once it commits
         Returns:
             Optional[Solicitud]: Updated solicitation if found, None otherwise
+        Raises:
+            Exception: Any database error when a session is given, so the
+                transaction can be retried or aborted by the caller
         """
         collection = SolicitudMongoModel.get_collection()
         
+        if not ObjectId.is_valid(solicitud_id):
+            return None
         try:
             object_id = ObjectId(solicitud_id)
             update_data = solicitud_update.model_dump(exclude_unset=True)
             
-            print(f"[DEBUG] update_solicitud_datos: ID={solicitud_id}, update_data={update_data}")
+            logger.debug("update_solicitud_datos: id=%s campos=%s", solicitud_id, list(update_data))
             
             result = await collection.update_one(
                 {"_id": object_id},
-                {"$set": update_data}
+                {"$set": update_data},
+                session=session
             )
+            if session is None:
+                SolicitudMongoModel.invalidate_reads(solicitud_id)
             
-            print(f"[DEBUG] update_solicitud_datos: matched_count={result.matched_count}, modified_count={result.modified_count}")
+            logger.debug("update_solicitud_datos: matched_count=%d modified_count=%d", result.matched_count, result.modified_count)
             
             if result.modified_count > 0:
                 # Obtener el documento actualizado
-                updated_doc = await collection.find_one({"_id": object_id})
+                updated_doc = await collection.find_one({"_id": object_id}, session=session)
                 if updated_doc:
-                    print(f"[DEBUG] update_solicitud_datos: Documento actualizado encontrado")
                     # Convertir ObjectId a string para el esquema
                     converted_doc = SolicitudMongoModel._convert_mongo_doc_to_schema(updated_doc)
                     return Solicitud(**converted_doc)
-            else:
-                print(f"[DEBUG] update_solicitud_datos: No se modificó ningún documento")
             
             return None
         except Exception as e:
-            print(f"[DEBUG] update_solicitud_datos: Exception - {e}")
+            if session is not None:
+                raise
+            logger.warning("update_solicitud_datos falló para %s: %s", solicitud_id, e)
             return None
 
     @staticmethod
@@ -278,56 +549,35 @@ class SolicitudMongoModel:
         Returns:
             List[Solicitud]: List of solicitations matching all provided filters
         """
-        collection = SolicitudMongoModel.get_collection()
-        
         # Construir filtro
         filter_query = {}
         
-        def build_regex_filter(value: str) -> dict:
-            """Build regex filter for multiple values separated by commas"""
-            if not value:
-                return None
-            
-            # Split by comma and clean whitespace
-            values = [v.strip() for v in value.split(',') if v.strip()]
-            if not values:
-                return None
-            
-            if len(values) == 1:
-                # Single value - use exact match with case insensitive
-                return {"$regex": f"^{values[0]}$", "$options": "i"}
-            else:
-                # Multiple values - use OR condition
-                return {"$in": values}
-        
         if estado:
-            estado_filter = build_regex_filter(estado)
+            estado_filter = SolicitudMongoModel._build_value_filter(estado)
             if estado_filter:
                 filter_query["estado"] = estado_filter
                 
         if especie:
-            especie_filter = build_regex_filter(especie)
+            especie_filter = SolicitudMongoModel._build_value_filter(especie)
             if especie_filter:
                 filter_query["especie"] = especie_filter
                 
         if tipo_sangre:
-            tipo_sangre_filter = build_regex_filter(tipo_sangre)
+            tipo_sangre_filter = SolicitudMongoModel._build_value_filter(tipo_sangre)
             if tipo_sangre_filter:
                 filter_query["tipo_sangre"] = tipo_sangre_filter
                 
         if urgencia:
-            urgencia_filter = build_regex_filter(urgencia)
+            urgencia_filter = SolicitudMongoModel._build_value_filter(urgencia)
             if urgencia_filter:
                 filter_query["urgencia"] = urgencia_filter
                 
         if localidad:
-            localidad_filter = build_regex_filter(localidad)
+            localidad_filter = SolicitudMongoModel._build_value_filter(localidad)
             if localidad_filter:
                 filter_query["localidad"] = localidad_filter
         
-        cursor = collection.find(filter_query)
-        solicitudes = await cursor.to_list(length=None)
-        return [Solicitud(**SolicitudMongoModel._convert_mongo_doc_to_schema(solicitud)) for solicitud in solicitudes]
+        return await SolicitudMongoModel._find_solicitudes(filter_query)
 
     @staticmethod
     async def get_solicitud_by_id(solicitud_id: str) -> Optional[Solicitud]:
@@ -338,21 +588,37 @@ class SolicitudMongoModel:
         Returns:
             Optional[Solicitud]: Solicitation if found, None otherwise
         """
-        collection = SolicitudMongoModel.get_collection()
-        
-        try:
-            object_id = ObjectId(solicitud_id)
-            solicitud = await collection.find_one({"_id": object_id})
-            
-            if solicitud:
-                # Convertir ObjectId a string para el esquema
-                converted_doc = SolicitudMongoModel._convert_mongo_doc_to_schema(solicitud)
-                return Solicitud(**converted_doc)
-            
+        if not ObjectId.is_valid(solicitud_id):
             return None
+        try:
+            return await _detalles.do(
+                solicitud_id,
+                lambda: SolicitudMongoModel._query_solicitud_by_id(ObjectId(solicitud_id))
+            )
         except Exception:
             return None
 
+    @staticmethod
+    async def _query_solicitud_by_id(object_id: ObjectId) -> Optional[Solicitud]:
+        """
+        Fetch a solicitation by ID and build its schema
+        Args:
+            object_id (ObjectId): ID of the solicitation
+        Returns:
+            Optional[Solicitud]: Solicitation if found, None otherwise
+        """
+        collection = SolicitudMongoModel.get_collection()
+        with fase("db"):
+            solicitud = await collection.find_one({"_id": object_id})
+        
+        if solicitud:
+            # Convertir ObjectId a string para el esquema
+            converted_doc = SolicitudMongoModel._convert_mongo_doc_to_schema(solicitud)
+            with fase("validate"):
+                return Solicitud(**converted_doc)
+        
+        return None
+
     @staticmethod
     async def migrate_from_mock_data():
         """
@@ -364,7 +630,7 @@ class SolicitudMongoModel:
             # Verificar si ya hay datos
             count = await collection.count_documents({})
             if count > 0:
-                print(f"⚠️ La base de datos ya contiene {count} registros. Saltando migración.")
+                logger.warning("La base de datos ya contiene %d registros. Saltando migración.", count)
                 return
             
             # Leer datos del archivo JSON
@@ -374,7 +640,7 @@ class SolicitudMongoModel:
             solicitudes = data.get("solicitudes", [])
             
             if not solicitudes:
-                print("⚠️ No se encontraron datos para migrar.")
+                logger.warning("No se encontraron datos para migrar.")
                 return
             
             # Convertir IDs string a ObjectId
@@ -385,8 +651,9 @@ class SolicitudMongoModel:
             
             # Insertar datos
             result = await collection.insert_many(solicitudes)
-            print(f"✅ Migrados {len(result.inserted_ids)} registros a MongoDB")
+            SolicitudMongoModel.invalidate_reads()
+            logger.info("Migrados %d registros a MongoDB", len(result.inserted_ids))
             
         except Exception as e:
-            print(f"❌ Error durante la migración: {e}")
+            logger.exception("Error durante la migración")
             # No lanzar excepción para evitar que falle el startup 
\ No newline at end of file
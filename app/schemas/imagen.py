@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Any, Dict
+from pydantic import BaseModel, Field, ConfigDict
+
+class FirmaSubidaImagen(BaseModel):
+    upload_url: str = Field(..., description="URL del almacenamiento a la que el cliente envía la imagen")
+    method: str = Field(..., description="Método HTTP de la subida")
+    fields: Dict[str, Any] = Field(..., description="Campos del formulario multipart a enviar junto al archivo (campo 'file')")
+    public_id: str = Field(..., description="Identificador del recurso que se creará")
+    expira_en: datetime = Field(..., description="Fecha a partir de la cual la firma deja de ser válida")
+
+    model_config = ConfigDict(
+        title="Firma de Subida Directa",
+        description="Parámetros firmados para subir la imagen de la mascota directamente al almacenamiento",
+        json_schema_extra={
+            "example": {
+                "upload_url": "https://api.cloudinary.com/v1_1/cloud_name/image/upload",
+                "method": "POST",
+                "fields": {
+                    "folder": "petmatch-solicitudes",
+                    "public_id": "684a01e4c351aa9d49b145b8-1718312400-9f1c2a3b",
+                    "timestamp": 1718312400,
+                    "allowed_formats": "jpg,jpeg,png,webp,gif,heic",
+                    "api_key": "123456789012345",
+                    "signature": "a1b2c3d4e5f6..."
+                },
+                "public_id": "petmatch-solicitudes/684a01e4c351aa9d49b145b8-1718312400-9f1c2a3b",
+                "expira_en": "2024-06-13T21:10:00"
+            }
+        }
+    )
+
+class ConfirmacionSubidaImagen(BaseModel):
+    public_id: str = Field(..., description="public_id retornado por el almacenamiento")
+    version: int = Field(..., description="version retornada por el almacenamiento")
+    signature: str = Field(..., description="signature retornada por el almacenamiento")
+    format: str = Field(..., description="Formato de la imagen retornado por el almacenamiento")
+
+    model_config = ConfigDict(
+        title="Confirmación de Subida Directa",
+        description="Respuesta del almacenamiento tras la subida directa, reenviada por el cliente para registrar la imagen",
+        json_schema_extra={
+            "example": {
+                "public_id": "petmatch-solicitudes/684a01e4c351aa9d49b145b8-1718312400-9f1c2a3b",
+                "version": 1718312455,
+                "signature": "f0e1d2c3b4a5...",
+                "format": "jpg"
+            }
+        }
+    )
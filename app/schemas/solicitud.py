@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from typing import Literal, Optional, Tuple
+from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
 from fastapi import UploadFile
 from app.constants.solicitudes import (
     ESTADOS_PERMITIDOS,
@@ -10,6 +10,41 @@ from app.constants.solicitudes import (
     LOCALIDADES_PERMITIDAS
 )
 
+class PuntoGeo(BaseModel):
+    type: Literal["Point"] = "Point"
+    coordinates: Tuple[float, float] = Field(..., description="[longitud, latitud] en grados (orden GeoJSON)")
+
+    @field_validator('coordinates')
+    @classmethod
+    def validate_coordinates(cls, v):
+        longitud, latitud = v
+        if not -180 <= longitud <= 180:
+            raise ValueError("Longitud inválida. Debe estar entre -180 y 180")
+        if not -90 <= latitud <= 90:
+            raise ValueError("Latitud inválida. Debe estar entre -90 y 90")
+        return v
+
+    @classmethod
+    def desde_lat_lng(cls, latitud: Optional[float], longitud: Optional[float]) -> Optional["PuntoGeo"]:
+        """Construye el punto a partir de latitud y longitud; None si no se envió ninguna"""
+        if latitud is None and longitud is None:
+            return None
+        if latitud is None or longitud is None:
+            raise ValueError("latitud y longitud deben enviarse juntas")
+        return cls(coordinates=(longitud, latitud))
+
+    model_config = ConfigDict(
+        extra='forbid',
+        title="Punto Geográfico",
+        description="Ubicación de la veterinaria como punto GeoJSON",
+        json_schema_extra={
+            "example": {
+                "type": "Point",
+                "coordinates": [-74.0305, 4.6951]
+            }
+        }
+    )
+
 class Solicitud(BaseModel):
     id: str = Field(..., alias="id")
     nombre_veterinaria: str
@@ -26,6 +61,7 @@ class Solicitud(BaseModel):
     estado: str
     fecha_creacion: datetime
     foto_mascota: Optional[str] = None
+    punto: Optional[PuntoGeo] = None
 
     @field_validator('especie')
     @classmethod
@@ -87,6 +123,47 @@ class Solicitud(BaseModel):
         }
     )
 
+class SolicitudCercana(Solicitud):
+    distancia_metros: float = Field(..., description="Distancia desde el punto consultado, en metros")
+
+    model_config = ConfigDict(
+        title="Solicitud Cercana",
+        description="Solicitud activa con su distancia al punto consultado"
+    )
+
+class SolicitudResumen(BaseModel):
+    id: str
+    nombre_veterinaria: str
+    nombre_mascota: str
+    especie: str
+    localidad: str
+    tipo_sangre: str
+    urgencia: str
+    estado: str
+    fecha_creacion: datetime
+    foto_mascota: Optional[str] = None
+    relevancia: float = Field(..., description="Puntuación de relevancia de la búsqueda de texto")
+
+    model_config = ConfigDict(
+        title="Resumen de Solicitud",
+        description="Campos de resumen de una solicitud encontrada por búsqueda de texto",
+        json_schema_extra={
+            "example": {
+                "id": "684a01e4c351aa9d49b145c2",
+                "nombre_veterinaria": "AnimalCare",
+                "nombre_mascota": "Canela",
+                "especie": "Perro",
+                "localidad": "Usaquén",
+                "tipo_sangre": "DEA 1.1+",
+                "urgencia": "Alta",
+                "estado": "Activa",
+                "fecha_creacion": "2025-06-12T18:32:00.000000",
+                "foto_mascota": "https://ejemplo.com/foto-canela.jpg",
+                "relevancia": 1.75
+            }
+        }
+    )
+
 class SolicitudCreate(BaseModel):
     nombre_veterinaria: str
     nombre_mascota: str
@@ -100,6 +177,7 @@ class SolicitudCreate(BaseModel):
     tipo_sangre: str
     urgencia: str
     foto_mascota: Optional[str] = None
+    punto: Optional[PuntoGeo] = None
 
     @field_validator('especie')
     @classmethod
@@ -164,6 +242,7 @@ class SolicitudCreateWithImage(BaseModel):
     peso_minimo: float
     tipo_sangre: str
     urgencia: str
+    punto: Optional[PuntoGeo] = None
 
     @field_validator('especie')
     @classmethod
@@ -227,6 +306,8 @@ class SolicitudCreateInput(BaseModel):
     peso_minimo: float = Field(..., description="Peso mínimo requerido para el donante (en kg)")
     tipo_sangre: str = Field(..., description="Tipo de sangre requerido para la donación")
     urgencia: str = Field(..., description="Nivel de urgencia (Alta, Media, Baja)")
+    latitud: Optional[float] = Field(None, ge=-90, le=90, description="Latitud de la veterinaria (opcional, junto con longitud)")
+    longitud: Optional[float] = Field(None, ge=-180, le=180, description="Longitud de la veterinaria (opcional, junto con latitud)")
 
     @field_validator('especie')
     @classmethod
@@ -256,6 +337,11 @@ class SolicitudCreateInput(BaseModel):
             raise ValueError(f"Localidad inválida. Las localidades permitidas son: {', '.join(LOCALIDADES_PERMITIDAS)}")
         return v
 
+    @model_validator(mode='after')
+    def validate_coordenadas(self):
+        PuntoGeo.desde_lat_lng(self.latitud, self.longitud)
+        return self
+
     model_config = ConfigDict(
         title="Datos de Entrada para Crear Solicitud",
         description="Parámetros requeridos para crear una nueva solicitud de donación",
@@ -284,6 +370,8 @@ class SolicitudUpdateInput(BaseModel):
     descripcion_solicitud: Optional[str] = Field(None, description="Nueva descripción de la solicitud")
     direccion: Optional[str] = Field(None, description="Nueva dirección de la veterinaria")
     estado: Optional[str] = Field(None, description="Nuevo estado de la solicitud")
+    latitud: Optional[float] = Field(None, ge=-90, le=90, description="Nueva latitud de la veterinaria (junto con longitud)")
+    longitud: Optional[float] = Field(None, ge=-180, le=180, description="Nueva longitud de la veterinaria (junto con latitud)")
 
     @field_validator('especie')
     @classmethod
@@ -313,6 +401,11 @@ class SolicitudUpdateInput(BaseModel):
             raise ValueError(f"Estado inválido. Los estados permitidos son: {', '.join(ESTADOS_PERMITIDOS)}")
         return v
 
+    @model_validator(mode='after')
+    def validate_coordenadas(self):
+        PuntoGeo.desde_lat_lng(self.latitud, self.longitud)
+        return self
+
     model_config = ConfigDict(
         title="Datos de Entrada para Actualizar Solicitud",
         description="Parámetros opcionales para actualizar una solicitud existente",
@@ -358,6 +451,7 @@ class SolicitudUpdate(BaseModel):
     direccion: Optional[str] = None
     estado: Optional[str] = None
     foto_mascota: Optional[str] = None
+    punto: Optional[PuntoGeo] = None
 
     @field_validator('especie')
     @classmethod
@@ -1,6 +1,7 @@
 from fastapi import HTTPException, status, Header, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
+from app.core.server_timing import fase
 from app.schemas.auth import AuthenticatedUser, UserType
 
 security = HTTPBearer()
@@ -24,20 +25,21 @@ class AuthService:
         Raises:
             HTTPException: Si el token es inválido o falta userType
         """
-        # Validar que el userType sea válido
-        if user_type not in [UserType.OWNER, UserType.CLINIC]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="userType inválido. Debe ser 'owner' o 'clinic'"
-            )
+        with fase("auth"):
+            # Validar que el userType sea válido
+            if user_type not in [UserType.OWNER, UserType.CLINIC]:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="userType inválido. Debe ser 'owner' o 'clinic'"
+                )
         
-        user = AuthenticatedUser(
-            id="",  # Se puede obtener del token si es necesario
-            email="",  # Se puede obtener del token si es necesario
-            userType=user_type
-        )
+            user = AuthenticatedUser(
+                id="",  # Se puede obtener del token si es necesario
+                email="",  # Se puede obtener del token si es necesario
+                userType=user_type
+            )
         
-        return user
+            return user
     
     @staticmethod
     def verify_user_type(user: AuthenticatedUser, allowed_types: list[UserType]) -> bool:
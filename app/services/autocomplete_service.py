@@ -0,0 +1,80 @@
+"""
+Carga y refresco del índice de autocompletado.
+
+Al arrancar se lee la colección una vez (solo _id y los campos de nombre) y
+se construye el índice en memoria; los endpoints de creación y eliminación lo
+actualizan una vez confirmada la escritura. Cada AUTOCOMPLETE_REFRESH_SECONDS se
+reconstruye completo para recoger las escrituras atendidas por otros workers
+o máquinas.
+"""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from app.core.autocomplete import autocompletado
+from app.core.config import settings
+from app.models.solicitud_mongo import SolicitudMongoModel
+
+logger = logging.getLogger(__name__)
+
+async def reconstruir_indice() -> None:
+    """Lee los nombres de todas las solicitudes y reemplaza el índice"""
+    inicio = time.perf_counter()
+    autocompletado.iniciar_reconstruccion()
+    try:
+        documentos = await SolicitudMongoModel.get_autocomplete_documents(autocompletado.campos)
+    except Exception:
+        autocompletado.cancelar_reconstruccion()
+        raise
+    autocompletado.reconstruir(documentos)
+    logger.info(
+        "Índice de autocompletado construido en %.0f ms: %s",
+        (time.perf_counter() - inicio) * 1000,
+        autocompletado.tamano()
+    )
+
+class AutocompleteRefresher:
+    """Tarea que construye el índice al arrancar y lo reconstruye periódicamente"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._detener: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._detener = asyncio.Event()
+        try:
+            await reconstruir_indice()
+        except Exception as e:
+            # Sin índice el endpoint responde vacío hasta el siguiente refresco
+            logger.warning("No se pudo construir el índice de autocompletado: %r", e)
+        if settings.AUTOCOMPLETE_REFRESH_SECONDS > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._detener.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while not self._detener.is_set():
+            try:
+                await asyncio.wait_for(self._detener.wait(), timeout=settings.AUTOCOMPLETE_REFRESH_SECONDS)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await reconstruir_indice()
+            except Exception:
+                logger.exception("Error reconstruyendo el índice de autocompletado")
+
+# Instancia global
+autocomplete_refresher = AutocompleteRefresher()
@@ -1,16 +1,22 @@
-import cloudinary
-import cloudinary.uploader
-import os
+import logging
+# El SDK de Cloudinary se importa en el primer uso: el arranque no lo carga
+# y con STORAGE_BACKEND=local nunca llega a importarse
+from app.core.config import settings
+
+DEFAULT_FOLDER = "petmatch-solicitudes"
+
+logger = logging.getLogger(__name__)
 
 def get_cloudinary_config():
+    import cloudinary
     cloudinary.config(
-        cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-        api_key=os.getenv("CLOUDINARY_API_KEY"),
-        api_secret=os.getenv("CLOUDINARY_API_SECRET"),
+        cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+        api_key=settings.CLOUDINARY_API_KEY,
+        api_secret=settings.CLOUDINARY_API_SECRET,
         secure=True
     )
 
-def upload_image(file, folder="petmatch-solicitudes", public_id=None):
+def upload_image(file, folder=DEFAULT_FOLDER, public_id=None):
     """
     Sube una imagen a Cloudinary y retorna la URL.
     :param file: archivo tipo bytes o file-like
@@ -18,6 +24,7 @@ def upload_image(file, folder="petmatch-solicitudes", public_id=None):
     :param public_id: nombre personalizado del archivo (sin extensión)
     :return: url de la imagen subida
     """
+    import cloudinary.uploader
     get_cloudinary_config()
     upload_params = {"folder": folder}
     if public_id:
@@ -25,6 +32,34 @@ def upload_image(file, folder="petmatch-solicitudes", public_id=None):
     result = cloudinary.uploader.upload(file, **upload_params)
     return result.get("secure_url")
 
+def extract_public_id(image_url: str):
+    """
+    Extrae el public_id de una URL de Cloudinary
+
+    La URL tiene formato: https://res.cloudinary.com/cloud_name/image/upload/v1234567890/folder/filename.jpg
+    y el public_id es: folder/filename (sin extensión)
+
+    Args:
+        image_url (str): URL de la imagen
+
+    Returns:
+        Optional[str]: public_id, o None si la URL no es de Cloudinary
+    """
+    if not image_url or "cloudinary.com" not in image_url:
+        return None
+    parts = image_url.split("/")
+    if "upload" not in parts:
+        return None
+    upload_index = parts.index("upload")
+    if upload_index + 2 >= len(parts):
+        return None
+    # Obtener la parte después de "upload" y antes del último elemento (que es el filename con extensión)
+    path_parts = parts[upload_index + 2:-1]
+    filename = parts[-1]
+    # Remover extensión del filename
+    filename_without_ext = filename.split(".")[0]
+    return "/".join(path_parts + [filename_without_ext])
+
 def delete_image(image_url: str) -> bool:
     """
     Elimina una imagen de Cloudinary
@@ -33,45 +68,25 @@ def delete_image(image_url: str) -> bool:
         image_url (str): URL de la imagen a eliminar
         
     Returns:
-        bool: True si se eliminó correctamente, False en caso contrario
+        bool: True si se eliminó correctamente (o ya no existía), False en caso contrario
     """
     try:
+        public_id = extract_public_id(image_url)
+        if public_id is None:
+            logger.warning("URL no es de Cloudinary: %s", image_url)
+            return False
+
+        import cloudinary.uploader
         get_cloudinary_config()
-        
-        # Extraer public_id de la URL de Cloudinary
-        if "cloudinary.com" in image_url:
-            # La URL tiene formato: https://res.cloudinary.com/cloud_name/image/upload/v1234567890/folder/filename.jpg
-            # Necesitamos extraer: folder/filename (sin extensión)
-            parts = image_url.split("/")
-            if "upload" in parts:
-                upload_index = parts.index("upload")
-                if upload_index + 2 < len(parts):
-                    # Obtener la parte después de "upload" y antes del último elemento (que es el filename con extensión)
-                    path_parts = parts[upload_index + 2:-1]
-                    filename = parts[-1]
-                    # Remover extensión del filename
-                    filename_without_ext = filename.split(".")[0]
-                    # Construir public_id
-                    public_id = "/".join(path_parts + [filename_without_ext])
-                    
-                    # Eliminar imagen
-                    result = cloudinary.uploader.destroy(public_id)
-                    if result.get("result") == "ok":
-                        print(f"✅ Imagen eliminada de Cloudinary: {public_id}")
-                        return True
-                    else:
-                        print(f"⚠️ Error eliminando imagen de Cloudinary: {result}")
-                        return False
-                else:
-                    print(f"⚠️ URL de Cloudinary malformada: {image_url}")
-                    return False
-            else:
-                print(f"⚠️ URL no es de Cloudinary: {image_url}")
-                return False
+        result = cloudinary.uploader.destroy(public_id)
+        # "not found" también cuenta como éxito: el borrado es idempotente
+        if result.get("result") in ("ok", "not found"):
+            logger.info("Imagen eliminada de Cloudinary: %s", public_id)
+            return True
         else:
-            print(f"⚠️ URL no es de Cloudinary: {image_url}")
+            logger.warning("Error eliminando imagen de Cloudinary: %s", result)
             return False
             
     except Exception as e:
-        print(f"❌ Error eliminando imagen de Cloudinary: {str(e)}")
-        return False
\ No newline at end of file
+        logger.error("Error eliminando imagen de Cloudinary: %s", e)
+        return False
@@ -0,0 +1,238 @@
+"""
+Sondeo de salud en segundo plano para los endpoints de liveness y readiness.
+
+Los chequeos (ping a MongoDB, almacenamiento, saturación del pool y retraso
+del event loop) los ejecuta una tarea cada HEALTH_CHECK_INTERVAL_SECONDS,
+cada uno acotado por HEALTH_CHECK_TIMEOUT_SECONDS. El resultado se guarda ya
+serializado, así que /health/ready responde sin E/S y un ping lento a Atlas
+no hace que el propio chequeo de Fly agote su tiempo.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from pymongo import monitoring
+
+from app.core.config import settings
+from app.db.mongodb import mongodb
+from app.services.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+class PoolUsage(monitoring.ConnectionPoolListener):
+    """Cuenta las conexiones en uso (checked out) de cada servidor del pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._en_uso: Dict[str, int] = {}
+
+    def _sumar(self, event, delta: int) -> None:
+        direccion = f"{event.address[0]}:{event.address[1]}"
+        with self._lock:
+            self._en_uso[direccion] = max(self._en_uso.get(direccion, 0) + delta, 0)
+
+    def connection_checked_out(self, event) -> None:
+        self._sumar(event, 1)
+
+    def connection_checked_in(self, event) -> None:
+        self._sumar(event, -1)
+
+    def pool_cleared(self, event) -> None:
+        with self._lock:
+            self._en_uso.pop(f"{event.address[0]}:{event.address[1]}", None)
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        pass
+
+    def connection_check_out_started(self, event) -> None:
+        pass
+
+    def connection_check_out_failed(self, event) -> None:
+        pass
+
+    def maximo_en_uso(self) -> int:
+        """Conexiones en uso del servidor más cargado"""
+        with self._lock:
+            return max(self._en_uso.values(), default=0)
+
+# Instancia global registrada como listener del cliente de MongoDB
+pool_usage = PoolUsage()
+
+def _verificar_almacenamiento() -> Tuple[bool, Dict[str, Any]]:
+    """
+    Chequeo local del almacenamiento, sin llamadas de red
+
+    Con Cloudinary solo se comprueba que haya credenciales: su API de
+    administración tiene cuota horaria y no debe consumirse en sondeos.
+    """
+    storage = get_storage()
+    if storage.name == "local":
+        directorio = storage.directory
+        ok = os.path.isdir(directorio) and os.access(directorio, os.W_OK)
+        return ok, {"backend": storage.name, "writable": ok}
+    configurado = all([
+        settings.CLOUDINARY_CLOUD_NAME,
+        settings.CLOUDINARY_API_KEY,
+        settings.CLOUDINARY_API_SECRET
+    ])
+    return configurado, {"backend": storage.name, "configured": configurado}
+
+class HealthProber:
+    """
+    Tarea que refresca periódicamente el estado de readiness
+
+    El retraso del event loop se mide como lo que tarda de más en despertar
+    la espera entre sondeos respecto al intervalo pedido.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._detener: Optional[asyncio.Event] = None
+        self._lag_ms = 0.0
+        self._actualizado = 0.0
+        self._listo: Optional[bool] = None
+        self._checks: Dict[str, Dict[str, Any]] = {}
+        self._cuerpo = json.dumps({"status": "starting", "checks": {}}).encode()
+
+    async def start(self) -> None:
+        """Ejecuta un primer sondeo y arranca el refresco periódico"""
+        if self._task is not None:
+            return
+        self._detener = asyncio.Event()
+        await self.refresh()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._detener.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS * 2)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self) -> None:
+        intervalo = settings.HEALTH_CHECK_INTERVAL_SECONDS
+        while not self._detener.is_set():
+            inicio = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._detener.wait(), timeout=intervalo)
+                return
+            except asyncio.TimeoutError:
+                pass
+            self._lag_ms = max((time.perf_counter() - inicio - intervalo) * 1000, 0.0)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Error en el sondeo de salud")
+
+    async def _check_mongodb(self) -> Tuple[bool, Dict[str, Any]]:
+        if mongodb.client is None:
+            return False, {"error": "sin conexión"}
+        inicio = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                mongodb.client.admin.command("ping"),
+                timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            return False, {"error": "timeout"}
+        except Exception as e:
+            return False, {"error": type(e).__name__}
+        return True, {"latency_ms": round((time.perf_counter() - inicio) * 1000, 1)}
+
+    async def _check_storage(self) -> Tuple[bool, Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(
+                run_in_threadpool(_verificar_almacenamiento),
+                timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            return False, {"error": "timeout"}
+        except Exception as e:
+            return False, {"error": type(e).__name__}
+
+    def _check_pool(self) -> Tuple[bool, Dict[str, Any]]:
+        en_uso = pool_usage.maximo_en_uso()
+        saturacion = en_uso / settings.MONGODB_MAX_POOL_SIZE if settings.MONGODB_MAX_POOL_SIZE else 0.0
+        ok = saturacion < settings.HEALTH_POOL_SATURATION_THRESHOLD
+        return ok, {"in_use": en_uso, "max": settings.MONGODB_MAX_POOL_SIZE, "saturation": round(saturacion, 3)}
+
+    def _check_event_loop(self) -> Tuple[bool, Dict[str, Any]]:
+        ok = self._lag_ms < settings.HEALTH_LOOP_LAG_THRESHOLD_MS
+        return ok, {"lag_ms": round(self._lag_ms, 1)}
+
+    async def refresh(self) -> None:
+        """Ejecuta todos los chequeos y guarda la respuesta serializada"""
+        (mongo_ok, mongo), (storage_ok, storage) = await asyncio.gather(
+            self._check_mongodb(),
+            self._check_storage()
+        )
+        pool_ok, pool = self._check_pool()
+        loop_ok, loop = self._check_event_loop()
+        checks = {
+            "mongodb": {"ok": mongo_ok, **mongo},
+            "storage": {"ok": storage_ok, **storage},
+            "pool": {"ok": pool_ok, **pool},
+            "event_loop": {"ok": loop_ok, **loop}
+        }
+        listo = all(check["ok"] for check in checks.values())
+        if listo != self._listo:
+            fallidos = [nombre for nombre, check in checks.items() if not check["ok"]]
+            if listo:
+                logger.info("Instancia lista")
+            else:
+                logger.warning("Instancia no lista: %s", ", ".join(fallidos), extra={"checks": checks})
+        self._listo = listo
+        self._checks = checks
+        self._actualizado = time.monotonic()
+        self._cuerpo = json.dumps({
+            "status": "ready" if listo else "unavailable",
+            "checked_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "checks": checks
+        }).encode()
+
+    def readiness(self) -> Tuple[int, bytes]:
+        """
+        Último resultado cacheado del sondeo
+
+        Returns:
+            Tuple[int, bytes]: 200 si la instancia está lista, 503 si no o si
+                el sondeo lleva más de tres intervalos sin actualizarse
+        """
+        vigente = time.monotonic() - self._actualizado <= settings.HEALTH_CHECK_INTERVAL_SECONDS * 3
+        if self._listo and vigente:
+            return 200, self._cuerpo
+        if self._listo:
+            return 503, json.dumps({"status": "stale", "checks": {}}).encode()
+        return 503, self._cuerpo
+
+    @property
+    def mongodb_ok(self) -> bool:
+        """Estado de MongoDB en el último sondeo"""
+        return self._checks.get("mongodb", {}).get("ok", False)
+
+# Instancia global
+health_prober = HealthProber()
@@ -0,0 +1,151 @@
+"""
+Almacenamiento de imágenes con deduplicación por contenido.
+
+Las imágenes idénticas (mismo SHA-256) se suben una sola vez: el índice
+``imagenes`` guarda la URL de cada contenido y un contador de referencias,
+y la imagen solo se borra del almacenamiento cuando la última solicitud que
+la usaba deja de hacerlo.
+
+También emite y verifica las firmas de subida directa, con las que el
+cliente envía la imagen al almacenamiento sin que los bytes pasen por la API.
+"""
+import re
+import secrets
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS, observar_almacenamiento
+
+from app.models.imagen_mongo import ImagenMongoModel
+from app.models.solicitud_mongo import SolicitudMongoModel
+from app.models.outbox_mongo import OutboxMongoModel, TIPO_ELIMINAR_IMAGEN
+from app.services.outbox_worker import outbox_worker
+from app.services.storage import get_storage
+from app.services.upload_service import ImagenSubida
+
+async def guardar_imagen(imagen: ImagenSubida, public_id: str) -> str:
+    """
+    Obtiene la URL de una imagen, subiéndola solo si su contenido no está indexado
+
+    Args:
+        imagen (ImagenSubida): Imagen leída del formulario
+        public_id (str): Nombre a usar si hay que subirla. Debe ser único por
+            subida para no sobrescribir una imagen compartida
+
+    Returns:
+        str: URL de la imagen
+    """
+    url = await ImagenMongoModel.acquire(imagen.sha256)
+    if url:
+        CACHE_REQUESTS.inc(cache="imagenes", result="hit")
+        return url
+    CACHE_REQUESTS.inc(cache="imagenes", result="miss")
+
+    storage = get_storage()
+    with observar_almacenamiento(storage.name, "upload"):
+        url = await run_in_threadpool(storage.upload, imagen.data, public_id, imagen.content_type)
+    url_registrada = await ImagenMongoModel.register(imagen.sha256, url)
+    if url_registrada != url:
+        # Otra petición subió el mismo contenido a la vez: se usa su copia
+        # y la nuestra se elimina en segundo plano
+        await OutboxMongoModel.enqueue(TIPO_ELIMINAR_IMAGEN, {"url": url})
+        outbox_worker.notify()
+    return url_registrada
+
+async def retener_imagen(url: str) -> None:
+    """
+    Agrega una referencia a una imagen ya subida que pasa a usar otra solicitud
+
+    Las imágenes que aún no están indexadas (subidas directas o anteriores a la
+    deduplicación) se indexan por URL, contando las solicitudes que ya la usan,
+    para que no se borren mientras alguna la siga referenciando.
+
+    Args:
+        url (str): URL de la imagen
+    """
+    if not get_storage().owns(url):
+        return
+    if await ImagenMongoModel.acquire_url(url):
+        return
+    en_uso = await SolicitudMongoModel.count_by_foto(url)
+    await ImagenMongoModel.register(f"url:{url}", url, referencias=en_uso + 1)
+
+async def liberar_imagen(url: str, session=None) -> bool:
+    """
+    Quita una referencia a la imagen y programa su borrado si era la última
+
+    Args:
+        url (str): URL de la imagen
+        session: Sesión opcional para unirse a la transacción del llamador
+
+    Returns:
+        bool: True si se registró el borrado en el outbox
+    """
+    if not get_storage().owns(url):
+        return False
+    if not await ImagenMongoModel.release(url, session=session):
+        return False
+    await OutboxMongoModel.enqueue(TIPO_ELIMINAR_IMAGEN, {"url": url}, session=session)
+    return True
+
+def firmar_subida(solicitud_id: str) -> Dict[str, Any]:
+    """
+    Emite parámetros firmados y de corta duración para subir la imagen de una
+    solicitud directamente al almacenamiento
+
+    El nombre del recurso incluye el ID de la solicitud y el momento de la
+    firma, de modo que la confirmación puede comprobar ambos sin guardar estado.
+
+    Args:
+        solicitud_id (str): ID de la solicitud
+
+    Returns:
+        Dict[str, Any]: upload_url, method, fields, public_id y expira_en
+
+    Raises:
+        NotImplementedError: Si el almacenamiento no admite subidas directas
+    """
+    key = f"{solicitud_id}-{int(time.time())}-{secrets.token_hex(4)}"
+    firma = get_storage().sign_upload(key, settings.SIGNED_UPLOAD_TTL_SECONDS)
+    return {
+        "upload_url": firma["upload_url"],
+        "method": firma["method"],
+        "fields": firma["fields"],
+        "public_id": firma["public_id"],
+        "expira_en": datetime.fromtimestamp(firma["expires_at"])
+    }
+
+def verificar_subida(solicitud_id: str, resultado: Dict[str, Any]) -> str:
+    """
+    Verifica una subida directa confirmada por el cliente
+
+    Args:
+        solicitud_id (str): ID de la solicitud a la que debe pertenecer la imagen
+        resultado (Dict[str, Any]): Respuesta del almacenamiento reenviada por el cliente
+
+    Returns:
+        str: URL de la imagen subida
+
+    Raises:
+        ValueError: Si la firma no es válida, la imagen es de otra solicitud
+            o la firma ya había expirado cuando se subió
+        NotImplementedError: Si el almacenamiento no admite subidas directas
+    """
+    url = get_storage().verify_upload(resultado)
+    if not url:
+        raise ValueError("La firma de la subida no es válida")
+
+    nombre = str(resultado.get("public_id", "")).rsplit("/", 1)[-1]
+    coincidencia = re.fullmatch(rf"{re.escape(solicitud_id)}-(\d+)-[0-9a-f]{{8}}", nombre)
+    if not coincidencia:
+        raise ValueError("La imagen no corresponde a esta solicitud")
+
+    firmado_en = int(coincidencia.group(1))
+    subido_en = int(resultado.get("version", 0))
+    if subido_en - firmado_en > settings.SIGNED_UPLOAD_TTL_SECONDS:
+        raise ValueError("La firma de la subida expiró")
+    return url
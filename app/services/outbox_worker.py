@@ -0,0 +1,135 @@
+"""
+Worker en segundo plano que drena el outbox de efectos secundarios.
+
+Los endpoints solo registran el efecto pendiente junto a su escritura en
+MongoDB; este worker lo ejecuta por lotes, reintenta los fallos con backoff
+exponencial y, tras OUTBOX_MAX_ATTEMPTS, deja el evento marcado como
+'fallido' en la colección en lugar de descartarlo.
+"""
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import observar_almacenamiento
+from app.models.outbox_mongo import OutboxMongoModel, TIPO_ELIMINAR_IMAGEN
+from app.services.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict], Awaitable[None]]
+
+HANDLERS: Dict[str, Handler] = {}
+
+def handler(tipo: str):
+    """Registra la función que ejecuta un tipo de evento del outbox"""
+    def decorator(func: Handler) -> Handler:
+        HANDLERS[tipo] = func
+        return func
+    return decorator
+
+@handler(TIPO_ELIMINAR_IMAGEN)
+async def eliminar_imagen(payload: Dict) -> None:
+    storage = get_storage()
+    with observar_almacenamiento(storage.name, "delete"):
+        eliminada = await run_in_threadpool(storage.delete, payload["url"])
+    if not eliminada:
+        raise RuntimeError(f"No se pudo eliminar la imagen {payload['url']}")
+
+def calcular_backoff(intentos: int) -> float:
+    """
+    Retardo antes del siguiente intento: exponencial con jitter, acotado
+    por OUTBOX_BACKOFF_MAX_SECONDS
+    """
+    retardo = settings.OUTBOX_BACKOFF_BASE_SECONDS * (2 ** max(intentos - 1, 0))
+    retardo = min(retardo, settings.OUTBOX_BACKOFF_MAX_SECONDS)
+    return retardo * random.uniform(0.5, 1.0)
+
+class OutboxWorker:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._detener: Optional[asyncio.Event] = None
+        self._despertar: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        """Arranca el worker en el event loop actual"""
+        if not settings.OUTBOX_ENABLED or self._task is not None:
+            return
+        self._detener = asyncio.Event()
+        self._despertar = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Detiene el worker; los eventos reclamados y no procesados se reintentan al expirar su lease"""
+        if self._task is None:
+            return
+        self._detener.set()
+        self._despertar.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=10)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+
+    def notify(self) -> None:
+        """Despierta al worker sin esperar al siguiente ciclo de sondeo"""
+        if self._despertar is not None:
+            self._despertar.set()
+
+    async def drain_once(self) -> int:
+        """
+        Procesa un lote de eventos pendientes
+        Returns:
+            int: Número de eventos reclamados
+        """
+        eventos = await OutboxMongoModel.claim_batch(
+            settings.OUTBOX_BATCH_SIZE,
+            settings.OUTBOX_LEASE_SECONDS
+        )
+        if eventos:
+            await asyncio.gather(*(self._procesar(evento) for evento in eventos))
+        return len(eventos)
+
+    async def _procesar(self, evento: Dict) -> None:
+        tipo = evento.get("tipo")
+        func = HANDLERS.get(tipo)
+        try:
+            if func is None:
+                raise RuntimeError(f"Tipo de evento desconocido: {tipo}")
+            await func(evento.get("payload", {}))
+        except Exception as e:
+            intentos = evento.get("intentos", 0) + 1
+            if intentos >= settings.OUTBOX_MAX_ATTEMPTS:
+                logger.error("Outbox: evento %s (%s) falló %d veces, marcado como fallido: %s", evento["_id"], tipo, intentos, e)
+                await OutboxMongoModel.fail(evento, str(e), None)
+            else:
+                await OutboxMongoModel.fail(evento, str(e), calcular_backoff(intentos))
+            return
+        await OutboxMongoModel.complete(evento["_id"])
+
+    async def _run(self) -> None:
+        try:
+            await OutboxMongoModel.ensure_indexes()
+        except Exception as e:
+            logger.warning("Outbox: no se pudo crear el índice: %s", e)
+
+        while not self._detener.is_set():
+            try:
+                procesados = await self.drain_once()
+            except Exception as e:
+                logger.warning("Outbox: error drenando eventos: %s", e)
+                procesados = 0
+            # Si el lote vino lleno probablemente quedan más: seguir sin esperar
+            if procesados >= settings.OUTBOX_BATCH_SIZE:
+                continue
+            try:
+                await asyncio.wait_for(self._despertar.wait(), timeout=settings.OUTBOX_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._despertar.clear()
+
+# Instancia global
+outbox_worker = OutboxWorker()
@@ -0,0 +1,90 @@
+"""
+Límite de peticiones por cliente con token buckets.
+
+Cada cliente autenticado tiene un bucket por presupuesto, y cada IP otro
+RATE_LIMIT_IP_FACTOR veces mayor para que rotar tokens no dé buckets nuevos:
+- "read":   consultas (RATE_LIMIT_READ_PER_MINUTE, RATE_LIMIT_READ_BURST)
+- "write":  creaciones, cambios y borrados sin imagen
+- "upload": peticiones que suben o firman imágenes (cada una puede acabar
+            en una subida a Cloudinary)
+
+RATE_LIMIT_BACKEND selecciona dónde se guardan los buckets:
+- "memory": en el proceso (por defecto; el límite es por worker)
+- "mongodb": compartidos entre máquinas y workers
+"""
+import logging
+import math
+from datetime import timedelta
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import RATE_LIMIT_REJECTIONS
+from app.services.rate_limit.base import RateLimiterBackend
+
+logger = logging.getLogger(__name__)
+
+PRESUPUESTO_LECTURA = "read"
+PRESUPUESTO_ESCRITURA = "write"
+PRESUPUESTO_SUBIDA = "upload"
+
+def limites() -> Dict[str, Tuple[float, float]]:
+    """Capacidad (ráfaga) y recarga por segundo de cada presupuesto"""
+    return {
+        PRESUPUESTO_LECTURA: (settings.RATE_LIMIT_READ_BURST, settings.RATE_LIMIT_READ_PER_MINUTE / 60),
+        PRESUPUESTO_ESCRITURA: (settings.RATE_LIMIT_WRITE_BURST, settings.RATE_LIMIT_WRITE_PER_MINUTE / 60),
+        PRESUPUESTO_SUBIDA: (settings.RATE_LIMIT_UPLOAD_BURST, settings.RATE_LIMIT_UPLOAD_PER_MINUTE / 60)
+    }
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiterBackend:
+    """Retorna el almacén de buckets configurado"""
+    backend = settings.RATE_LIMIT_BACKEND.lower()
+    if backend == "memory":
+        from app.services.rate_limit.memory_backend import MemoryRateLimiter
+        return MemoryRateLimiter(settings.RATE_LIMIT_MAX_KEYS)
+    if backend == "mongodb":
+        from app.services.rate_limit.mongodb_backend import MongoRateLimiter
+        # Un bucket inactivo durante más de lo que tarda en llenarse equivale a uno nuevo
+        ventana = max((capacidad / recarga for capacidad, recarga in limites().values() if recarga > 0), default=60)
+        return MongoRateLimiter(timedelta(seconds=max(math.ceil(ventana), 60)))
+    raise ValueError(f"RATE_LIMIT_BACKEND inválido: {settings.RATE_LIMIT_BACKEND}. Use 'memory' o 'mongodb'")
+
+async def consumir(cliente: str, presupuesto: str, factor: float = 1.0) -> Optional[float]:
+    """
+    Consume un token del presupuesto del cliente
+
+    Si el almacén falla la petición se permite: una caída de MongoDB no debe
+    convertir el límite en un rechazo de todo el tráfico.
+
+    Args:
+        cliente (str): Identificador del cliente autenticado
+        presupuesto (str): "read", "write" o "upload"
+        factor (float): Multiplicador de la ráfaga y la recarga del presupuesto
+
+    Returns:
+        Optional[float]: None si la petición está permitida; si no, segundos
+            hasta que haya un token disponible
+    """
+    capacidad, recarga = limites()[presupuesto]
+    capacidad, recarga = capacidad * factor, recarga * factor
+    try:
+        permitido, tokens = await get_rate_limiter().consume(f"{cliente}:{presupuesto}", capacidad, recarga)
+    except Exception as e:
+        logger.warning("Rate limit no disponible, se permite la petición: %r", e)
+        return None
+    if permitido:
+        return None
+    RATE_LIMIT_REJECTIONS.inc(budget=presupuesto)
+    if recarga <= 0:
+        return 60.0
+    return (1 - tokens) / recarga
+
+__all__ = [
+    "PRESUPUESTO_ESCRITURA",
+    "PRESUPUESTO_LECTURA",
+    "PRESUPUESTO_SUBIDA",
+    "RateLimiterBackend",
+    "consumir",
+    "get_rate_limiter"
+]
@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+from typing import Tuple
+
+class RateLimiterBackend(ABC):
+    """
+    Almacén de token buckets.
+
+    Cada bucket admite ráfagas de hasta `capacity` peticiones y se recarga a
+    `rate` tokens por segundo; una petición consume `cost` tokens.
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    async def consume(self, key: str, capacity: float, rate: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Recarga el bucket según el tiempo transcurrido y consume los tokens si hay
+
+        Args:
+            key (str): Identificador del bucket (cliente y presupuesto)
+            capacity (float): Tokens máximos (ráfaga)
+            rate (float): Tokens recargados por segundo
+            cost (float): Tokens que consume la petición
+
+        Returns:
+            Tuple[bool, float]: Si la petición está permitida y los tokens restantes
+        """
+
+    async def setup(self) -> None:
+        """Prepara el almacén al arrancar (p. ej. índices)"""
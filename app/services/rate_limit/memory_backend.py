@@ -0,0 +1,32 @@
+import time
+from collections import OrderedDict
+from typing import Tuple
+from app.services.rate_limit.base import RateLimiterBackend
+
+class MemoryRateLimiter(RateLimiterBackend):
+    """
+    Token buckets en memoria del proceso. Cada worker y cada máquina llevan
+    su propia cuenta, así que el límite efectivo se multiplica por el número
+    de procesos; para un límite global usar el backend de MongoDB.
+
+    No necesita locks: consume() no cede el event loop entre leer y escribir
+    el bucket.
+    """
+    name = "memory"
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # key -> (tokens, última recarga); orden LRU para acotar la memoria
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def consume(self, key: str, capacity: float, rate: float, cost: float = 1.0) -> Tuple[bool, float]:
+        ahora = time.monotonic()
+        tokens, actualizado = self._buckets.pop(key, (capacity, ahora))
+        tokens = min(capacity, tokens + (ahora - actualizado) * rate)
+        permitido = tokens >= cost
+        if permitido:
+            tokens -= cost
+        self._buckets[key] = (tokens, ahora)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return permitido, tokens
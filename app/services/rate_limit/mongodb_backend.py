@@ -0,0 +1,20 @@
+from datetime import timedelta
+from typing import Tuple
+from app.models.rate_limit_mongo import RateLimitMongoModel
+from app.services.rate_limit.base import RateLimiterBackend
+
+class MongoRateLimiter(RateLimiterBackend):
+    """
+    Token buckets compartidos en MongoDB para despliegues con varias máquinas
+    o workers. Cuesta una ida y vuelta a MongoDB por petición limitada.
+    """
+    name = "mongodb"
+
+    def __init__(self, idle_ttl: timedelta):
+        self.idle_ttl = idle_ttl
+
+    async def setup(self) -> None:
+        await RateLimitMongoModel.ensure_indexes(self.idle_ttl)
+
+    async def consume(self, key: str, capacity: float, rate: float, cost: float = 1.0) -> Tuple[bool, float]:
+        return await RateLimitMongoModel.consume(key, capacity, rate, cost)
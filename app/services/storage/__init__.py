@@ -0,0 +1,27 @@
+"""
+Almacenamiento de imágenes intercambiable.
+
+STORAGE_BACKEND selecciona la implementación:
+- "cloudinary": CDN de Cloudinary (producción)
+- "local": disco local servido en LOCAL_STORAGE_URL_PATH (desarrollo y benchmarks sin red)
+"""
+from functools import lru_cache
+from app.core.config import settings
+from app.services.storage.base import StorageBackend
+
+@lru_cache(maxsize=1)
+def get_storage() -> StorageBackend:
+    """Retorna la instancia de almacenamiento configurada"""
+    backend = settings.STORAGE_BACKEND.lower()
+    if backend == "cloudinary":
+        from app.services.storage.cloudinary_backend import CloudinaryStorage
+        return CloudinaryStorage()
+    if backend == "local":
+        from app.services.storage.local_backend import LocalStorage
+        return LocalStorage(
+            settings.LOCAL_STORAGE_DIR,
+            f"{settings.BASE_URL.rstrip('/')}{settings.LOCAL_STORAGE_URL_PATH}"
+        )
+    raise ValueError(f"STORAGE_BACKEND inválido: {settings.STORAGE_BACKEND}. Use 'cloudinary' o 'local'")
+
+__all__ = ["StorageBackend", "get_storage"]
@@ -0,0 +1,75 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+class StorageBackend(ABC):
+    """
+    Interfaz de almacenamiento de imágenes.
+
+    Los métodos son síncronos (los SDK de terceros lo son); desde código
+    async deben llamarse con run_in_threadpool.
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    def upload(self, data: bytes, key: str, content_type: str = "image/jpeg") -> str:
+        """
+        Guarda la imagen y retorna su URL pública
+
+        Args:
+            data (bytes): Contenido de la imagen
+            key (str): Nombre único del recurso (sin extensión)
+            content_type (str): Tipo MIME de la imagen
+
+        Returns:
+            str: URL pública de la imagen
+        """
+
+    @abstractmethod
+    def delete(self, url: str) -> bool:
+        """
+        Elimina la imagen identificada por su URL. Debe ser idempotente:
+        borrar una imagen que ya no existe cuenta como éxito.
+
+        Returns:
+            bool: True si la imagen ya no existe en el almacenamiento
+        """
+
+    @abstractmethod
+    def url_for(self, key: str) -> str:
+        """Construye la URL pública de un recurso a partir de su nombre"""
+
+    @abstractmethod
+    def owns(self, url: str) -> bool:
+        """Indica si la URL corresponde a un recurso de este almacenamiento"""
+
+    def sign_upload(self, key: str, expires_in: int) -> Dict[str, Any]:
+        """
+        Genera los parámetros firmados para que el cliente suba la imagen
+        directamente al almacenamiento, sin pasar por la API
+
+        Args:
+            key (str): Nombre único del recurso a crear
+            expires_in (int): Segundos de validez de la firma
+
+        Returns:
+            Dict[str, Any]: upload_url, method, fields (campos del formulario a
+                enviar), public_id del recurso y expires_at (timestamp unix)
+
+        Raises:
+            NotImplementedError: Si el almacenamiento no admite subidas directas
+        """
+        raise NotImplementedError(f"El almacenamiento '{self.name}' no admite subidas directas")
+
+    def verify_upload(self, resultado: Dict[str, Any]) -> Optional[str]:
+        """
+        Verifica la respuesta que el almacenamiento entregó al cliente tras una
+        subida directa
+
+        Args:
+            resultado (Dict[str, Any]): Datos de la respuesta reenviados por el cliente
+
+        Returns:
+            Optional[str]: URL de la imagen si la firma es válida, None si no
+        """
+        raise NotImplementedError(f"El almacenamiento '{self.name}' no admite subidas directas")
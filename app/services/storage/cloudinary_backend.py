@@ -0,0 +1,78 @@
+import hmac
+import time
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.services.cloudinary_service import (
+    DEFAULT_FOLDER,
+    delete_image,
+    extract_public_id,
+    get_cloudinary_config,
+    upload_image
+)
+from app.services.storage.base import StorageBackend
+
+# Formatos aceptados en subidas directas
+ALLOWED_FORMATS = ("jpg", "jpeg", "png", "webp", "gif", "heic")
+
+class CloudinaryStorage(StorageBackend):
+    name = "cloudinary"
+
+    def __init__(self, folder: str = DEFAULT_FOLDER):
+        self.folder = folder
+
+    def upload(self, data: bytes, key: str, content_type: str = "image/jpeg") -> str:
+        return upload_image(data, folder=self.folder, public_id=key)
+
+    def delete(self, url: str) -> bool:
+        return delete_image(url)
+
+    def url_for(self, key: str) -> str:
+        import cloudinary.utils
+        get_cloudinary_config()
+        url, _ = cloudinary.utils.cloudinary_url(f"{self.folder}/{key}", secure=True)
+        return url
+
+    def owns(self, url: str) -> bool:
+        return extract_public_id(url) is not None
+
+    def sign_upload(self, key: str, expires_in: int) -> Dict[str, Any]:
+        import cloudinary.utils
+        get_cloudinary_config()
+        timestamp = int(time.time())
+        params = {
+            "folder": self.folder,
+            "public_id": key,
+            "timestamp": timestamp,
+            "allowed_formats": ",".join(ALLOWED_FORMATS)
+        }
+        signature = cloudinary.utils.api_sign_request(params, settings.CLOUDINARY_API_SECRET)
+        return {
+            "upload_url": cloudinary.utils.cloudinary_api_url("upload", resource_type="image"),
+            "method": "POST",
+            "fields": {
+                **params,
+                "api_key": settings.CLOUDINARY_API_KEY,
+                "signature": signature
+            },
+            "public_id": f"{self.folder}/{key}",
+            "expires_at": timestamp + expires_in
+        }
+
+    def verify_upload(self, resultado: Dict[str, Any]) -> Optional[str]:
+        public_id = resultado.get("public_id")
+        version = resultado.get("version")
+        signature = resultado.get("signature") or ""
+        formato = (resultado.get("format") or "").lower()
+        if not public_id or not version or formato not in ALLOWED_FORMATS:
+            return None
+        import cloudinary.utils
+        # Firma de la respuesta de Cloudinary: sha1("public_id=...&version=..." + secret)
+        esperada = cloudinary.utils.api_sign_request(
+            {"public_id": public_id, "version": version},
+            settings.CLOUDINARY_API_SECRET
+        )
+        if not hmac.compare_digest(esperada, signature):
+            return None
+        get_cloudinary_config()
+        url, _ = cloudinary.utils.cloudinary_url(public_id, version=version, format=formato, secure=True)
+        return url
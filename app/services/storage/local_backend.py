@@ -0,0 +1,48 @@
+import mimetypes
+import os
+import tempfile
+from app.services.storage.base import StorageBackend
+
+class LocalStorage(StorageBackend):
+    """
+    Guarda las imágenes en disco y las sirve con la ruta estática montada en
+    main.py. Pensado para desarrollo y pruebas de carga sin red: no depende
+    de ningún servicio externo.
+    """
+    name = "local"
+
+    def __init__(self, directory: str, base_url: str):
+        self.directory = os.path.abspath(directory)
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(self.directory, exist_ok=True)
+
+    def upload(self, data: bytes, key: str, content_type: str = "image/jpeg") -> str:
+        extension = mimetypes.guess_extension(content_type) or ".bin"
+        filename = f"{key}{extension}"
+        # Escritura atómica: un lector nunca ve un archivo a medio escribir
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(self.directory, filename))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return self.url_for(filename)
+
+    def delete(self, url: str) -> bool:
+        if not self.owns(url):
+            return False
+        filename = os.path.basename(url[len(self.base_url) + 1:])
+        try:
+            os.remove(os.path.join(self.directory, filename))
+        except FileNotFoundError:
+            pass
+        return True
+
+    def url_for(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def owns(self, url: str) -> bool:
+        return bool(url) and url.startswith(self.base_url + "/")
@@ -0,0 +1,261 @@
+"""
+Lectura por streaming de formularios multipart con imagen.
+
+Starlette vuelca cada archivo de un formulario a un SpooledTemporaryFile
+(memoria hasta 1 MB y luego disco) antes de llamar al endpoint, y después
+el archivo se vuelve a leer completo para subirlo. Aquí el cuerpo se consume
+directamente desde ``request.stream()``: los campos de texto se acumulan con
+un tamaño máximo y los bytes de la imagen van a un único buffer acotado por
+``MAX_IMAGE_SIZE_BYTES``, de modo que la memoria por subida concurrente
+nunca supera ese límite y los cuerpos demasiado grandes se rechazan en
+cuanto se detectan. El SHA-256 de la imagen se calcula a la vez que se lee,
+para la deduplicación por contenido (ver image_service).
+"""
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Type
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from app.core.config import settings
+
+# Margen para cabeceras de las partes y campos de texto del formulario
+FORM_OVERHEAD_BYTES = 64 * 1024
+MAX_FORM_FIELDS = 50
+
+
+@dataclass
+class ImagenSubida:
+    filename: str
+    content_type: str
+    data: bytes
+    sha256: str
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+@dataclass
+class FormularioMultipart:
+    campos: Dict[str, str] = field(default_factory=dict)
+    imagen: Optional[ImagenSubida] = None
+
+
+class _ParteActual:
+    def __init__(self):
+        self.headers: Dict[bytes, bytes] = {}
+        self.nombre: Optional[str] = None
+        self.filename: Optional[str] = None
+        self.buffer = bytearray()
+        self.hash = None
+
+
+class _StreamingMultipartParser:
+    """
+    Envuelve el parser incremental de python-multipart aplicando los límites
+    de tamaño mientras se leen los chunks.
+    """
+
+    def __init__(self, boundary: bytes, campo_imagen: str, max_imagen: int, charset: str = "utf-8"):
+        self.campo_imagen = campo_imagen
+        self.max_imagen = max_imagen
+        self.charset = charset
+        self.formulario = FormularioMultipart()
+        self._parte = _ParteActual()
+        self._header_nombre = b""
+        self._header_valor = b""
+        self._num_campos = 0
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    def write(self, chunk: bytes) -> None:
+        self._parser.write(chunk)
+
+    def finalize(self) -> FormularioMultipart:
+        self._parser.finalize()
+        return self.formulario
+
+    def _on_part_begin(self) -> None:
+        self._parte = _ParteActual()
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_nombre += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_valor += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._parte.headers[self._header_nombre.lower()] = self._header_valor
+        self._header_nombre = b""
+        self._header_valor = b""
+
+    def _on_headers_finished(self) -> None:
+        _, opciones = parse_options_header(self._parte.headers.get(b"content-disposition", b""))
+        if b"name" not in opciones:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Cada parte del formulario debe incluir el campo "name"'
+            )
+        self._parte.nombre = opciones[b"name"].decode(self.charset, errors="replace")
+        if b"filename" in opciones:
+            if self._parte.nombre != self.campo_imagen:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Solo se admite un archivo en el campo '{self.campo_imagen}'"
+                )
+            self._parte.filename = opciones[b"filename"].decode(self.charset, errors="replace")
+            self._parte.hash = hashlib.sha256()
+        else:
+            self._num_campos += 1
+            if self._num_campos > MAX_FORM_FIELDS:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Demasiados campos en el formulario. Máximo: {MAX_FORM_FIELDS}"
+                )
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        limite = self.max_imagen if self._parte.filename is not None else settings.MAX_FORM_FIELD_BYTES
+        if len(self._parte.buffer) + (end - start) > limite:
+            if self._parte.filename is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"La imagen excede el tamaño máximo de {limite // (1024 * 1024)} MB"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"El campo '{self._parte.nombre}' excede el tamaño máximo permitido"
+            )
+        self._parte.buffer += data[start:end]
+        if self._parte.hash is not None:
+            self._parte.hash.update(data[start:end])
+
+    def _on_part_end(self) -> None:
+        parte = self._parte
+        if parte.filename is None:
+            self.formulario.campos[parte.nombre] = parte.buffer.decode(self.charset, errors="replace")
+            return
+        # Los navegadores envían una parte vacía cuando no se selecciona archivo
+        if not parte.filename and not parte.buffer:
+            return
+        content_type = parte.headers.get(b"content-type", b"application/octet-stream").decode("latin-1")
+        if not content_type.startswith("image/"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El archivo debe ser una imagen"
+            )
+        self.formulario.imagen = ImagenSubida(
+            filename=parte.filename,
+            content_type=content_type,
+            data=bytes(parte.buffer),
+            sha256=parte.hash.hexdigest()
+        )
+
+
+async def leer_formulario_multipart(
+    request: Request,
+    campo_imagen: str = "foto_mascota",
+    max_imagen: Optional[int] = None
+) -> FormularioMultipart:
+    """
+    Lee el formulario de la petición sin volcar archivos a disco.
+
+    Args:
+        request (Request): Petición entrante
+        campo_imagen (str): Nombre del único campo de archivo admitido
+        max_imagen (Optional[int]): Tamaño máximo de la imagen en bytes
+
+    Returns:
+        FormularioMultipart: Campos de texto y, si se envió, la imagen
+
+    Raises:
+        HTTPException: 413 si el cuerpo o la imagen exceden el límite,
+            400 si el formulario está mal formado o el archivo no es una imagen
+    """
+    max_imagen = max_imagen or settings.MAX_IMAGE_SIZE_BYTES
+    content_type = request.headers.get("content-type", "")
+
+    if not content_type.startswith("multipart/form-data"):
+        # Formularios urlencoded o cuerpos vacíos: no traen archivos
+        if not content_type.startswith("application/x-www-form-urlencoded"):
+            return FormularioMultipart()
+        form = await request.form()
+        return FormularioMultipart(campos={k: v for k, v in form.items() if isinstance(v, str)})
+
+    # Rechazo temprano: si el cliente declara un cuerpo mayor al permitido
+    # no se lee ni un byte
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_imagen + FORM_OVERHEAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"La petición excede el tamaño máximo de {max_imagen // (1024 * 1024)} MB"
+        )
+
+    _, params = parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Falta el boundary del formulario multipart"
+        )
+    charset = params.get(b"charset", b"utf-8").decode("latin-1")
+
+    parser = _StreamingMultipartParser(boundary, campo_imagen, max_imagen, charset)
+    recibidos = 0
+    async for chunk in request.stream():
+        recibidos += len(chunk)
+        if recibidos > max_imagen + FORM_OVERHEAD_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"La petición excede el tamaño máximo de {max_imagen // (1024 * 1024)} MB"
+            )
+        parser.write(chunk)
+    return parser.finalize()
+
+
+def esquema_multipart(
+    modelo: Type[BaseModel],
+    campo_imagen: str = "foto_mascota",
+    descripcion_imagen: str = "Imagen de la mascota (opcional)"
+) -> Dict[str, Any]:
+    """
+    Construye el ``requestBody`` de OpenAPI para endpoints que leen el
+    formulario manualmente, manteniendo la documentación de /docs.
+    """
+    schema = modelo.model_json_schema()
+    propiedades = {}
+    for nombre, prop in schema.get("properties", {}).items():
+        # Los campos Optional[...] se documentan con su tipo no nulo
+        if "anyOf" in prop:
+            tipos = [p for p in prop["anyOf"] if p.get("type") != "null"]
+            prop = {k: v for k, v in prop.items() if k != "anyOf"}
+            if tipos:
+                prop.update(tipos[0])
+        propiedades[nombre] = prop
+    propiedades[campo_imagen] = {
+        "type": "string",
+        "format": "binary",
+        "description": descripcion_imagen
+    }
+    body_schema = {"type": "object", "properties": propiedades}
+    if schema.get("required"):
+        body_schema["required"] = schema["required"]
+    return {
+        "requestBody": {
+            "required": bool(schema.get("required")),
+            "content": {"multipart/form-data": {"schema": body_schema}}
+        }
+    }
@@ -0,0 +1,76 @@
+"""
+Calentamiento de la instancia al arrancar.
+
+Con min_machines_running = 0 la primera petición suele llegar a una máquina
+recién creada. Antes de aceptar tráfico se abren las conexiones del pool, se
+construye el esquema OpenAPI y se ejecuta la consulta del feed de solicitudes
+activas, para que ese coste no lo pague el primer usuario. Cada paso es
+opcional en la práctica: si falla o se agota el tiempo, se registra y el
+arranque continúa.
+"""
+import asyncio
+import logging
+import time
+
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.db.mongodb import mongodb
+from app.models.imagen_mongo import ImagenMongoModel
+from app.models.outbox_mongo import OutboxMongoModel
+from app.models.solicitud_mongo import SolicitudMongoModel
+from app.services.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+async def _abrir_conexiones() -> None:
+    """
+    Abre minPoolSize conexiones lanzando pings concurrentes: cada operación
+    simultánea necesita su propia conexión, así el DNS SRV y los handshakes
+    TLS se resuelven ahora y no en las primeras peticiones
+    """
+    conexiones = max(settings.MONGODB_MIN_POOL_SIZE, 1)
+    await asyncio.gather(*(mongodb.client.admin.command("ping") for _ in range(conexiones)))
+
+async def _construir_esquemas(app: FastAPI) -> None:
+    """Genera el esquema OpenAPI y el backend de almacenamiento"""
+    app.openapi()
+    get_storage()
+
+async def _precargar_feed() -> None:
+    """
+    Ejecuta la consulta del feed de solicitudes activas: calienta la caché
+    del servidor y la validación de los modelos de respuesta
+    """
+    await SolicitudMongoModel.get_active_solicitudes()
+
+async def _cargar_indices() -> None:
+    """Carga los metadatos de índices de las colecciones usadas en caliente"""
+    for modelo in (SolicitudMongoModel, ImagenMongoModel, OutboxMongoModel):
+        await modelo.get_collection().index_information()
+
+async def ejecutar_warmup(app: FastAPI) -> None:
+    """
+    Ejecuta las etapas de calentamiento, cada una acotada por WARMUP_TIMEOUT_SECONDS
+
+    Args:
+        app (FastAPI): Aplicación cuyo esquema OpenAPI se construye
+    """
+    if not settings.WARMUP_ENABLED:
+        return
+
+    etapas = [
+        ("conexiones", _abrir_conexiones),
+        ("esquemas", lambda: _construir_esquemas(app)),
+        ("feed", _precargar_feed),
+        ("índices", _cargar_indices),
+    ]
+    inicio_total = time.perf_counter()
+    for nombre, etapa in etapas:
+        inicio = time.perf_counter()
+        try:
+            await asyncio.wait_for(etapa(), timeout=settings.WARMUP_TIMEOUT_SECONDS)
+            logger.info("Warm-up %s: %.0f ms", nombre, (time.perf_counter() - inicio) * 1000)
+        except Exception as e:
+            logger.warning("Warm-up %s falló: %r", nombre, e)
+    logger.info("Warm-up completado en %.0f ms", (time.perf_counter() - inicio_total) * 1000)
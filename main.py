@@ -6,27 +6,63 @@ from contextlib import asynccontextmanager
 load_dotenv()
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
+from app.core.admission import AdmissionControlMiddleware
+from app.core.logging_config import RequestContextMiddleware, configure_logging, shutdown_logging
+from app.core.metrics import PrometheusMiddleware, registry
+from app.core.server_timing import ServerTimingMiddleware, TimedJSONResponse, server_timing_habilitado
 from app.db.mongodb import mongodb
 from app.api.v1.api import api_router
+from app.models.imagen_mongo import ImagenMongoModel
+from app.models.solicitud_mongo import SolicitudMongoModel
+from app.services.autocomplete_service import autocomplete_refresher
+from app.services.health_service import health_prober
+from app.services.outbox_worker import outbox_worker
+from app.services.rate_limit import get_rate_limiter
+from app.services.warmup_service import ejecutar_warmup
+
+configure_logging()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description=settings.DESCRIPTION,
+    default_response_class=TimedJSONResponse,
     lifespan=None  # Se reemplazará abajo
 )
 
 # Lifespan para inicialización y cierre
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    configure_logging()
     await mongodb.connect_to_mongo()
+    await ImagenMongoModel.ensure_indexes()
+    await SolicitudMongoModel.ensure_indexes()
+    if settings.RATE_LIMIT_ENABLED:
+        await get_rate_limiter().setup()
+    # Antes del yield: la instancia no recibe tráfico hasta terminar
+    await ejecutar_warmup(app)
+    await autocomplete_refresher.start()
+    outbox_worker.start()
+    await health_prober.start()
     yield
+    await health_prober.stop()
+    await autocomplete_refresher.stop()
+    await outbox_worker.stop()
     await mongodb.close_mongo_connection()
+    shutdown_logging()
 
 app.router.lifespan_context = lifespan
 
+# Cola de admisión con descarte de lecturas ante retardo de cola persistente.
+# Se registra antes que CORS para quedar por dentro: los 503 de descarte
+# llevan las cabeceras CORS y el navegador entrega la respuesta al frontend
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -36,9 +72,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Desglose por fases en el header Server-Timing
+if server_timing_habilitado():
+    app.add_middleware(ServerTimingMiddleware)
+
+# request_id y access log muestreado
+app.add_middleware(RequestContextMiddleware)
+
+# Métricas de latencia por ruta (el middleware más externo mide todo el stack)
+if settings.METRICS_ENABLED:
+    app.add_middleware(PrometheusMiddleware)
+
 # Include routers
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Imágenes servidas desde disco cuando se usa el almacenamiento local
+if settings.STORAGE_BACKEND == "local":
+    os.makedirs(settings.LOCAL_STORAGE_DIR, exist_ok=True)
+    app.mount(
+        settings.LOCAL_STORAGE_URL_PATH,
+        StaticFiles(directory=settings.LOCAL_STORAGE_DIR),
+        name="media"
+    )
+
 @app.get("/")
 async def root():
     return {
@@ -46,7 +102,7 @@ async def root():
         "version": settings.VERSION,
         "features": [
                     "Gestión de solicitudes de donación de sangre",
-        "Soporte para imágenes con Cloudinary",
+        "Soporte para imágenes con Cloudinary o almacenamiento local",
         "Base de datos MongoDB",
         "Endpoints para veterinarias y usuarios"
         ]
@@ -56,20 +112,40 @@ async def root():
 async def health_check():
     """
     Endpoint para verificar el estado de la aplicación
+
+    Usa el último resultado del sondeo en segundo plano: no hace ping a MongoDB
     """
-    try:
-        # Verificar MongoDB
-        await mongodb.client.admin.command('ping')
-        mongo_status = "healthy"
-    except Exception:
-        mongo_status = "unhealthy"
-    
     return {
         "status": "ok",
-        "mongodb": mongo_status,
-        "cloudinary": "configured"
+        "mongodb": "healthy" if health_prober.mongodb_ok else "unhealthy",
+        "storage": settings.STORAGE_BACKEND
     }
 
+@app.get("/health/live", include_in_schema=False)
+async def liveness():
+    """
+    Liveness: el proceso responde; no depende de servicios externos
+    """
+    return Response(content=b'{"status":"ok"}', media_type="application/json")
+
+@app.get("/health/ready", include_in_schema=False)
+async def readiness():
+    """
+    Readiness: estado cacheado de MongoDB, almacenamiento, pool y event loop (503 si no está lista)
+    """
+    status_code, cuerpo = health_prober.readiness()
+    return Response(content=cuerpo, status_code=status_code, media_type="application/json")
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Métricas en formato de exposición de Prometheus
+    """
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("Métricas deshabilitadas\n", status_code=404)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host=settings.HOST, port=settings.PORT, reload=True) 
\ No newline at end of file
+    # Servidor de desarrollo; en producción usar server.py
+    uvicorn.run("main:app", host=settings.HOST, port=settings.PORT, reload=settings.DEBUG) 
\ No newline at end of file
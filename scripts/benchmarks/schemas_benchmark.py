@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks del camino caliente por documento:
+`_convert_mongo_doc_to_schema` → `Solicitud(**doc)` → codificación JSON.
+
+Los documentos se generan a partir de app/data/mock_data.json con la forma
+que devuelve Motor (`_id` ObjectId, `fecha_creacion` datetime) y se miden
+lotes de 1, 100 y 10 000 elementos. Cada caso se calibra para que una ronda
+dure al menos --min-round-ms y se repite hasta --max-time segundos; se
+reportan min/media/mediana/desviación por llamada y el costo por elemento,
+como pytest-benchmark.
+
+Grupos:
+- convert:  conversión del documento de MongoDB (incluye la copia del dict)
+- validate: construcción validada frente a confiable (model_construct) de
+            Solicitud y de cada esquema de app/schemas/solicitud.py
+- encode:   cada codificador de la respuesta (jsonable_encoder + json de
+            FastAPI, model_dump_json, TypeAdapter.dump_json, orjson si está)
+- pipeline: el recorrido completo de un feed con response_model
+
+Los resultados se guardan como baseline JSON en scripts/benchmarks/baselines/
+y se comparan contra uno anterior para detectar regresiones en revisión.
+
+Uso:
+    python scripts/benchmarks/schemas_benchmark.py [--sizes 1,100,10000]
+        [--filter validate] [--save baseline] [--compare baseline] [--threshold 15]
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+os.chdir(PROJECT_ROOT)
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.models.solicitud_mongo import SolicitudMongoModel
+from app.schemas import solicitud as schemas
+from app.schemas.solicitud import Solicitud
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MOCK_DATA_FILE = PROJECT_ROOT / "app" / "data" / "mock_data.json"
+BASELINES_DIR = Path(__file__).parent / "baselines"
+DEFAULT_SIZES = "1,100,10000"
+
+# Esquemas de entrada y salida: todos los BaseModel de app/schemas/solicitud.py
+SCHEMA_CLASSES = [
+    valor for valor in vars(schemas).values()
+    if isinstance(valor, type) and issubclass(valor, BaseModel) and valor.__module__ == schemas.__name__
+]
+
+SOLICITUDES_ADAPTER = TypeAdapter(List[Solicitud])
+
+# Campos que agrega la consulta ($geoNear, $text) y no se guardan en el documento
+CAMPOS_CALCULADOS = {"distancia_metros": 850.0, "relevancia": 1.5}
+
+def generar_documentos(cantidad: int, seed: int = 42) -> List[Dict]:
+    """
+    Documentos con la forma que devuelve Motor, variando los de mock_data.json
+
+    Cada documento recibe un ObjectId propio, una fecha distinta, un punto
+    GeoJSON en Bogotá y un nombre de mascota único para que ninguna caché de
+    cadenas distorsione la medida.
+    """
+    with open(MOCK_DATA_FILE, "r", encoding="utf-8") as f:
+        base = json.load(f)["solicitudes"]
+    rng = random.Random(seed)
+    inicio = datetime(2024, 1, 1)
+    documentos = []
+    for i in range(cantidad):
+        doc = dict(rng.choice(base))
+        doc.pop("id", None)
+        doc["_id"] = ObjectId()
+        doc["nombre_mascota"] = f"{doc['nombre_mascota']} {i}"
+        doc["peso_minimo"] = float(doc["peso_minimo"])
+        doc["fecha_creacion"] = inicio + timedelta(minutes=rng.randint(0, 500_000))
+        doc["punto"] = {
+            "type": "Point",
+            "coordinates": [round(rng.uniform(-74.20, -74.00), 6), round(rng.uniform(4.50, 4.80), 6)]
+        }
+        documentos.append(doc)
+    return documentos
+
+def payload_para(schema: type, doc: Dict) -> Dict:
+    """Subconjunto del documento que acepta el esquema"""
+    if schema is schemas.PuntoGeo:
+        return dict(doc["punto"])
+    payload = {campo: doc[campo] for campo in schema.model_fields if campo in doc}
+    payload.update({campo: valor for campo, valor in CAMPOS_CALCULADOS.items() if campo in schema.model_fields})
+    return payload
+
+class Benchmark:
+    """Caso medible: una función sin argumentos que procesa `items` elementos"""
+
+    def __init__(self, group: str, name: str, items: int, func: Callable[[], object]):
+        self.group = group
+        self.name = name
+        self.items = items
+        self.func = func
+
+    @property
+    def id(self) -> str:
+        return f"{self.group}/{self.name}[{self.items}]"
+
+def construir_casos(sizes: List[int]) -> List[Benchmark]:
+    """Genera los casos de cada grupo para cada tamaño de lote"""
+    casos: List[Benchmark] = []
+    convert = SolicitudMongoModel._convert_mongo_doc_to_schema
+    for n in sizes:
+        docs = generar_documentos(n)
+        convertidos = [convert(dict(doc)) for doc in docs]
+        modelos = [Solicitud(**doc) for doc in convertidos]
+
+        # La conversión muta el documento: cada llamada trabaja sobre una copia
+        casos.append(Benchmark("convert", "dict_copy", n, lambda docs=docs: [dict(d) for d in docs]))
+        casos.append(Benchmark("convert", "convert_mongo_doc", n,
+                               lambda docs=docs: [convert(dict(d)) for d in docs]))
+
+        casos.append(Benchmark("validate", "Solicitud(**doc)", n,
+                               lambda c=convertidos: [Solicitud(**d) for d in c]))
+        casos.append(Benchmark("validate", "Solicitud.model_validate", n,
+                               lambda c=convertidos: [Solicitud.model_validate(d) for d in c]))
+        casos.append(Benchmark("validate", "TypeAdapter(List[Solicitud])", n,
+                               lambda c=convertidos: SOLICITUDES_ADAPTER.validate_python(c)))
+        casos.append(Benchmark("validate", "Solicitud.model_construct", n,
+                               lambda c=convertidos: [Solicitud.model_construct(**d) for d in c]))
+        for schema in SCHEMA_CLASSES:
+            if schema is Solicitud:
+                continue
+            payloads = [payload_para(schema, d) for d in convertidos]
+            if schema is schemas.SolicitudEstadoUpdate:
+                payloads = [{"estado": d["estado"]} for d in convertidos]
+            casos.append(Benchmark("validate", f"{schema.__name__}(**payload)", n,
+                                   lambda s=schema, p=payloads: [s(**d) for d in p]))
+            casos.append(Benchmark("validate", f"{schema.__name__}.model_construct", n,
+                                   lambda s=schema, p=payloads: [s.model_construct(**d) for d in p]))
+
+        # JSONResponse.render de FastAPI sobre jsonable_encoder: el camino por defecto
+        casos.append(Benchmark("encode", "jsonable_encoder+JSONResponse", n,
+                               lambda m=modelos: JSONResponse(jsonable_encoder(m)).body))
+        casos.append(Benchmark("encode", "model_dump(json)+json.dumps", n,
+                               lambda m=modelos: json.dumps([x.model_dump(mode="json") for x in m]).encode()))
+        casos.append(Benchmark("encode", "model_dump_json", n,
+                               lambda m=modelos: b"[" + b",".join(x.model_dump_json().encode() for x in m) + b"]"))
+        casos.append(Benchmark("encode", "TypeAdapter.dump_json", n,
+                               lambda m=modelos: SOLICITUDES_ADAPTER.dump_json(m)))
+        if orjson is not None:
+            casos.append(Benchmark("encode", "orjson(model_dump)", n,
+                                   lambda m=modelos: orjson.dumps([x.model_dump() for x in m])))
+
+        # Feed completo: conversión, construcción en el modelo, revalidación del
+        # response_model y serialización de la respuesta
+        def feed(docs=docs):
+            solicitudes = [Solicitud(**convert(dict(d))) for d in docs]
+            contenido = SOLICITUDES_ADAPTER.dump_python(
+                SOLICITUDES_ADAPTER.validate_python(solicitudes), mode="json"
+            )
+            return JSONResponse(contenido).body
+        casos.append(Benchmark("pipeline", "feed_response", n, feed))
+    return casos
+
+def medir(caso: Benchmark, min_round_ms: float, max_time: float, min_rounds: int) -> Dict:
+    """
+    Calibra las iteraciones por ronda y mide rondas hasta agotar max_time
+
+    Returns:
+        Dict: estadísticas por llamada en microsegundos y costo por elemento en ns
+    """
+    caso.func()  # Calentamiento
+    iteraciones = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(iteraciones):
+            caso.func()
+        duracion = time.perf_counter() - inicio
+        if duracion * 1000 >= min_round_ms:
+            break
+        iteraciones *= 2 if duracion == 0 else max(2, math.ceil(min_round_ms / 1000 / duracion))
+
+    tiempos: List[float] = []
+    limite = time.perf_counter() + max_time
+    while len(tiempos) < min_rounds or time.perf_counter() < limite:
+        inicio = time.perf_counter()
+        for _ in range(iteraciones):
+            caso.func()
+        tiempos.append((time.perf_counter() - inicio) / iteraciones)
+
+    media = statistics.fmean(tiempos)
+    return {
+        "group": caso.group,
+        "name": caso.name,
+        "items": caso.items,
+        "rounds": len(tiempos),
+        "iterations": iteraciones,
+        "min_us": round(min(tiempos) * 1e6, 3),
+        "mean_us": round(media * 1e6, 3),
+        "median_us": round(statistics.median(tiempos) * 1e6, 3),
+        "stddev_us": round(statistics.stdev(tiempos) * 1e6, 3) if len(tiempos) > 1 else 0.0,
+        "per_item_ns": round(statistics.median(tiempos) / caso.items * 1e9, 1),
+        "ops": round(1 / media, 2)
+    }
+
+def contexto() -> Dict:
+    """Versiones y máquina: los baselines solo son comparables en el mismo entorno"""
+    import fastapi
+    import pydantic
+    import pydantic_core
+
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=PROJECT_ROOT, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "pydantic": pydantic.VERSION,
+        "pydantic_core": pydantic_core.__version__,
+        "fastapi": fastapi.__version__,
+        "orjson": getattr(orjson, "__version__", None)
+    }
+
+def ruta_baseline(nombre: str) -> Path:
+    ruta = Path(nombre)
+    if ruta.suffix == ".json" or ruta.parent != Path("."):
+        return ruta
+    return BASELINES_DIR / f"{nombre}.json"
+
+def comparar(resultados: List[Dict], baseline: Dict, threshold: float) -> List[Dict]:
+    """
+    Compara la mediana de cada caso con la del baseline
+
+    Returns:
+        List[Dict]: casos más lentos que el baseline en más de threshold %
+    """
+    anteriores = {f"{r['group']}/{r['name']}[{r['items']}]": r for r in baseline["benchmarks"]}
+    regresiones = []
+    print(f"\n📊 Comparación con baseline ({baseline['context'].get('git_revision')}, umbral {threshold:.0f} %)")
+    for r in resultados:
+        clave = f"{r['group']}/{r['name']}[{r['items']}]"
+        anterior = anteriores.get(clave)
+        if anterior is None:
+            print(f"   {'nuevo':>8}  {clave}")
+            continue
+        cambio = (r["median_us"] - anterior["median_us"]) / anterior["median_us"] * 100
+        marca = "❌" if cambio > threshold else ("✅" if cambio < -threshold else "  ")
+        print(f"{marca} {cambio:+7.1f} %  {clave}")
+        if cambio > threshold:
+            regresiones.append({"benchmark": clave, "change_pct": round(cambio, 1)})
+    return regresiones
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de validación, conversión y serialización")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Tamaños de lote (por defecto {DEFAULT_SIZES})")
+    parser.add_argument("--filter", help="Solo los casos cuyo id contenga este texto")
+    parser.add_argument("--min-round-ms", type=float, default=20.0, help="Duración mínima de una ronda")
+    parser.add_argument("--max-time", type=float, default=1.0, help="Segundos de medición por caso")
+    parser.add_argument("--min-rounds", type=int, default=5, help="Rondas mínimas por caso")
+    parser.add_argument("--save", help="Guardar los resultados como baseline (nombre o ruta .json)")
+    parser.add_argument("--compare", help="Baseline contra el que comparar (nombre o ruta .json)")
+    parser.add_argument("--threshold", type=float, default=15.0, help="Regresión tolerada en %% de la mediana")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    casos = [c for c in construir_casos(sizes) if not args.filter or args.filter in c.id]
+
+    print(f"⏱️ {len(casos)} benchmarks (lotes: {', '.join(map(str, sizes))})")
+    print(f"   {'mediana':>12}  {'por elemento':>13}  {'rondas':>6}  caso")
+    resultados = []
+    for caso in casos:
+        resultado = medir(caso, args.min_round_ms, args.max_time, args.min_rounds)
+        resultados.append(resultado)
+        print(f"   {resultado['median_us']:>9.1f} µs  {resultado['per_item_ns']:>10.1f} ns  "
+              f"{resultado['rounds']:>6}  {caso.id}")
+
+    documento = {"context": contexto(), "benchmarks": resultados}
+    if args.save:
+        ruta = ruta_baseline(args.save)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.write_text(json.dumps(documento, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"\n💾 Baseline guardado en {ruta}")
+
+    if args.compare:
+        baseline = json.loads(ruta_baseline(args.compare).read_text(encoding="utf-8"))
+        regresiones = comparar(resultados, baseline, args.threshold)
+        if regresiones:
+            print(f"\n❌ {len(regresiones)} regresión(es) por encima del {args.threshold:.0f} %")
+            sys.exit(1)
+        print("\n✅ Sin regresiones")
+
+if __name__ == "__main__":
+    main()
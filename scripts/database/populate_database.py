@@ -2,10 +2,15 @@
 """
 Script para poblar la base de datos con datos de mock_data.json
 y subir imágenes a Cloudinary.
+
+Cada imagen se sube una sola vez (con la primera solicitud de su especie,
+por formulario multipart); el resto de solicitudes se crean por JSON
+reutilizando la URL obtenida.
 """
 
 import asyncio
 import json
+import mimetypes
 import os
 import requests
 from pathlib import Path
@@ -21,7 +26,14 @@ load_dotenv()
 
 # Obtener BASE_URL desde variables de entorno o usar valor por defecto
 BASE_URL = os.getenv("BASE_URL", "http://127.0.0.1:8000")
-ENDPOINT = "/api/v1/vet/solicitudes/"
+ENDPOINT = "/api/v1/solicitudes/vet/"
+JSON_ENDPOINT = "/api/v1/solicitudes/vet/json"
+
+# Los endpoints de veterinaria requieren token y tipo de usuario
+HEADERS = {
+    "Authorization": f"Bearer {os.getenv('POPULATE_TOKEN', 'populate-script')}",
+    "X-User-Type": "clinic"
+}
 
 # Obtener la ruta del directorio actual del script
 SCRIPT_DIR = Path(__file__).parent
@@ -52,10 +64,9 @@ def get_image_path(species: str) -> Path:
     
     return image_path
 
-def create_solicitud_request(solicitud_data: Dict[str, Any], image_path: Path) -> Dict[str, Any]:
-    """Crear la petición para crear una solicitud"""
-    # Preparar los datos del formulario
-    form_data = {
+def build_solicitud_fields(solicitud_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Extraer los campos de la solicitud desde mock_data.json"""
+    return {
         'nombre_veterinaria': solicitud_data['nombre_veterinaria'],
         'nombre_mascota': solicitud_data['nombre_mascota'],
         'especie': solicitud_data['especie'],
@@ -64,17 +75,25 @@ def create_solicitud_request(solicitud_data: Dict[str, Any], image_path: Path) -
         'direccion': solicitud_data['direccion'],
         'ubicacion': solicitud_data['ubicacion'],
         'contacto': solicitud_data['contacto'],
-        'peso_minimo': str(solicitud_data['peso_minimo']),
+        'peso_minimo': solicitud_data['peso_minimo'],
         'tipo_sangre': solicitud_data['tipo_sangre'],
         'urgencia': solicitud_data['urgencia']
     }
-    
-    # Preparar el archivo
-    files = {
-        'foto_mascota': (image_path.name, open(image_path, 'rb'), 'image/jpeg')
-    }
-    
-    return form_data, files
+
+def create_solicitud_multipart(solicitud_data: Dict[str, Any], image_path: Path) -> requests.Response:
+    """Crear una solicitud subiendo su imagen por formulario multipart"""
+    form_data = build_solicitud_fields(solicitud_data)
+    form_data['peso_minimo'] = str(form_data['peso_minimo'])
+    content_type = mimetypes.guess_type(image_path.name)[0] or 'image/jpeg'
+    with open(image_path, 'rb') as image_file:
+        files = {'foto_mascota': (image_path.name, image_file, content_type)}
+        return requests.post(f"{BASE_URL}{ENDPOINT}", data=form_data, files=files, headers=HEADERS)
+
+def create_solicitud_json(solicitud_data: Dict[str, Any], foto_url: str) -> requests.Response:
+    """Crear una solicitud por JSON reutilizando una imagen ya subida"""
+    payload = build_solicitud_fields(solicitud_data)
+    payload['foto_mascota'] = foto_url
+    return requests.post(f"{BASE_URL}{JSON_ENDPOINT}", json=payload, headers=HEADERS)
 
 async def populate_database():
     """Función principal para poblar la base de datos"""
@@ -112,26 +131,23 @@ async def populate_database():
     # Crear solicitudes
     success_count = 0
     error_count = 0
+    uploaded_images: Dict[str, str] = {}
     
     for i, solicitud in enumerate(solicitudes, 1):
         try:
             print(f"\n📝 Procesando solicitud {i}/{len(solicitudes)}: {solicitud['nombre_mascota']} ({solicitud['especie']})")
             
-            # Obtener imagen según especie
-            image_path = get_image_path(solicitud['especie'])
-            
-            # Preparar datos
-            form_data, files = create_solicitud_request(solicitud, image_path)
-            
-            # Enviar petición
-            url = f"{BASE_URL}{ENDPOINT}"
-            response = requests.post(url, data=form_data, files=files)
-            
-            # Cerrar el archivo
-            files['foto_mascota'][1].close()
+            # Subir la imagen solo la primera vez que aparece la especie
+            foto_url = uploaded_images.get(solicitud['especie'])
+            if foto_url:
+                response = create_solicitud_json(solicitud, foto_url)
+            else:
+                response = create_solicitud_multipart(solicitud, get_image_path(solicitud['especie']))
             
             if response.status_code == 201:
                 created_solicitud = response.json()
+                if created_solicitud.get('foto_mascota'):
+                    uploaded_images.setdefault(solicitud['especie'], created_solicitud['foto_mascota'])
                 print(f"✅ Creada solicitud: {created_solicitud['id']} - {created_solicitud['nombre_mascota']}")
                 success_count += 1
             else:
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Matching por lotes de donantes contra las solicitudes activas.
+
+Carga las solicitudes activas una sola vez en arreglos columnares de NumPy
+(códigos categóricos de especie, tipo de sangre, localidad y urgencia,
+peso_minimo en float y antigüedad) y puntúa los donantes por bloques: cada
+bloque produce una matriz donantes × solicitudes con operaciones
+vectorizadas, sin bucles de Python por par. Los K mejores matches de cada
+donante se escriben en JSONL a medida que se calculan, así que la memoria no
+crece con el número de donantes.
+
+Compatibilidad: la misma tabla que usa /solicitudes/user/activas/compatibles
+(COMPATIBILIDAD_SANGRE) y peso del donante >= peso_minimo. Puntuación
+(lexicográfica, cada término domina a los siguientes):
+    urgencia > misma localidad > mismo tipo de sangre > antigüedad
+
+Entrada de donantes (CSV con cabecera o JSONL, según la extensión) con los
+campos id, especie, tipo_sangre, peso y, opcionalmente, localidad. Con
+--generate N se generan N donantes aleatorios para medir el throughput.
+
+Uso:
+    python scripts/matching/batch_match.py --donors donantes.csv --output matches.jsonl
+        [--top-k 5] [--block-size N] [--mongodb-url URL | --solicitudes-file export.json]
+    python scripts/matching/batch_match.py --generate 50000 --solicitudes-file app/data/mock_data.json
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.constants.solicitudes import (
+    COMPATIBILIDAD_SANGRE,
+    ESPECIES_PERMITIDAS,
+    LOCALIDADES_PERMITIDAS,
+    TIPOS_SANGRE_PERMITIDOS,
+    TIPOS_SANGRE_POR_ESPECIE,
+    URGENCIAS_PERMITIDAS
+)
+
+# Celdas de la matriz donantes × solicitudes por bloque (~10 MB por arreglo float32)
+CELDAS_POR_BLOQUE = 2_500_000
+
+# Tope de donantes por bloque: con pocas solicitudes los bloques no crecen
+# sin límite y los resultados se siguen escribiendo a medida que se calculan
+MAX_DONANTES_POR_BLOQUE = 10_000
+
+# Pesos de la puntuación: cada término supera la suma máxima de los siguientes
+PESO_URGENCIA = 8.0
+PESO_LOCALIDAD = 4.0
+PESO_TIPO_EXACTO = 2.0
+
+SIN_CODIGO = -1
+
+def _codigos(valores: List[str]) -> Dict[str, int]:
+    return {valor: i for i, valor in enumerate(valores)}
+
+CODIGO_ESPECIE = _codigos(ESPECIES_PERMITIDAS)
+CODIGO_TIPO = _codigos(TIPOS_SANGRE_PERMITIDOS)
+CODIGO_LOCALIDAD = _codigos(LOCALIDADES_PERMITIDAS)
+CODIGO_URGENCIA = _codigos(URGENCIAS_PERMITIDAS)
+
+def matriz_compatibilidad() -> np.ndarray:
+    """
+    Matriz [tipo donante, tipo receptor] con 0 (incompatible), 1 (compatible)
+    o 2 (mismo tipo), construida desde COMPATIBILIDAD_SANGRE
+    """
+    matriz = np.zeros((len(TIPOS_SANGRE_PERMITIDOS), len(TIPOS_SANGRE_PERMITIDOS)), dtype=np.int8)
+    for (_, donante), receptores in COMPATIBILIDAD_SANGRE.items():
+        for receptor in receptores:
+            matriz[CODIGO_TIPO[donante], CODIGO_TIPO[receptor]] = 2 if receptor == donante else 1
+    return matriz
+
+def _epoch(fecha) -> float:
+    """fecha_creacion puede venir como datetime (BSON) o como texto ISO"""
+    if isinstance(fecha, datetime):
+        return fecha.timestamp()
+    try:
+        return datetime.fromisoformat(str(fecha)).timestamp()
+    except ValueError:
+        return 0.0
+
+class SolicitudesColumnares:
+    """Solicitudes activas en arreglos paralelos, una posición por solicitud"""
+
+    def __init__(self, documentos: List[Dict]):
+        self.ids = np.array([str(doc.get("_id", doc.get("id"))) for doc in documentos], dtype=object)
+        self.especie = np.array([CODIGO_ESPECIE.get(doc.get("especie"), SIN_CODIGO) for doc in documentos], dtype=np.int8)
+        self.tipo = np.array([CODIGO_TIPO.get(doc.get("tipo_sangre"), SIN_CODIGO) for doc in documentos], dtype=np.int8)
+        self.localidad = np.array([CODIGO_LOCALIDAD.get(doc.get("localidad"), SIN_CODIGO) for doc in documentos], dtype=np.int16)
+        self.peso_minimo = np.array([float(doc.get("peso_minimo") or 0) for doc in documentos], dtype=np.float32)
+
+        # Parte fija de la puntuación: urgencia y antigüedad normalizada a [0, 1)
+        urgencia = np.array(
+            [CODIGO_URGENCIA.get(doc.get("urgencia"), len(URGENCIAS_PERMITIDAS) - 1) for doc in documentos],
+            dtype=np.float32
+        )
+        fechas = np.array([_epoch(doc.get("fecha_creacion")) for doc in documentos], dtype=np.float64)
+        if len(fechas) and fechas.max() > fechas.min():
+            antiguedad = (fechas.max() - fechas) / (fechas.max() - fechas.min()) * 0.999
+        else:
+            antiguedad = np.zeros(len(fechas))
+        self.base = ((len(URGENCIAS_PERMITIDAS) - 1 - urgencia) * PESO_URGENCIA + antiguedad).astype(np.float32)
+
+        # Solicitudes con valores fuera del catálogo nunca son compatibles
+        self.tipo_valido = np.where(self.tipo == SIN_CODIGO, 0, self.tipo)
+        self.validas = (self.especie != SIN_CODIGO) & (self.tipo != SIN_CODIGO)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+def cargar_solicitudes_mongo(url: str, database: str) -> List[Dict]:
+    """Lee las solicitudes activas con solo los campos que usa el matching"""
+    from pymongo import MongoClient
+
+    campos = {"especie": 1, "tipo_sangre": 1, "localidad": 1, "peso_minimo": 1, "urgencia": 1, "fecha_creacion": 1}
+    cliente = MongoClient(url)
+    try:
+        return list(cliente[database]["solicitudes"].find({"estado": "Activa"}, campos, batch_size=10_000))
+    finally:
+        cliente.close()
+
+def cargar_solicitudes_archivo(ruta: Path) -> List[Dict]:
+    """Lee un export JSON (lista o {"solicitudes": [...]}) y deja solo las activas"""
+    with open(ruta, encoding="utf-8") as archivo:
+        datos = json.load(archivo)
+    if isinstance(datos, dict):
+        datos = datos.get("solicitudes", [])
+    return [doc for doc in datos if doc.get("estado", "Activa") == "Activa"]
+
+def leer_donantes(ruta: Path) -> Iterator[Dict]:
+    """Donantes desde CSV con cabecera o JSONL, uno por fila/línea"""
+    with open(ruta, encoding="utf-8", newline="") as archivo:
+        if ruta.suffix.lower() in (".jsonl", ".ndjson"):
+            for linea in archivo:
+                if linea.strip():
+                    yield json.loads(linea)
+        else:
+            yield from csv.DictReader(archivo)
+
+def generar_donantes(cantidad: int, seed: int) -> Iterator[Dict]:
+    """Donantes sintéticos con especie, tipo, peso y localidad aleatorios"""
+    rng = np.random.default_rng(seed)
+    for i in range(cantidad):
+        especie = ESPECIES_PERMITIDAS[rng.integers(len(ESPECIES_PERMITIDAS))]
+        tipos = TIPOS_SANGRE_POR_ESPECIE[especie]
+        yield {
+            "id": f"donante-{i}",
+            "especie": especie,
+            "tipo_sangre": tipos[rng.integers(len(tipos))],
+            "peso": round(float(rng.uniform(3, 8) if especie == "Gato" else rng.uniform(10, 45)), 1),
+            "localidad": LOCALIDADES_PERMITIDAS[rng.integers(len(LOCALIDADES_PERMITIDAS))]
+        }
+
+def bloques(donantes: Iterable[Dict], tamano: int) -> Iterator[List[Dict]]:
+    bloque = []
+    for donante in donantes:
+        bloque.append(donante)
+        if len(bloque) == tamano:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+def puntuar_bloque(
+    bloque: List[Dict],
+    solicitudes: SolicitudesColumnares,
+    compatibilidad: np.ndarray,
+    top_k: int
+) -> List[List[Dict]]:
+    """
+    Puntúa un bloque de donantes contra todas las solicitudes
+
+    Returns:
+        List[List[Dict]]: Para cada donante, sus hasta top_k matches de mayor a menor puntuación
+    """
+    especie = np.array([CODIGO_ESPECIE.get(d.get("especie"), SIN_CODIGO) for d in bloque], dtype=np.int8)
+    tipo = np.array([CODIGO_TIPO.get(d.get("tipo_sangre"), SIN_CODIGO) for d in bloque], dtype=np.int8)
+    localidad = np.array([CODIGO_LOCALIDAD.get(d.get("localidad"), SIN_CODIGO) for d in bloque], dtype=np.int16)
+    peso = np.array([float(d.get("peso") or 0) for d in bloque], dtype=np.float32)
+    tipo_valido = (especie != SIN_CODIGO) & (tipo != SIN_CODIGO)
+
+    # [bloque, solicitudes]: 0 incompatible, 1 compatible, 2 mismo tipo
+    relacion = compatibilidad[np.where(tipo_valido, tipo, 0)[:, None], solicitudes.tipo_valido[None, :]]
+    compatibles = (
+        (relacion > 0)
+        & tipo_valido[:, None]
+        & solicitudes.validas[None, :]
+        & (especie[:, None] == solicitudes.especie[None, :])
+        & (peso[:, None] >= solicitudes.peso_minimo[None, :])
+    )
+    puntuacion = (
+        solicitudes.base[None, :]
+        + PESO_LOCALIDAD * ((localidad[:, None] == solicitudes.localidad[None, :]) & (localidad[:, None] != SIN_CODIGO))
+        + PESO_TIPO_EXACTO * (relacion == 2)
+    )
+    puntuacion = np.where(compatibles, puntuacion, -np.inf).astype(np.float32)
+
+    k = min(top_k, len(solicitudes))
+    if k < len(solicitudes):
+        candidatos = np.argpartition(-puntuacion, k - 1, axis=1)[:, :k]
+    else:
+        candidatos = np.broadcast_to(np.arange(len(solicitudes)), puntuacion.shape)
+    puntos_candidatos = np.take_along_axis(puntuacion, candidatos, axis=1)
+    orden = np.argsort(-puntos_candidatos, axis=1, kind="stable")
+    mejores = np.take_along_axis(candidatos, orden, axis=1)
+    puntos = np.take_along_axis(puntos_candidatos, orden, axis=1)
+
+    resultados = []
+    for fila in range(len(bloque)):
+        validos = np.isfinite(puntos[fila])
+        resultados.append([
+            {"solicitud_id": solicitudes.ids[j], "score": round(float(p), 4)}
+            for j, p in zip(mejores[fila][validos], puntos[fila][validos])
+        ])
+    return resultados
+
+def ejecutar(
+    donantes: Iterable[Dict],
+    solicitudes: SolicitudesColumnares,
+    salida,
+    top_k: int,
+    tamano_bloque: int
+) -> Dict[str, float]:
+    """Puntúa todos los donantes y escribe una línea JSON por donante"""
+    compatibilidad = matriz_compatibilidad()
+    total = con_match = 0
+    inicio = time.perf_counter()
+    for bloque in bloques(donantes, tamano_bloque):
+        for donante, matches in zip(bloque, puntuar_bloque(bloque, solicitudes, compatibilidad, top_k)):
+            salida.write(json.dumps({"donante_id": donante.get("id"), "matches": matches}, ensure_ascii=False) + "\n")
+            con_match += bool(matches)
+        total += len(bloque)
+    segundos = time.perf_counter() - inicio
+    return {
+        "donantes": total,
+        "donantes_con_match": con_match,
+        "segundos": round(segundos, 3),
+        "donantes_por_segundo": round(total / segundos, 1) if segundos else None,
+        "pares_por_segundo": round(total * len(solicitudes) / segundos, 1) if segundos else None
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Matching por lotes de donantes contra las solicitudes activas")
+    entrada = parser.add_mutually_exclusive_group(required=True)
+    entrada.add_argument("--donors", type=Path, help="Archivo de donantes (.csv o .jsonl)")
+    entrada.add_argument("--generate", type=int, metavar="N", help="Generar N donantes aleatorios")
+    origen = parser.add_mutually_exclusive_group()
+    origen.add_argument("--mongodb-url", help="MongoDB del que leer las solicitudes (por defecto MONGODB_URL)")
+    origen.add_argument("--solicitudes-file", type=Path, help="Export JSON de solicitudes en lugar de MongoDB")
+    parser.add_argument("--database", help="Base de datos (por defecto MONGODB_DATABASE)")
+    parser.add_argument("--output", type=Path, help="Archivo JSONL de salida (por defecto stdout)")
+    parser.add_argument("--top-k", type=int, default=5, help="Matches por donante (por defecto 5)")
+    parser.add_argument("--block-size", type=int, help="Donantes por bloque (por defecto según el número de solicitudes)")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de --generate")
+    args = parser.parse_args(argv)
+
+    if args.top_k < 1:
+        raise SystemExit("❌ --top-k debe ser al menos 1")
+
+    inicio = time.perf_counter()
+    if args.solicitudes_file:
+        documentos = cargar_solicitudes_archivo(args.solicitudes_file)
+    else:
+        from app.core.config import settings
+        documentos = cargar_solicitudes_mongo(
+            args.mongodb_url or settings.MONGODB_URL,
+            args.database or settings.MONGODB_DATABASE
+        )
+    solicitudes = SolicitudesColumnares(documentos)
+    segundos_carga = time.perf_counter() - inicio
+    if not len(solicitudes):
+        print("⚠️  No hay solicitudes activas: todos los donantes quedarán sin match", file=sys.stderr)
+
+    tamano_bloque = args.block_size or min(
+        MAX_DONANTES_POR_BLOQUE,
+        max(1, CELDAS_POR_BLOQUE // max(len(solicitudes), 1))
+    )
+    donantes = leer_donantes(args.donors) if args.donors else generar_donantes(args.generate, args.seed)
+
+    salida = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        reporte = ejecutar(donantes, solicitudes, salida, args.top_k, tamano_bloque)
+    finally:
+        if args.output:
+            salida.close()
+
+    reporte = {
+        "solicitudes_activas": len(solicitudes),
+        "segundos_carga": round(segundos_carga, 3),
+        "top_k": args.top_k,
+        "tamano_bloque": tamano_bloque,
+        **reporte
+    }
+    print(json.dumps(reporte, indent=2), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Profiling scripts package 
\ No newline at end of file
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Perfil de arranque: mide cuánto cuesta importar cada módulo al cargar la app.
+
+Ejecuta `python -X importtime` en un proceso limpio, agrega los tiempos por
+paquete y reporta la memoria residente tras importar, para detectar
+dependencias pesadas que deberían cargarse en el primer uso.
+
+Uso:
+    python scripts/profiling/startup_profile.py [--module main] [--top 25] [--json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# Dependencias que no deberían cargarse durante el arranque
+LAZY_MODULES = ["cloudinary", "reportlab", "PIL"]
+
+# Código que corre en el proceso hijo: importa el módulo y reporta memoria y
+# qué dependencias perezosas quedaron cargadas
+CHILD_CODE = """
+import json, resource, sys, time
+inicio = time.perf_counter()
+import {module}
+duracion = time.perf_counter() - inicio
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+cargados = [m for m in {lazy!r} if m in sys.modules]
+print(json.dumps({{"seconds": duracion, "max_rss_kb": rss_kb, "lazy_loaded": cargados}}))
+"""
+
+def run_importtime(module: str) -> Dict:
+    """Importa el módulo en un proceso nuevo con -X importtime"""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_CODE.format(module=module, lazy=LAZY_MODULES)],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env=env
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit(f"❌ No se pudo importar {module}")
+    resumen = json.loads(result.stdout.strip().splitlines()[-1])
+    resumen["modules"] = parse_importtime(result.stderr)
+    return resumen
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """
+    Convierte la salida de -X importtime en una lista de módulos
+
+    Cada línea tiene el formato: "import time: self_us | cumulative_us | módulo"
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000
+        })
+    return modules
+
+def group_by_package(modules: List[Dict]) -> List[Dict]:
+    """Suma el tiempo propio de cada módulo en su paquete de primer nivel"""
+    packages: Dict[str, float] = defaultdict(float)
+    for module in modules:
+        packages[module["module"].split(".")[0]] += module["self_ms"]
+    return sorted(
+        ({"package": name, "self_ms": total} for name, total in packages.items()),
+        key=lambda p: p["self_ms"],
+        reverse=True
+    )
+
+def print_report(module: str, resumen: Dict, top: int):
+    """Imprime el reporte legible"""
+    modules = resumen["modules"]
+    print(f"🚀 Perfil de importación de '{module}'")
+    print(f"   Tiempo total: {resumen['seconds'] * 1000:.0f} ms")
+    print(f"   RSS máximo:   {resumen['max_rss_kb'] / 1024:.1f} MB")
+    print(f"   Módulos:      {len(modules)}")
+
+    print(f"\n📦 Paquetes con más tiempo propio (top {top})")
+    for package in group_by_package(modules)[:top]:
+        print(f"   {package['self_ms']:9.1f} ms  {package['package']}")
+
+    print(f"\n📄 Módulos con más tiempo acumulado (top {top})")
+    for item in sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)[:top]:
+        print(f"   {item['cumulative_ms']:9.1f} ms  {item['self_ms']:8.1f} ms  {item['module']}")
+
+    if resumen["lazy_loaded"]:
+        print(f"\n⚠️ Dependencias pesadas cargadas durante el arranque: {', '.join(resumen['lazy_loaded'])}")
+    else:
+        print(f"\n✅ Ninguna dependencia pesada ({', '.join(LAZY_MODULES)}) se carga al arrancar")
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de importación del arranque")
+    parser.add_argument("--module", default="main", help="Módulo a importar (por defecto: main)")
+    parser.add_argument("--top", type=int, default=25, help="Número de entradas por sección")
+    parser.add_argument("--json", action="store_true", help="Imprimir el resultado completo en JSON")
+    args = parser.parse_args()
+
+    resumen = run_importtime(args.module)
+    if args.json:
+        resumen["packages"] = group_by_package(resumen["modules"])
+        print(json.dumps(resumen, indent=2, ensure_ascii=False))
+    else:
+        print_report(args.module, resumen, args.top)
+
+if __name__ == "__main__":
+    main()
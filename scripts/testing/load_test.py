@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga con percentiles de latencia.
+
+Lanza peticiones concurrentes (httpx asíncrono) con una mezcla configurable
+de operaciones y reporta en JSON el throughput y los percentiles p50/p95/p99
+globales y por operación, para comparar builds entre sí.
+
+Operaciones de la mezcla:
+- feed:    GET  /solicitudes/user/activas
+- filter:  GET  /solicitudes/vet/filtrar con filtros aleatorios
+- detail:  GET  /solicitudes/user/{id}
+- create:  POST /solicitudes/vet/json
+- estado:  PATCH /solicitudes/vet/{id}/estado (alterna Activa/Revision)
+
+Sin --url arranca la app localmente con uvicorn en un proceso aparte, con
+almacenamiento local en un directorio temporal y MongoDB en memoria
+(mongomock-motor); con --mongodb-url usa ese servidor en su lugar.
+
+Uso:
+    python scripts/testing/load_test.py [--url http://127.0.0.1:8000]
+        [--concurrency 20] [--duration 30] [--requests N]
+        [--mix feed=50,filter=20,detail=20,create=5,estado=5]
+        [--seed-solicitudes 200] [--output resultado.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.constants.solicitudes import (
+    ESPECIES_PERMITIDAS,
+    LOCALIDADES_PERMITIDAS,
+    TIPOS_SANGRE_PERMITIDOS,
+    URGENCIAS_PERMITIDAS
+)
+
+API = "/api/v1"
+HEADERS_OWNER = {"Authorization": "Bearer load-test", "X-User-Type": "owner"}
+HEADERS_CLINIC = {"Authorization": "Bearer load-test", "X-User-Type": "clinic"}
+
+DEFAULT_MIX = "feed=50,filter=20,detail=20,create=5,estado=5"
+OPERACIONES = ("feed", "filter", "detail", "create", "estado")
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Convierte "feed=50,filter=20" en pesos por operación"""
+    pesos = {}
+    for parte in mix.split(","):
+        nombre, _, peso = parte.partition("=")
+        nombre = nombre.strip()
+        if nombre not in OPERACIONES:
+            raise SystemExit(f"❌ Operación desconocida en --mix: {nombre} (válidas: {', '.join(OPERACIONES)})")
+        pesos[nombre] = float(peso or 1)
+    if not any(pesos.values()):
+        raise SystemExit("❌ --mix no tiene ninguna operación con peso positivo")
+    return pesos
+
+def solicitud_aleatoria(rng: random.Random) -> Dict:
+    """Cuerpo válido de SolicitudCreate con valores aleatorios"""
+    localidad = rng.choice(LOCALIDADES_PERMITIDAS)
+    return {
+        "nombre_veterinaria": f"Veterinaria {rng.randint(1, 50)}",
+        "nombre_mascota": f"Mascota {rng.randint(1, 10000)}",
+        "especie": rng.choice(ESPECIES_PERMITIDAS),
+        "localidad": localidad,
+        "descripcion_solicitud": "Solicitud generada por la prueba de carga",
+        "direccion": f"Calle {rng.randint(1, 200)} #{rng.randint(1, 99)}-{rng.randint(1, 99)}",
+        "ubicacion": f"{localidad}, Bogotá",
+        "contacto": f"+57 300 {rng.randint(1000000, 9999999)}",
+        "peso_minimo": rng.choice([5, 10, 15, 20, 25]),
+        "tipo_sangre": rng.choice(TIPOS_SANGRE_PERMITIDOS),
+        "urgencia": rng.choice(URGENCIAS_PERMITIDAS)
+    }
+
+def filtro_aleatorio(rng: random.Random) -> Dict[str, str]:
+    """Uno o dos filtros de la búsqueda de veterinaria"""
+    opciones = {
+        "especie": lambda: rng.choice(ESPECIES_PERMITIDAS),
+        "tipo_sangre": lambda: rng.choice(TIPOS_SANGRE_PERMITIDOS),
+        "urgencia": lambda: rng.choice(URGENCIAS_PERMITIDAS),
+        "localidad": lambda: rng.choice(LOCALIDADES_PERMITIDAS)
+    }
+    campos = rng.sample(list(opciones), rng.randint(1, 2))
+    return {campo: opciones[campo]() for campo in campos}
+
+class LoadTest:
+    """Generador de carga: workers concurrentes que comparten ids y resultados"""
+
+    def __init__(self, client: httpx.AsyncClient, pesos: Dict[str, float], rng: random.Random):
+        self.client = client
+        self.operaciones = list(pesos)
+        self.pesos = list(pesos.values())
+        self.rng = rng
+        self.ids: List[str] = []
+        self.latencias: Dict[str, List[float]] = defaultdict(list)
+        self.estados: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.errores_red: Dict[str, int] = defaultdict(int)
+
+    async def seed(self, cantidad: int, concurrencia: int) -> None:
+        """Crea las solicitudes iniciales sobre las que leen detail y estado"""
+        semaforo = asyncio.Semaphore(concurrencia)
+
+        async def crear():
+            async with semaforo:
+                response = await self.client.post(
+                    f"{API}/solicitudes/vet/json",
+                    json=solicitud_aleatoria(self.rng),
+                    headers=HEADERS_CLINIC
+                )
+                if response.status_code == 201:
+                    self.ids.append(response.json()["id"])
+
+        await asyncio.gather(*(crear() for _ in range(cantidad)))
+        if not self.ids:
+            # Sin nada creado se usan las solicitudes ya existentes
+            response = await self.client.get(f"{API}/solicitudes/vet/", headers=HEADERS_CLINIC)
+            if response.status_code == 200:
+                self.ids = [solicitud["id"] for solicitud in response.json()]
+
+    def _peticion(self, operacion: str) -> Tuple[str, str, Dict]:
+        """Método, ruta y argumentos de httpx para una operación"""
+        if operacion == "feed":
+            return "GET", f"{API}/solicitudes/user/activas", {"headers": HEADERS_OWNER}
+        if operacion == "filter":
+            return "GET", f"{API}/solicitudes/vet/filtrar", {
+                "headers": HEADERS_CLINIC,
+                "params": filtro_aleatorio(self.rng)
+            }
+        if operacion == "create":
+            return "POST", f"{API}/solicitudes/vet/json", {
+                "headers": HEADERS_CLINIC,
+                "json": solicitud_aleatoria(self.rng)
+            }
+        solicitud_id = self.rng.choice(self.ids) if self.ids else "000000000000000000000000"
+        if operacion == "detail":
+            return "GET", f"{API}/solicitudes/user/{solicitud_id}", {"headers": HEADERS_OWNER}
+        return "PATCH", f"{API}/solicitudes/vet/{solicitud_id}/estado", {
+            "headers": HEADERS_CLINIC,
+            "json": {"estado": self.rng.choice(["Activa", "Revision"])}
+        }
+
+    async def _worker(self, deadline: float, restantes: Optional[List[int]]) -> None:
+        while time.perf_counter() < deadline:
+            if restantes is not None:
+                if restantes[0] <= 0:
+                    return
+                restantes[0] -= 1
+            operacion = self.rng.choices(self.operaciones, weights=self.pesos)[0]
+            metodo, ruta, kwargs = self._peticion(operacion)
+            inicio = time.perf_counter()
+            try:
+                response = await self.client.request(metodo, ruta, **kwargs)
+            except httpx.HTTPError:
+                self.errores_red[operacion] += 1
+                continue
+            self.latencias[operacion].append((time.perf_counter() - inicio) * 1000)
+            self.estados[operacion][str(response.status_code)] += 1
+            if operacion == "create" and response.status_code == 201:
+                self.ids.append(response.json()["id"])
+
+    async def run(self, concurrencia: int, duracion: float, total: Optional[int]) -> float:
+        """Ejecuta los workers hasta agotar la duración o el número de peticiones"""
+        deadline = time.perf_counter() + duracion
+        restantes = [total] if total else None
+        inicio = time.perf_counter()
+        await asyncio.gather(*(self._worker(deadline, restantes) for _ in range(concurrencia)))
+        return time.perf_counter() - inicio
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil con interpolación lineal sobre una lista ordenada"""
+    if not valores:
+        return 0.0
+    posicion = (len(valores) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(valores) - 1)
+    return valores[inferior] + (valores[superior] - valores[inferior]) * (posicion - inferior)
+
+def resumir(latencias: List[float], estados: Dict[str, int], errores_red: int, segundos: float) -> Dict:
+    """Throughput, errores y percentiles de un conjunto de peticiones"""
+    ordenadas = sorted(latencias)
+    errores = sum(n for codigo, n in estados.items() if not codigo.startswith("2")) + errores_red
+    return {
+        "requests": len(ordenadas),
+        "throughput_rps": round(len(ordenadas) / segundos, 2) if segundos else 0.0,
+        "errors": errores,
+        "network_errors": errores_red,
+        "status_codes": dict(sorted(estados.items())),
+        "latency_ms": {
+            "mean": round(sum(ordenadas) / len(ordenadas), 2) if ordenadas else 0.0,
+            "p50": round(percentil(ordenadas, 50), 2),
+            "p95": round(percentil(ordenadas, 95), 2),
+            "p99": round(percentil(ordenadas, 99), 2),
+            "max": round(ordenadas[-1], 2) if ordenadas else 0.0
+        }
+    }
+
+def git_revision() -> Optional[str]:
+    """Commit actual para identificar el build medido"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=PROJECT_ROOT, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def serve(port: int) -> None:
+    """
+    Proceso hijo del stack local: MongoDB en memoria salvo que MONGODB_URL
+    apunte a un servidor real (LOAD_TEST_MONGOMOCK=0)
+    """
+    os.chdir(PROJECT_ROOT)
+    import uvicorn
+    from app.db.mongodb import mongodb
+
+    if os.environ.get("LOAD_TEST_MONGOMOCK") == "1":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("❌ El stack local necesita mongomock-motor (pip install mongomock-motor) o --mongodb-url")
+
+        async def connect_to_mongo():
+            mongodb.client = AsyncMongoMockClient()
+            mongodb.database = mongodb.client[mongodb.database_name]
+
+        async def close_mongo_connection():
+            mongodb.client = None
+
+        mongodb.connect_to_mongo = connect_to_mongo
+        mongodb.close_mongo_connection = close_mongo_connection
+
+    uvicorn.run("main:app", host="127.0.0.1", port=port, access_log=False, log_level="warning")
+
+def start_local_stack(mongodb_url: Optional[str]) -> Tuple[subprocess.Popen, str, tempfile.TemporaryDirectory]:
+    """Arranca la app en un proceso aparte y espera a que responda /health"""
+    port = _puerto_libre()
+    media = tempfile.TemporaryDirectory(prefix="load-test-media-")
+    env = {
+        **os.environ,
+        "STORAGE_BACKEND": "local",
+        "LOCAL_STORAGE_DIR": media.name,
+        "LOG_LEVEL": "WARNING",
+        "ACCESS_LOG_SAMPLE_RATE": "0",
+        "SLOW_QUERY_EXPLAIN": "false",
+        # Todos los clientes simulados comparten token e IP: con el rate limit
+        # activo la prueba mediría respuestas 429 en vez de la app
+        "RATE_LIMIT_ENABLED": "false",
+        "LOAD_TEST_MONGOMOCK": "0" if mongodb_url else "1"
+    }
+    if mongodb_url:
+        env["MONGODB_URL"] = mongodb_url
+    else:
+        # mongomock no soporta transacciones
+        env["MONGODB_TRANSACTIONS"] = "false"
+    proceso = subprocess.Popen(
+        [sys.executable, __file__, "--serve", str(port)],
+        cwd=PROJECT_ROOT,
+        env=env
+    )
+    url = f"http://127.0.0.1:{port}"
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise SystemExit("❌ La app local terminó durante el arranque")
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return proceso, url, media
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proceso.terminate()
+    raise SystemExit("❌ La app local no respondió a /health en 30 s")
+
+async def ejecutar(args, url: str) -> Dict:
+    rng = random.Random(args.random_seed)
+    pesos = parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=args.timeout) as client:
+        prueba = LoadTest(client, pesos, rng)
+        await prueba.seed(args.seed_solicitudes, args.concurrency)
+        if args.warmup > 0:
+            await prueba.run(args.concurrency, args.warmup, None)
+            prueba.latencias.clear()
+            prueba.estados.clear()
+            prueba.errores_red.clear()
+        segundos = await prueba.run(args.concurrency, args.duration, args.requests)
+
+    todas = [latencia for latencias in prueba.latencias.values() for latencia in latencias]
+    estados_totales: Dict[str, int] = defaultdict(int)
+    for estados in prueba.estados.values():
+        for codigo, n in estados.items():
+            estados_totales[codigo] += n
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "target": url if args.url else "local",
+        "config": {
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "requests": args.requests,
+            "warmup_s": args.warmup,
+            "mix": pesos,
+            "seed_solicitudes": args.seed_solicitudes,
+            "random_seed": args.random_seed
+        },
+        "elapsed_s": round(segundos, 3),
+        "overall": resumir(todas, estados_totales, sum(prueba.errores_red.values()), segundos),
+        "operations": {
+            operacion: resumir(
+                prueba.latencias[operacion],
+                prueba.estados[operacion],
+                prueba.errores_red[operacion],
+                segundos
+            )
+            for operacion in pesos
+        }
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga con percentiles de latencia")
+    parser.add_argument("--url", help="URL de una instancia ya arrancada (por defecto, stack local)")
+    parser.add_argument("--mongodb-url", help="MongoDB del stack local (por defecto, en memoria)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Peticiones simultáneas")
+    parser.add_argument("--duration", type=float, default=30.0, help="Duración de la medición en segundos")
+    parser.add_argument("--requests", type=int, help="Detenerse tras este número de peticiones")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Segundos de carga descartados antes de medir")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Pesos por operación (por defecto {DEFAULT_MIX})")
+    parser.add_argument("--seed-solicitudes", type=int, default=200, help="Solicitudes creadas antes de medir")
+    parser.add_argument("--random-seed", type=int, default=42, help="Semilla para una mezcla reproducible")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout por petición en segundos")
+    parser.add_argument("--output", help="Archivo donde guardar el resultado JSON (por defecto, stdout)")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    proceso = media = None
+    url = args.url
+    if not url:
+        proceso, url, media = start_local_stack(args.mongodb_url)
+    try:
+        resultado = asyncio.run(ejecutar(args, url))
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait(timeout=10)
+            media.cleanup()
+
+    salida = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(salida + "\n", encoding="utf-8")
+        general = resultado["overall"]
+        print(
+            f"✅ {general['requests']} peticiones, {general['throughput_rps']} req/s, "
+            f"p50 {general['latency_ms']['p50']} ms, p95 {general['latency_ms']['p95']} ms, "
+            f"p99 {general['latency_ms']['p99']} ms → {args.output}"
+        )
+    else:
+        print(salida)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Punto de entrada de producción.
+
+Calcula el número de workers a partir de las CPUs realmente disponibles
+(afinidad y cuota de cgroup del contenedor) y de WORKERS, y arranca uvicorn
+con uvloop/httptools cuando están instalados. Cada worker es un proceso
+independiente que ejecuta su propio lifespan y, por tanto, abre su propio
+pool de MongoDB (hasta MONGODB_MAX_POOL_SIZE conexiones por worker).
+
+Uso:
+    python server.py
+"""
+
+import importlib.util
+import math
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import uvicorn
+
+from app.core.config import settings
+
+def _cuota_cgroup() -> Optional[float]:
+    """
+    CPUs asignadas por la cuota de cgroup, o None si no hay límite
+
+    Soporta cgroup v2 (cpu.max) y v1 (cpu.cfs_quota_us / cpu.cfs_period_us).
+    """
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            cuota, periodo = f.read().split()
+        if cuota != "max":
+            return int(cuota) / int(periodo)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            cuota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            periodo = int(f.read())
+        if cuota > 0 and periodo > 0:
+            return cuota / periodo
+    except (OSError, ValueError):
+        pass
+    return None
+
+def cpus_disponibles() -> int:
+    """
+    CPUs que el proceso puede usar de verdad: el mínimo entre la afinidad
+    del proceso y la cuota de cgroup (os.cpu_count() ve las del host)
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    cuota = _cuota_cgroup()
+    if cuota is not None:
+        cpus = min(cpus, max(1, math.ceil(cuota)))
+    return max(1, cpus)
+
+def numero_workers() -> int:
+    """WORKERS si está definido; si no, un worker por CPU disponible"""
+    if settings.WORKERS > 0:
+        return settings.WORKERS
+    return min(cpus_disponibles(), settings.MAX_WORKERS)
+
+def _disponible(modulo: str) -> bool:
+    return importlib.util.find_spec(modulo) is not None
+
+def main():
+    workers = numero_workers()
+    loop = "uvloop" if _disponible("uvloop") else "asyncio"
+    http = "httptools" if _disponible("httptools") else "h11"
+    print(f"🚀 Iniciando {settings.PROJECT_NAME} en {settings.HOST}:{settings.PORT} "
+          f"({workers} worker(s), loop={loop}, http={http})")
+    uvicorn.run(
+        "main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        # El access log lo escribe RequestContextMiddleware (JSON, muestreado)
+        access_log=False
+    )
+
+if __name__ == "__main__":
+    main()